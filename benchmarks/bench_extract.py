@@ -0,0 +1,59 @@
+"""
+Compare building the dictionary of named groups with `extract_groups` and
+with the precompiled `LocatorParser.extract` of each regex parser in
+`quickclone.remote.parser`.
+
+Usage: python benchmarks/bench_extract.py [-n NUMBER]
+"""
+
+from __future__ import annotations
+import argparse
+import timeit
+import typing as t
+
+from quickclone.remote.parser import (
+    LocatorParser,
+    extract_groups,
+    parse_authority,
+    parse_dirty_url,
+    parse_full_url,
+    parse_scp_dirty_loc,
+    parse_scp_full_loc
+)
+
+
+CASES: t.List[t.Tuple[str, LocatorParser, str]] = [
+    ("parse_authority", parse_authority, "git@192.168.0.1:22"),
+    ("parse_full_url", parse_full_url, "https://user@github.com:443/RenoirTan/QuickClone.git"),
+    ("parse_dirty_url", parse_dirty_url, "RenoirTan/QuickClone"),
+    ("parse_scp_full_loc", parse_scp_full_loc, "git@github.com:RenoirTan/QuickClone.git"),
+    ("parse_scp_dirty_loc", parse_scp_dirty_loc, "github.com:RenoirTan/QuickClone.git")
+]
+
+
+def measure(function: t.Callable[[], t.Any], number: int) -> float:
+    """
+    Get the fastest time taken to call `function` in microseconds.
+    """
+    return min(timeit.Timer(function).repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("-n", "--number", type=int, default=20000)
+    args = arg_parser.parse_args()
+    
+    print(f"{'parser':<21}{'none_str':<10}{'extract_groups':>16}{'extract':>12}{'speedup':>10}")
+    for name, parser, locator in CASES:
+        matches = parser.regex.search(locator)
+        for none_str in ["ignore", "to_str"]:
+            before = measure(lambda: extract_groups(matches, parser.names, none_str), args.number)
+            after = measure(lambda: parser.extract(matches, none_str), args.number)
+            print(
+                f"{name:<21}{none_str:<10}{before:>14.2f}us{after:>10.2f}us"
+                f"{before / after:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
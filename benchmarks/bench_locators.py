@@ -0,0 +1,170 @@
+"""
+Compare the memory taken by `quickclone.remote.UniformResourceLocator` and
+how quickly it is created and converted to a string with the locators used
+before they had `__slots__` (`DictLocator` below), which stored their fields
+in a `__dict__`, created a `UrlAuthority` on every conversion to a string and
+looked for faults every time.
+
+Usage: python benchmarks/bench_locators.py [-n NUMBER] [--count COUNT]
+"""
+
+from __future__ import annotations
+import argparse
+import timeit
+import tracemalloc
+import typing as t
+
+from quickclone.remote import UniformResourceLocator, remote_to_string
+
+
+PARTS: t.List[t.Dict[str, t.Any]] = [
+    {"scheme": "https", "host": "github.com", "path": "RenoirTan/QuickClone"},
+    {"scheme": "ssh", "host": "github.com", "path": "RenoirTan/QuickClone.git", "explicit_scp": True},
+    {
+        "scheme": "https",
+        "host": "example.com",
+        "username": "user",
+        "password": "password",
+        "port": "443",
+        "path": "path/to/resource",
+        "query": "a=1",
+        "fragment": "fragment"
+    }
+]
+
+
+class DictAuthority(object):
+    def __init__(self, host: str, username: str = "", password: str = "", port: str = "") -> None:
+        self.host = host
+        self.username = username
+        self.password = password
+        self.port = port
+    
+    def __str__(self) -> str:
+        userpass_part = self.username
+        if self.password != "":
+            userpass_part += f":{self.password}"
+        if len(userpass_part) > 0:
+            userpass_part += "@"
+        port_part = f":{self.port}" if self.port != "" else ""
+        return userpass_part + self.host + port_part
+
+
+class DictLocator(object):
+    def __init__(
+        self,
+        scheme: str = "",
+        host: str = "",
+        username: str = "",
+        password: str = "",
+        path: str = "",
+        port: str = "",
+        query: str = "",
+        fragment: str = "",
+        **kwargs
+    ) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.username = username
+        self.password = password
+        self.port = port
+        self.path = path
+        self.query = query
+        self.fragment = fragment
+        self.kwargs = kwargs
+    
+    def __str__(self) -> str:
+        for fault in self.find_faults():
+            raise fault
+        scheme_part = f"{self.get_scheme()}://" if self.get_scheme() != "" else ""
+        authority_part = str(DictAuthority(
+            self.get_host(),
+            self.get_username(),
+            self.get_password(),
+            self.get_port()
+        ))
+        path_part = f"/{self.get_path()}" if self.get_path() != "" else ""
+        query_part = f"?{self.get_query()}" if self.get_query() != "" else ""
+        fragment_part = f"#{self.get_fragment()}" if self.get_fragment() != "" else ""
+        return scheme_part + authority_part + path_part + query_part + fragment_part
+    
+    def find_faults(self) -> t.Generator[BaseException, None, None]:
+        if self.get_username() == "" and self.get_password() != "":
+            yield ValueError("Username not given but password given.")
+        if self.get_scheme() == "":
+            yield ValueError("No scheme specified.")
+        if self.get_host() == "":
+            yield ValueError("Empty host.")
+    
+    def get_scheme(self) -> str:
+        return self.scheme
+    
+    def get_host(self) -> str:
+        return self.host
+    
+    def get_username(self) -> str:
+        return self.username
+    
+    def get_password(self) -> str:
+        return self.password
+    
+    def get_port(self) -> str:
+        return self.port
+    
+    def get_path(self) -> str:
+        return self.path
+    
+    def get_query(self) -> str:
+        return self.query
+    
+    def get_fragment(self) -> str:
+        return self.fragment
+
+
+def memory(cls: t.Type[t.Any], count: int) -> float:
+    """
+    Get the memory taken by each of `count` locators in bytes.
+    """
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    locators = [cls(**PARTS[i % len(PARTS)]) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    # The list itself isn't part of the locators.
+    return (used - 8 * len(locators)) / count
+
+
+def measure(function: t.Callable[[], t.Any], number: int) -> float:
+    """
+    Get the fastest time taken to call `function` in microseconds.
+    """
+    return min(timeit.Timer(function).repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("-n", "--number", type=int, default=20000)
+    arg_parser.add_argument("--count", type=int, default=100000)
+    args = arg_parser.parse_args()
+    
+    print(f"{'measurement':<40}{'DictLocator':>14}{'UniformResourceLocator':>24}")
+    before = memory(DictLocator, args.count)
+    after = memory(UniformResourceLocator, args.count)
+    print(f"{'memory per locator':<40}{before:>13.0f}B{after:>23.0f}B")
+    for index, parts in enumerate(PARTS):
+        before = measure(lambda: DictLocator(**parts), args.number)
+        after = measure(lambda: UniformResourceLocator(**parts), args.number)
+        print(f"{f'create #{index}':<40}{before:>12.2f}us{after:>22.2f}us")
+        # Resolving a locator converts it to a string a few times, like for
+        # the command and the history.
+        old = DictLocator(**parts)
+        new = UniformResourceLocator(**parts)
+        before = measure(lambda: str(old), args.number)
+        after = measure(lambda: str(new), args.number)
+        print(f"{f'str #{index}':<40}{before:>12.2f}us{after:>22.2f}us")
+        after = measure(lambda: remote_to_string(new, "git"), args.number)
+        print(f"{f'remote_to_string #{index}':<40}{'':>14}{after:>22.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measure how the time taken by each parser in `quickclone.remote.parser` grows
+with the length of adversarial locators, for every parser engine.
+
+The growth exponent is about 1 for parsers taking linear time and about 2 for
+quadratic ones.
+
+Usage: python benchmarks/bench_pathological.py [--sizes N [N ...]] [--engine NAME]
+"""
+
+from __future__ import annotations
+import argparse
+import math
+import time
+import typing as t
+
+from quickclone.remote.parser import PARSER_ENGINES, get_parser_engine
+
+
+PARSERS: t.List[str] = [
+    "parse_authority",
+    "parse_full_url",
+    "parse_dirty_url",
+    "parse_scp_full_loc",
+    "parse_scp_dirty_loc"
+]
+
+ADVERSARIAL: t.Dict[str, t.Callable[[int], str]] = {
+    "path_segments": lambda n: "a/" * n + ":",
+    "scp_path_segments": lambda n: "git@example.com:" + "a/" * n + "?",
+    "percent_escapes": lambda n: "%41" * n + "%4",
+    "percent_signs": lambda n: "%" * n,
+    "ipv6_groups": lambda n: "1:" * n + "g",
+    "ipv6_zone": lambda n: "fe80::7:8%" + "a" * n + "!",
+    "ipv4_octets": lambda n: "1." * n + "!",
+    "domain_labels": lambda n: "a." * n + "1",
+    "long_label": lambda n: "a-" * n + ".com:",
+    "userinfo": lambda n: "a:" * n + "b",
+    "query": lambda n: "a?" + "b" * n + "#c#",
+    "colons": lambda n: ":" * n,
+    "at_signs": lambda n: "@" * n + ":"
+}
+
+
+def fastest(parse: t.Callable[..., t.Any], input: str, repeat: int = 3) -> float:
+    """
+    Get the fastest time taken to parse `input` in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(input, none_str="to_str")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[250, 1000, 4000])
+    arg_parser.add_argument("--engine", choices=PARSER_ENGINES, action="append")
+    args = arg_parser.parse_args()
+    
+    sizes = sorted(args.sizes)
+    engines = PARSER_ENGINES if args.engine is None else args.engine
+    print(
+        f"{'engine':<11}{'parser':<21}{'input':<19}" +
+        "".join(f"{size:>10}" for size in sizes) +
+        f"{'exponent':>10}"
+    )
+    for name in engines:
+        engine = get_parser_engine(name)
+        for parser in PARSERS:
+            parse = getattr(engine, parser)
+            for family, make in ADVERSARIAL.items():
+                times = [fastest(parse, make(size)) for size in sizes]
+                exponent = (
+                    math.log(max(times[-1], 1e-7) / max(times[0], 1e-7)) /
+                    math.log(sizes[-1] / sizes[0])
+                    if len(sizes) > 1
+                    else float("nan")
+                )
+                print(
+                    f"{name:<11}{parser:<21}{family:<19}" +
+                    "".join(f"{time * 1e3:>8.2f}ms" for time in times) +
+                    f"{exponent:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare how long `quickclone.delegation.tasks.resolve_locator` takes to
+resolve typical remote urls with and without a `ResolutionCache`.
+
+Usage: python benchmarks/bench_resolutions.py [-n NUMBER]
+"""
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+import tempfile
+import timeit
+import typing as t
+
+from quickclone.config.configurator import SmartConfigurator
+from quickclone.delegation.resolutions import ResolutionCache
+from quickclone.delegation.tasks import resolve_locator
+
+
+REMOTE_URLS: t.List[str] = [
+    "RenoirTan/QuickClone",
+    "github.com/RenoirTan/QuickClone",
+    "https://user@github.com:443/RenoirTan/QuickClone.git",
+    "git@github.com:RenoirTan/QuickClone.git"
+]
+
+
+def measure(function: t.Callable[[], t.Any], number: int) -> float:
+    """
+    Get the fastest time taken to call `function` in microseconds.
+    """
+    return min(timeit.Timer(function).repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("-n", "--number", type=int, default=2000)
+    args = arg_parser.parse_args()
+    
+    configs = SmartConfigurator({"options": {"local": {"remotes_dir": "~/Code"}}})
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ResolutionCache.from_configurator(configs, path=Path(folder) / "resolutions.json")
+        print(f"{'remote url':<56}{'uncached':>12}{'cached':>12}{'speedup':>10}")
+        for remote_url in REMOTE_URLS:
+            before = measure(lambda: resolve_locator("git", configs, remote_url), args.number)
+            after = measure(
+                lambda: resolve_locator("git", configs, remote_url, cache=cache),
+                args.number
+            )
+            print(f"{remote_url[:54]:<56}{before:>10.1f}us{after:>10.1f}us{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
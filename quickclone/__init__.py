@@ -1,4 +1,5 @@
-from . import compatibility, config, delegation, remote
+import importlib
+import typing as t
 
 VERSION: str = "0.6.0"
 """
@@ -16,3 +17,15 @@ as possible."
 A description of the app.
 """
 
+SUBMODULES: t.Set[str] = {"compatibility", "config", "delegation", "remote"}
+"""
+Subpackages that are only imported when they are first accessed, so that
+lightweight commands like `qkln -L` don't pay for parsers and configs they never
+use.
+"""
+
+
+def __getattr__(name: str) -> t.Any:
+    if name in SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -1,23 +1,25 @@
+from __future__ import annotations
 import argparse
 from pathlib import Path
 import typing as t
-import subprocess
 import sys
 
 from quickclone import DESCRIPTION, NAME, VERSION
-from quickclone.compatibility import v0_4_0, v0_6_0
-from quickclone.config.cache import (
-    load_caches,
-    dump_caches,
-    get_cache_value,
-    set_cache_value,
-    AVAILABLE_CACHES
-)
-from quickclone.config.common import DEFAULTS_FOLDER, USER_CONFIG_FILE
-from quickclone.config.configurator import load_user_config, init_user_config_file
-from quickclone.delegation.tasks import create_clone_command
-from quickclone.delegation.vcs.common import Command
-from quickclone.remote import DirtyLocator, UniformResourceLocator, UrlAuthority
+
+# Everything else is imported inside the functions that need it, so that
+# lightweight subcommands like `qkln -L` never load the locator parser, the
+# configurator or the delegation package.
+if t.TYPE_CHECKING:
+    from quickclone.config.configurator import SmartConfigurator
+    from quickclone.delegation.batch import CloneJob, CloneResult
+    from quickclone.delegation.retry import RetryPolicy
+    from quickclone.delegation.vcs.common import Command
+
+
+SHELL_SCRIPTS: t.Dict[str, str] = {"bash": "qcd.sh", "zsh": "qcd.sh", "fish": "qcd.fish"}
+"""
+The shell integration script for each supported shell (see `--shell-init`).
+"""
 
 
 def program():
@@ -49,6 +51,17 @@ git clone subcommand:
         const=True,
         default=False
     )
+    app.add_argument(
+        "--shell-init",
+        dest="shell_init",
+        metavar="SHELL",
+        choices=sorted(SHELL_SCRIPTS),
+        help=(
+            "print the shell integration for SHELL (bash, zsh or fish) and exit. "
+            "this defines 'qcd [N]', which works like 'cd $(qkln -LZ N)' without "
+            "starting python"
+        )
+    )
     app.add_argument(
         "remote_url",
         metavar="REMOTE_URL",
@@ -85,6 +98,35 @@ git clone subcommand:
 for the most recently cloned repository. If this value is set to -1, print all paths \
 to previously cloned repositories"
     )
+    app.add_argument(
+        "--from-host",
+        dest="from_host",
+        metavar="HOST",
+        help=(
+            "only consider repositories cloned from HOST when using --last-clone/-L "
+            "(requires the sqlite history backend)"
+        )
+    )
+    app.add_argument(
+        "--of-repo",
+        dest="of_repo",
+        metavar="REPO",
+        help=(
+            "only consider clones of REPO (like 'github.com/RenoirTan/QuickClone' or "
+            "'RenoirTan/QuickClone') when using --last-clone/-L "
+            "(requires the sqlite history backend)"
+        )
+    )
+    app.add_argument(
+        "--since",
+        dest="since",
+        metavar="DURATION",
+        type=parse_duration,
+        help=(
+            "only consider repositories cloned within DURATION (like '90s', '30m', '12h' "
+            "or '1d') when using --last-clone/-L (requires the sqlite history backend)"
+        )
+    )
     app.add_argument(
         "--pretend",
         "-P",
@@ -97,6 +139,118 @@ to previously cloned repositories"
             "actions that it would have if this flag is not found"
         )
     )
+    app.add_argument(
+        "--manifest",
+        "-M",
+        dest="manifest",
+        metavar="FILE",
+        help=(
+            "clone every repository listed in FILE instead of REMOTE_URL. "
+            "each line of FILE has the form 'REMOTE_URL [DEST_PATH] [-- VCS_ARGS...]', "
+            "empty lines and lines starting with '#' are skipped"
+        )
+    )
+    app.add_argument(
+        "--stdin",
+        dest="stdin",
+        action="store_const",
+        const=True,
+        default=False,
+        help=(
+            "like --manifest, but read the repositories from standard input and start "
+            "cloning each one as soon as its line is read"
+        )
+    )
+    app.add_argument(
+        "--bundle",
+        dest="bundle",
+        action="store_const",
+        const=True,
+        default=False,
+        help=(
+            "create or refresh the git bundle of REMOTE_URL (or of every repository in "
+            "--manifest) in the bundle cache instead of cloning it. "
+            "see options.bundles"
+        )
+    )
+    app.add_argument(
+        "--warm",
+        dest="warm",
+        action="store_const",
+        const=True,
+        default=False,
+        help=(
+            "refresh the existing mirrors and bundles (whichever are enabled) of the "
+            "repositories in the history, or create and refresh those of the repositories "
+            "in --manifest, at low priority, for example from cron"
+        )
+    )
+    app.add_argument(
+        "--jobs",
+        "-j",
+        dest="jobs",
+        metavar="N",
+        type=parse_jobs,
+        default=None,
+        help=(
+            "the maximum number of repositories cloned at the same time with "
+            "--manifest or --stdin, or refreshed at the same time with --warm"
+        )
+    )
+    app.add_argument(
+        "--jobs-per-host",
+        dest="jobs_per_host",
+        metavar="N",
+        type=parse_jobs,
+        default=None,
+        help=(
+            "the maximum number of repositories from the same host cloned at the same "
+            "time with --manifest. by default, only --jobs applies"
+        )
+    )
+    app.add_argument(
+        "--sparse",
+        dest="sparse",
+        metavar="DIR",
+        action="append",
+        default=None,
+        help=(
+            "only check out DIR (and the files at the root of the repository) using a "
+            "cone-mode sparse checkout. can be given more than once. git only"
+        )
+    )
+    app.add_argument(
+        "--profile",
+        dest="profile",
+        metavar="NAME",
+        help=(
+            "use the clone profile NAME from [options.profiles] instead of the one "
+            "chosen by options.rules"
+        )
+    )
+    app.add_argument(
+        "--worktree",
+        "-W",
+        dest="worktree",
+        action="store_const",
+        const=True,
+        default=False,
+        help=(
+            "check out the repository as a worktree of a bare repository shared by all "
+            "of its checkouts, which is kept in options.local.remotes_dir. git only"
+        )
+    )
+    app.add_argument(
+        "--existing",
+        dest="existing",
+        metavar="MODE",
+        choices=["update", "clone"],
+        help=(
+            "what to do if the destination already holds a git clone of the same "
+            "remote: 'update' fetches and fast-forwards it, 'clone' clones anyway. "
+            "overrides options.local.existing"
+        )
+    )
     app.add_argument(
         "--system",
         "-S",
@@ -154,10 +308,36 @@ def process_args(parser: argparse.ArgumentParser, argv: t.List[str]) -> argparse
     return namespace
 
 
+def parse_duration(duration: str) -> float:
+    UNITS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}
+    duration = duration.strip().lower()
+    multiplier = 1
+    if len(duration) > 0 and duration[-1] in UNITS:
+        multiplier = UNITS[duration[-1]]
+        duration = duration[:-1]
+    try:
+        return float(duration) * multiplier
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid duration: {duration}")
+
+
+def parse_jobs(jobs: str) -> int:
+    try:
+        count = int(jobs)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of jobs: {jobs}")
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"the number of jobs must be at least 1: {jobs}")
+    return count
+
+
 def ignore_config(keys: t.List[str]) -> t.Set[str]:
     SHORT_FORMS = {
         "d": "options.local.remotes_dir",
-        "s": "options.remote.force_scp"
+        "s": "options.remote.force_scp",
+        "p": "options.rules",
+        "e": "options.local.existing",
+        "r": "options.local.reuse_clones"
     }
     ignored = set(keys)
     for short, long in SHORT_FORMS.items():
@@ -167,33 +347,28 @@ def ignore_config(keys: t.List[str]) -> t.Set[str]:
 
 
 def do_compatibility():
-    compat_status = v0_4_0.quickclone_cache_move()
-    if compat_status == 1:
-        print("Compatibility (v0.4.0) |> Cancelled move/copy!")
-    compat_status = v0_6_0.quickclone_history_list()
+    from quickclone.compatibility.migrations import run_migrations
+    run_migrations()
 
 
 def main(argv: t.List[str]) -> int:
-    do_compatibility()
-    load_caches(AVAILABLE_CACHES)
     app = create_argument_parser()
     args = process_args(app, argv[1:])
     if args.show_version:
         print(f"{NAME} v{VERSION}")
         return 0
-    elif args.get_last_clone:
-        last_clones_index = args.last_clones_index
-        last_clones: t.Optional[t.List[str]] = get_cache_value("last_clones")
-        if last_clones_index == -1:
-            print("Previous repositories:")
-            for i, p in enumerate(last_clones):
-                print(f"  [{i}] {p}")
-            return 0
-        if last_clones is not None and 0 <= last_clones_index < len(last_clones):
-            print(last_clones[last_clones_index])
-            return 0
-        else:
-            raise ValueError(f"invalid --last-clones-index/-Z: {last_clones_index}")
+    if args.shell_init is not None:
+        from quickclone.config.common import SHELL_FOLDER
+        print((SHELL_FOLDER / SHELL_SCRIPTS[args.shell_init]).read_text(), end="")
+        return 0
+    from quickclone.config.cache import configure_caches, dump_caches, AVAILABLE_CACHES
+    # Caches are loaded on first access and only written back if they change.
+    # They are configured first so that migrations use the history chosen by
+    # the config given with `-C`.
+    configure_caches(None if args.config_file is None else Path(args.config_file))
+    do_compatibility()
+    if args.get_last_clone:
+        return last_clone(args)
     if len(args.tests) > 0:
         successes, test_count = conduct_tests(args.tests, args.remote_url)
         dump_caches(AVAILABLE_CACHES)
@@ -203,7 +378,16 @@ def main(argv: t.List[str]) -> int:
         else:
             return 0
     try:
-        result = normal(args)
+        if args.warm:
+            result = warm(args)
+        elif args.bundle:
+            result = bundle(args)
+        elif args.stdin:
+            result = stream(args)
+        elif args.manifest is not None:
+            result = batch(args)
+        else:
+            result = normal(args)
     except Exception as e:
         raise e
     finally:
@@ -211,10 +395,43 @@ def main(argv: t.List[str]) -> int:
     return result
 
 
-# Call this function if quickclone is run with the normal set of clargs.
-def normal(args: argparse.Namespace) -> int:
-    dirty = DirtyLocator.process_dirty_url(args.remote_url)
-    ignored = ignore_config(args.ignore)
+# Call this function if quickclone is run with the `--last-clone/-L` flag.
+# This is the fast path used by `cd $(qkln -L)`, so keep its imports light.
+def last_clone(args: argparse.Namespace) -> int:
+    import time
+    from quickclone.config.cache import find_last_clones
+    last_clones_index = args.last_clones_index
+    try:
+        last_clones: t.List[str] = find_last_clones(
+            host=args.from_host,
+            repo=args.of_repo,
+            since=None if args.since is None else time.time() - args.since,
+            limit=None if last_clones_index < 0 else last_clones_index + 1
+        )
+    except NotImplementedError:
+        print(
+            "--from-host, --of-repo and --since require 'options.history.backend' "
+            "to be set to 'sqlite'."
+        )
+        return 1
+    if last_clones_index == -1:
+        print("Previous repositories:")
+        for i, p in enumerate(last_clones):
+            print(f"  [{i}] {p}")
+        return 0
+    if 0 <= last_clones_index < len(last_clones):
+        print(last_clones[last_clones_index])
+        return 0
+    else:
+        raise ValueError(f"invalid --last-clones-index/-Z: {last_clones_index}")
+
+
+def load_configs(args: argparse.Namespace) -> t.Optional[SmartConfigurator]:
+    from quickclone.config.common import USER_CONFIG_FILE
+    from quickclone.config.configurator import load_user_config, init_user_config_file
+    
+    from quickclone.remote.parser import set_parser_engine
+    
     if args.config_file is None:
         init_user_config_file()
     try:
@@ -226,41 +443,432 @@ def normal(args: argparse.Namespace) -> int:
             f"This is especially important for Windows users where the default encoding "
             f"is UTF-16."
         )
+        return None
+    try:
+        set_parser_engine(configs.from_dotted_string("options.remote.parser_engine"))
+    except ValueError as e:
+        print(f"Invalid options.remote.parser_engine: {e}")
+        return None
+    return configs
+
+
+# Call this function if quickclone is run with the normal set of clargs.
+def normal(args: argparse.Namespace) -> int:
+    from quickclone.delegation.resolutions import ResolutionCache
+    from quickclone.delegation.retry import RetryPolicy
+    from quickclone.delegation.tasks import clone_details, resolve_clone_command
+    
+    ignored = ignore_config(args.ignore)
+    configs = load_configs(args)
+    if configs is None:
         return 2
-    builder = configs.to_locator_builder()
-    built_url = UniformResourceLocator.from_user_and_defaults(dirty, builder)
     vcs = configs.from_dotted_string("vcs.command")
     if args.vcs is not None:
         vcs = args.vcs
-    clone_command = create_clone_command(
+    resolutions = ResolutionCache.from_configurator(configs, ignored)
+    clone_command, built_url = resolve_clone_command(
         vcs,
         configs,
-        built_url,
+        args.remote_url,
         args.dest_path,
         args.vcs_args,
         {},
-        ignored
+        ignored,
+        args.sparse,
+        args.profile,
+        args.existing,
+        args.worktree,
+        resolutions
     )
+    if resolutions is not None:
+        resolutions.dump()
     print(f"Command> {clone_command.format_command_str()}")
     if args.pretend:
+        import shlex
+        from quickclone.delegation.profiles import find_profile
+        for step in clone_command.follow_up():
+            print(f"Then> {' '.join(shlex.quote(arg) for arg in step)}")
+        profile = find_profile(configs, built_url, ignored, args.profile)
+        print(f"Profile> {'no rule matched' if profile is None else profile}")
         print("pretend flag found! Not executing command.")
         return 0
     else:
-        return run_command(clone_command).returncode
+        return run_command(
+            clone_command,
+            RetryPolicy.from_configurator(configs),
+            **clone_details(built_url, vcs)
+        )
+
+
+# Call this function if quickclone is run with the `--manifest` flag.
+def batch(args: argparse.Namespace) -> int:
+    import asyncio
+    from quickclone.delegation.batch import DEFAULT_JOBS, CloneJob, create_clone_job, read_manifest
+    from quickclone.delegation.resolutions import ResolutionCache
+    from quickclone.delegation.retry import RetryPolicy
+    from quickclone.delegation.scheduler import CloneScheduler
+    
+    if args.remote_url != "" or args.dest_path != "":
+        print("REMOTE_URL and DEST_PATH can't be used with --manifest.")
+        return 2
+    try:
+        entries = read_manifest(Path(args.manifest))
+    except (OSError, ValueError) as e:
+        print(f"Could not read manifest '{args.manifest}': {e}")
+        return 2
+    ignored = ignore_config(args.ignore)
+    configs = load_configs(args)
+    if configs is None:
+        return 2
+    vcs = configs.from_dotted_string("vcs.command")
+    if args.vcs is not None:
+        vcs = args.vcs
+    retry = RetryPolicy.from_configurator(configs)
+    resolutions = ResolutionCache.from_configurator(configs, ignored)
+    local_clones: t.Dict[str, t.List[str]] = {}
+    
+    jobs: t.List[CloneJob] = []
+    for entry in entries:
+        job = create_clone_job(
+            entry,
+            vcs,
+            configs,
+            args.vcs_args,
+            ignored,
+            retry,
+            args.sparse,
+            args.profile,
+            args.existing,
+            args.worktree,
+            resolutions,
+            local_clones
+        )
+        if job.command is not None:
+            print(f"Command> {job.command.format_command_str()}")
+        jobs.append(job)
+    if resolutions is not None:
+        resolutions.dump()
+    if args.pretend:
+        print("pretend flag found! Not executing commands.")
+        return int(any(job.command is None for job in jobs))
+    
+    scheduler = CloneScheduler(
+        DEFAULT_JOBS if args.jobs is None else args.jobs,
+        args.jobs_per_host
+    )
+    results = {}
+    
+    async def run_jobs() -> None:
+        async for result in scheduler.as_completed(jobs):
+            results[id(result.job)] = result
+            record_result(result)
+            print(f"[{'ok' if result.succeeded else 'failed'}] {result.job.name}")
+    
+    # Interrupting cancels the clones that are still running, which
+    # terminates their commands before the history is written back.
+    asyncio.run(run_jobs())
+    
+    failures = 0
+    print("Summary:")
+    for job in jobs:
+        result = results[id(job)]
+        if not result.succeeded:
+            failures += 1
+        print_result(result, "  ")
+    print(f"{len(jobs) - failures} succeeded, {failures} failed")
+    return 0 if failures == 0 else 1
+
+
+# Call this function if quickclone is run with the `--stdin` flag.
+# Unlike `batch`, nothing is kept per repository, so that arbitrarily long
+# inputs can be streamed through.
+def stream(args: argparse.Namespace) -> int:
+    from quickclone.delegation.batch import (
+        DEFAULT_JOBS,
+        ManifestEntry,
+        create_clone_job,
+        stream_clone_jobs
+    )
+    from quickclone.delegation.resolutions import ResolutionCache
+    from quickclone.delegation.retry import RetryPolicy
+    import threading
+    
+    if args.remote_url != "" or args.dest_path != "" or args.manifest is not None:
+        print("REMOTE_URL, DEST_PATH and --manifest can't be used with --stdin.")
+        return 2
+    ignored = ignore_config(args.ignore)
+    configs = load_configs(args)
+    if configs is None:
+        return 2
+    vcs = configs.from_dotted_string("vcs.command")
+    if args.vcs is not None:
+        vcs = args.vcs
+    retry = RetryPolicy.from_configurator(configs)
+    resolutions = ResolutionCache.from_configurator(configs, ignored)
+    local_clones: t.Dict[str, t.List[str]] = {}
+    # Entries are resolved on the reading thread, which may look up local
+    # clones in the history while this thread records finished clones in it.
+    history_lock = threading.Lock()
+    
+    def resolve(entry: ManifestEntry) -> CloneJob:
+        with history_lock:
+            return create_clone_job(
+                entry,
+                vcs,
+                configs,
+                args.vcs_args,
+                ignored,
+                retry,
+                args.sparse,
+                args.profile,
+                args.existing,
+                args.worktree,
+                resolutions,
+                local_clones
+            )
+    
+    successes = 0
+    failures = 0
+    if args.pretend:
+        for line_number, line in enumerate(sys.stdin, start=1):
+            try:
+                entry = ManifestEntry.parse(line, line_number)
+            except ValueError as e:
+                print(e)
+                failures += 1
+                continue
+            if entry is None:
+                continue
+            job = resolve(entry)
+            if job.command is None:
+                print(f"[failed] {job.name} (error)")
+                failures += 1
+            else:
+                print(f"Command> {job.command.format_command_str()}")
+        if resolutions is not None:
+            resolutions.dump()
+        print("pretend flag found! Not executing commands.")
+        return 0 if failures == 0 else 1
+    
+    for result in stream_clone_jobs(
+        sys.stdin,
+        resolve,
+        DEFAULT_JOBS if args.jobs is None else args.jobs
+    ):
+        with history_lock:
+            record_result(result)
+        print_result(result)
+        sys.stdout.flush()
+        if result.succeeded:
+            successes += 1
+        else:
+            failures += 1
+    if resolutions is not None:
+        resolutions.dump()
+    print(f"{successes} succeeded, {failures} failed")
+    return 0 if failures == 0 else 1
+
+
+# Call this function if quickclone is run with the `--bundle` flag.
+def bundle(args: argparse.Namespace) -> int:
+    from quickclone.delegation.batch import read_manifest
+    from quickclone.delegation.bundles import BundleCache
+    from quickclone.delegation.tasks import resolve_remote
+    from quickclone.remote import normalize_remote
+    
+    if args.dest_path != "" or args.stdin:
+        print("DEST_PATH and --stdin can't be used with --bundle.")
+        return 2
+    if args.manifest is not None:
+        if args.remote_url != "":
+            print("REMOTE_URL can't be used with --manifest.")
+            return 2
+        try:
+            remote_urls = [entry.remote_url for entry in read_manifest(Path(args.manifest))]
+        except (OSError, ValueError) as e:
+            print(f"Could not read manifest '{args.manifest}': {e}")
+            return 2
+    elif args.remote_url != "":
+        remote_urls = [args.remote_url]
+    else:
+        print("--bundle needs REMOTE_URL or --manifest.")
+        return 2
+    ignored = ignore_config(args.ignore)
+    configs = load_configs(args)
+    if configs is None:
+        return 2
+    cache = BundleCache.from_configurator(configs)
+    
+    failures = 0
+    for remote_url in remote_urls:
+        try:
+            built_url, final_url = resolve_remote("git", configs, remote_url, ignored)
+        except ValueError as e:
+            print(f"[failed] {remote_url} ({e})")
+            failures += 1
+            continue
+        remote_bundle = cache.bundle(normalize_remote(built_url), final_url)
+        print(f"Bundle> {final_url} -> {remote_bundle.path}")
+        if args.pretend:
+            continue
+        if remote_bundle.refresh():
+            print(f"[ok]     {remote_url}")
+        else:
+            print(f"[failed] {remote_url}")
+            failures += 1
+    if args.pretend:
+        print("pretend flag found! Not creating bundles.")
+    return 0 if failures == 0 else 1
+
+
+# Call this function if quickclone is run with the `--warm` flag.
+def warm(args: argparse.Namespace) -> int:
+    from quickclone.delegation.batch import DEFAULT_JOBS, read_manifest
+    from quickclone.delegation.bundles import BundleCache
+    from quickclone.delegation.mirrors import MirrorCache
+    from quickclone.delegation.tasks import resolve_remote
+    from quickclone.delegation.warm import history_remotes, lower_priority, warm_caches
+    from quickclone.remote import DirtyLocator, normalize_remote
+    
+    if args.remote_url != "" or args.dest_path != "" or args.stdin:
+        print("REMOTE_URL, DEST_PATH and --stdin can't be used with --warm.")
+        return 2
+    ignored = ignore_config(args.ignore)
+    configs = load_configs(args)
+    if configs is None:
+        return 2
+    
+    caches: t.List[t.Any] = []
+    if (
+        configs.from_dotted_string("options.mirrors.enabled") is True and
+        "options.mirrors.enabled" not in ignored
+    ):
+        caches.append(MirrorCache.from_configurator(configs).mirror)
+    if (
+        configs.from_dotted_string("options.bundles.enabled") is True and
+        "options.bundles.enabled" not in ignored
+    ):
+        caches.append(BundleCache.from_configurator(configs).bundle)
+    if len(caches) == 0:
+        print("Neither options.mirrors.enabled nor options.bundles.enabled is set, nothing to warm.")
+        return 0
+    
+    # (key, url) of every repository to warm.
+    remotes: t.List[t.Tuple[str, str]] = []
+    failures = 0
+    if args.manifest is not None:
+        try:
+            entries = read_manifest(Path(args.manifest))
+        except (OSError, ValueError) as e:
+            print(f"Could not read manifest '{args.manifest}': {e}")
+            return 2
+        for entry in entries:
+            try:
+                built_url, final_url = resolve_remote("git", configs, entry.remote_url, ignored)
+            except ValueError as e:
+                print(f"[failed] {entry.remote_url} ({e})")
+                failures += 1
+                continue
+            remotes.append((normalize_remote(built_url), final_url))
+    else:
+        from quickclone.config.cache import find_last_clones
+        # The history stores paths, so the urls are read from the clones.
+        for url in history_remotes(find_last_clones()):
+            try:
+                remotes.append((normalize_remote(DirtyLocator.process_dirty_url(url)), url))
+            except ValueError:
+                print(f"[skipped] {url} (unrecognised url)")
+    
+    copies = [cache(key, url) for key, url in remotes for cache in caches]
+    if args.manifest is None:
+        # Only the copies that were made before are refreshed, otherwise every
+        # repository ever cloned would get a mirror or bundle.
+        copies = [copy for copy in copies if copy.path.exists()]
+    if args.pretend:
+        for copy in copies:
+            print(f"Warm> {copy.remote} -> {copy.path}")
+        print("pretend flag found! Not refreshing anything.")
+        return 0 if failures == 0 else 1
+    lowered = lower_priority()
+    print(f"Warming {len(copies)} cached copies (lowered priority: {', '.join(lowered) or 'none'})")
+    for result in warm_caches(copies, DEFAULT_JOBS if args.jobs is None else args.jobs):
+        if result.succeeded:
+            print(f"[ok]     {result.copy.path.name} ({result.duration:.1f}s)")
+        else:
+            failures += 1
+            reason = f" ({result.error})" if result.error != "" else ""
+            print(f"[failed] {result.copy.path.name}{reason}")
+        sys.stdout.flush()
+    print(f"{len(copies) - failures} refreshed, {failures} failed")
+    return 0 if failures == 0 else 1
+
+
+def record_result(result: CloneResult) -> None:
+    job = result.job
+    if result.returncode is not None:
+        record_clone(job.command, result.timestamp, result.returncode, result.duration, **job.details)
+
+
+def print_result(result: CloneResult, indent: str = "") -> None:
+    job = result.job
+    if result.succeeded:
+        print(f"{indent}[ok]     {job.name} -> {job.command.dest_path} ({result.duration:.1f}s)")
+        return
+    reason = "error" if result.returncode is None else f"exit code {result.returncode}"
+    print(f"{indent}[failed] {job.name} ({reason})")
+    lines = [line for line in result.output.splitlines() if line.strip() != ""]
+    for line in lines[-5:]:
+        print(f"{indent}    {line}")
+
+
+def run_command(command: Command, retry: t.Optional[RetryPolicy] = None, **details: t.Any) -> int:
+    import time
+    from quickclone.delegation.retry import remove_partial_clone, run_teeing_stderr
+    
+    host = details.get("host", "")
+    start = time.time()
+    existed = command.dest_path != "" and Path(command.dest_path).exists()
+    attempt = 1
+    while True:
+        returncode, output = run_teeing_stderr(command)
+        if retry is None or not retry.should_retry(attempt, returncode, output, host):
+            break
+        delay = retry.delay(attempt)
+        print(
+            f"Clone failed with a transient error, retrying in {delay:.1f}s "
+            f"(attempt {attempt + 1} of {retry.attempts_for(host)})"
+        )
+        time.sleep(delay)
+        if command.CREATES_DEST_PATH:
+            remove_partial_clone(command.dest_path, existed)
+        attempt += 1
+    record_clone(command, start, returncode, time.time() - start, **details)
+    return returncode
 
 
-def run_command(command: Command) -> subprocess.CompletedProcess:
-    result = command.run()
-    if isinstance(result, subprocess.CompletedProcess):
-        last_clones: t.List[str] = get_cache_value("last_clones")
-        last_clones.insert(0, command.dest_path)
-        set_cache_value("last_clones", last_clones)
-        return result
-    elif isinstance(result, subprocess.SubprocessError):
-        raise result
+def record_clone(
+    command: Command,
+    timestamp: float,
+    returncode: int,
+    duration: float,
+    **details: t.Any
+) -> None:
+    from quickclone.config.cache import add_cache_value
+    from quickclone.config.history import CloneRecord
+    
+    add_cache_value("last_clones", CloneRecord(
+        command.dest_path,
+        timestamp=timestamp,
+        returncode=returncode,
+        duration=duration,
+        **details
+    ))
 
 
 def conduct_tests(tests: t.List[str], remote_url: str) -> t.Tuple[int, int]:
+    from quickclone.config.common import DEFAULTS_FOLDER
+    from quickclone.remote import DirtyLocator, UniformResourceLocator, UrlAuthority
+    
     success_counts: int = 0
     for test in tests:
         try:
@@ -289,6 +897,8 @@ def conduct_tests(tests: t.List[str], remote_url: str) -> t.Tuple[int, int]:
 
 
 def test_config_file() -> bool:
+    from quickclone.config.configurator import load_user_config
+    
     try:
         config = load_user_config()
         print(config)
@@ -1,2 +1,13 @@
-from . import v0_4_0
-from . import v0_6_0
\ No newline at end of file
+import importlib
+import typing as t
+
+SUBMODULES: t.Set[str] = {"migrations", "v0_4_0", "v0_6_0"}
+"""
+Submodules that are only imported when they are first accessed.
+"""
+
+
+def __getattr__(name: str) -> t.Any:
+    if name in SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
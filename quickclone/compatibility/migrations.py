@@ -0,0 +1,205 @@
+from __future__ import annotations
+from pathlib import Path
+import typing as t
+
+from quickclone.config.common import USER_SCHEMA_VERSION_FILE
+from quickclone.config.files import atomic_write_text, locked
+
+
+class Migration(object):
+    """
+    A one-off fix that brings the cache data left behind by older versions of
+    QuickClone up to date.
+    
+    Parameters
+    ----------
+    version: int
+        The schema version of the cache data after this migration has been
+        run. Migrations are run in ascending order of their versions.
+    
+    name: str
+        A short description of the migration.
+    
+    function: Callable[[], int]
+        The function performing the migration. It returns 0 if the migration
+        is done, or any other value if it wasn't (like if the user cancelled
+        it), in which case it is run again next time.
+    """
+    
+    def __init__(self, version: int, name: str, function: t.Callable[[], int]) -> None:
+        self.version = version
+        self.name = name
+        self.function = function
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"version={repr(self.version)}, "
+            f"name={repr(self.name)})"
+        )
+    
+    def __call__(self) -> int:
+        return self.function()
+
+
+MIGRATIONS: t.List[Migration] = []
+"""
+All registered migrations, sorted by their versions.
+"""
+
+
+def register_migration(
+    version: int,
+    name: str,
+    migrations: t.Optional[t.List[Migration]] = None
+) -> t.Callable[[t.Callable[[], int]], t.Callable[[], int]]:
+    """
+    Create a decorator that registers a function as a migration.
+    
+    Parameters
+    ----------
+    version: int
+        The schema version of the cache data after the migration has been run.
+        This must be unique.
+    
+    name: str
+        A short description of the migration.
+    
+    migrations: Optional[List[Migration]] = None
+        The list of migrations to register the function in. If `None`,
+        `MIGRATIONS` is used.
+    
+    Raises
+    ------
+    ValueError
+        If a migration with the same version has already been registered.
+    
+    Returns
+    -------
+    Callable[[Callable[[], int]], Callable[[], int]]
+        The decorator, which returns the decorated function unchanged.
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    
+    def decorator(function: t.Callable[[], int]) -> t.Callable[[], int]:
+        for migration in migrations:
+            if migration.version == version:
+                raise ValueError(
+                    f"Migration version {version} has already been registered by "
+                    f"'{migration.name}'."
+                )
+        migrations.append(Migration(version, name, function))
+        migrations.sort(key=lambda migration: migration.version)
+        return function
+    
+    return decorator
+
+
+def get_schema_version(path: Path = USER_SCHEMA_VERSION_FILE) -> int:
+    """
+    Read the schema version of the cache data.
+    
+    Parameters
+    ----------
+    path: Path = USER_SCHEMA_VERSION_FILE
+        Path to the file storing the schema version.
+    
+    Returns
+    -------
+    int
+        The schema version. If the file is missing or unreadable, 0 is returned
+        so that every migration is run.
+    """
+    try:
+        return int(path.read_text().strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def set_schema_version(version: int, path: Path = USER_SCHEMA_VERSION_FILE) -> None:
+    """
+    Store the schema version of the cache data. The file is replaced
+    atomically so that concurrent invocations never see a partial version.
+    
+    Parameters
+    ----------
+    version: int
+        The new schema version.
+    
+    path: Path = USER_SCHEMA_VERSION_FILE
+        Path to the file storing the schema version.
+    """
+    atomic_write_text(path, f"{version}\n")
+
+
+def run_migrations(
+    path: Path = USER_SCHEMA_VERSION_FILE,
+    migrations: t.Optional[t.List[Migration]] = None
+) -> int:
+    """
+    Run the migrations that haven't been run yet. Once all migrations have been
+    run, this function only reads the schema version file. Pending migrations
+    are run while holding a lock, so concurrent invocations run them once. The
+    lock file is kept next to the folder holding `path` rather than inside it,
+    because the first migration expects '~/.cache/quickclone' not to exist
+    yet when there is a '~/.cache/quicktoml' to move. If a migration isn't
+    done, the schema version stays where it was and the migrations after it
+    aren't run, since they may depend on it.
+    
+    Parameters
+    ----------
+    path: Path = USER_SCHEMA_VERSION_FILE
+        Path to the file storing the schema version.
+    
+    migrations: Optional[List[Migration]] = None
+        The migrations to run. If `None`, `MIGRATIONS` is used.
+    
+    Returns
+    -------
+    int
+        The number of migrations that were done.
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    if len(migrations) == 0:
+        return 0
+    current = get_schema_version(path)
+    if current >= migrations[-1].version:
+        return 0
+    count = 0
+    with locked(path.parent.parent / f"{path.parent.name}.{path.name}.lock"):
+        # Another process may have run the migrations while this one waited.
+        current = get_schema_version(path)
+        for migration in migrations:
+            if migration.version <= current:
+                continue
+            if migration() != 0:
+                break
+            set_schema_version(migration.version, path)
+            count += 1
+    return count
+
+
+@register_migration(1, "v0.4.0: move '~/.cache/quicktoml' to '~/.cache/quickclone'")
+def _v0_4_0_cache_move() -> int:
+    # The fixes are imported lazily because they are almost never run.
+    from . import v0_4_0
+    status = v0_4_0.quickclone_cache_move()
+    if status == 1:
+        print("Compatibility (v0.4.0) |> Cancelled move/copy!")
+        return 1
+    # Moving or copying the cache (2 or 3) completes the migration too.
+    return 0
+
+
+@register_migration(2, "v0.6.0: store a list of previously cloned repositories")
+def _v0_6_0_history_list() -> int:
+    from . import v0_6_0
+    return v0_6_0.quickclone_history_list()
+
+
+@register_migration(3, "v0.7.0: write the history index read by the shell functions")
+def _v0_7_0_history_index() -> int:
+    # The cache store has already been configured with the user's config.
+    from quickclone.config.cache import get_cache_store
+    get_cache_store().write_history_index()
+    return 0
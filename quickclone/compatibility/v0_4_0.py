@@ -1,6 +1,5 @@
 from pathlib import Path
 import shutil
-import subprocess
 
 from quickclone.config.common import USER_CACHE_FOLDER, CACHE_ITEMS
 
@@ -43,7 +42,7 @@ def quickclone_cache_move() -> int:
         except StopIteration:
             return 0
     else:
-        return
+        return 0
     print("⚠⚠⚠ WARNING ⚠⚠⚠")
     print(
         f"I made a mistake when writing the path of the cache folder, it was supposed to be at "
@@ -90,7 +89,7 @@ def _move_cache_folder() -> int:
     return 2
 
 def _copy_cache_folder() -> int:
-    subprocess.run(["mkdir", "-p", str(USER_CACHE_FOLDER)])
+    USER_CACHE_FOLDER.mkdir(parents=True, exist_ok=True)
     for filename in CACHE_ITEMS:
         old = USER_CACHE_FOLDER_OLD / filename
         new = USER_CACHE_FOLDER / filename
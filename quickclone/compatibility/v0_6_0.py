@@ -1,5 +1,6 @@
 import toml
 from quickclone.config.common import USER_HISTORY_CACHE_FILE
+from quickclone.config.files import atomic_write_text
 
 def quickclone_history_list() -> int:
     """
@@ -8,6 +9,8 @@ def quickclone_history_list() -> int:
     Converts the history cache file such that it contains a list of previous
     cloned repositories from just containing the last cloned repository.
     """
+    if not USER_HISTORY_CACHE_FILE.exists():
+        return 0
     history = toml.load(USER_HISTORY_CACHE_FILE)
     old = history.get("last_clone")
     new = history.get("last_clones")
@@ -15,6 +18,5 @@ def quickclone_history_list() -> int:
         history["last_clones"] = [old] if old else []
     if old:
         del history["last_clone"]
-    with USER_HISTORY_CACHE_FILE.open("w") as f:
-        toml.dump(history, f)
+    atomic_write_text(USER_HISTORY_CACHE_FILE, toml.dumps(history))
     return 0
\ No newline at end of file
@@ -1 +1,13 @@
-from . import cache, common, configurator
\ No newline at end of file
+import importlib
+import typing as t
+
+SUBMODULES: t.Set[str] = {"cache", "common", "configurator", "files", "history"}
+"""
+Submodules that are only imported when they are first accessed.
+"""
+
+
+def __getattr__(name: str) -> t.Any:
+    if name in SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
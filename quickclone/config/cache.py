@@ -1,26 +1,270 @@
 from __future__ import annotations
 from pathlib import Path
 import typing as t
-import subprocess
 
-import toml
-
-from .common import USER_CACHE_FOLDER, USER_HISTORY_CACHE_FILE
+from .common import USER_HISTORY_INDEX_FILE
+from .files import atomic_write_text
+from .history import (
+    CloneRecord,
+    DEFAULT_HISTORY_OPTIONS,
+    History,
+    create_history,
+    read_history_options
+)
 
 AVAILABLE_CACHES: t.Set[str] = {"history"}
 """
 The available cache data categories.
 """
 
-_HISTORY_CACHE: t.Dict[str, t.Any] = dict()
 
-def _create_file_if_not_exist(path: Path) -> None:
-    if not path.exists():
-        open(path, "x")
+class CacheStore(object):
+    """
+    A container for QuickClone's cache data categories.
+    
+    Each category is only loaded the first time it is accessed, and `dump`
+    only writes back the categories that were changed since they were loaded,
+    so commands that don't touch the cache (or only read it) never write to
+    disk.
+    
+    Parameters
+    ----------
+    history_options: Optional[Mapping[str, Any]] = None
+        The options used to create the history store (see
+        `quickclone.config.history.create_history`). If `None`, the defaults
+        are used.
+    
+    history_index_path: Path = USER_HISTORY_INDEX_FILE
+        Path to the plain-text mirror of the most recently cloned paths, which
+        is rewritten by `dump` if the history changed (see
+        `write_history_index`).
+    """
+    
+    def __init__(
+        self,
+        history_options: t.Optional[t.Mapping[str, t.Any]] = None,
+        history_index_path: Path = USER_HISTORY_INDEX_FILE
+    ) -> None:
+        self.history_options = history_options
+        self.history_index_path = history_index_path
+        self.loaded: t.Dict[str, t.Any] = {}
+        self.dirty: t.Set[str] = set()
+        self.index_dirty = False
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"history_options={repr(self.history_options)}, "
+            f"history_index_path={repr(self.history_index_path)}, "
+            f"loaded={repr(sorted(self.loaded))}, "
+            f"dirty={repr(sorted(self.dirty))})"
+        )
+    
+    def configure(self, config_file: t.Optional[Path] = None) -> None:
+        """
+        Choose the backends used by each cache data category according to the
+        user's config. Categories that have already been loaded are dropped
+        without being written back.
+        
+        Parameters
+        ----------
+        config_file: Optional[Path] = None
+            Path to the user's config file. If `None`, the default location is
+            used.
+        """
+        self.history_options = read_history_options(config_file)
+        self.loaded.clear()
+        self.dirty.clear()
+        self.index_dirty = False
+    
+    def get(self, cache_name: str) -> t.Any:
+        """
+        Get a cache data category, loading it if it hasn't been loaded yet.
+        
+        Parameters
+        ----------
+        cache_name: str
+            The name of the category. Only the values that exist in
+            `AVAILABLE_CACHES` are allowed.
+        
+        Raises
+        ------
+        ValueError
+            If an invalid cache category name was given or if the config
+            selects an invalid backend.
+        
+        Returns
+        -------
+        Any
+            The object storing the category's data.
+        """
+        cache = self.loaded.get(cache_name)
+        if cache is not None:
+            return cache
+        if cache_name == "history":
+            cache = create_history(self.history_options)
+        else:
+            raise ValueError(f"Invalid cache name given: {cache_name}")
+        cache.load()
+        self.loaded[cache_name] = cache
+        return cache
+    
+    def history(self) -> History:
+        """
+        Get the history of previously cloned repositories.
+        """
+        return self.get("history")
+    
+    def mark_dirty(self, cache_name: str) -> None:
+        """
+        Mark a cache data category as changed so that `dump` writes it back.
+        """
+        if cache_name not in AVAILABLE_CACHES:
+            raise ValueError(f"Invalid cache name given: {cache_name}")
+        self.dirty.add(cache_name)
+    
+    def load(self, cache_names: t.Iterable[str]) -> int:
+        """
+        Load certain cache data categories now instead of when they are first
+        accessed.
+        
+        Returns
+        -------
+        int
+            The number of cache categories loaded.
+        """
+        count = 0
+        for cache_name in cache_names:
+            self.get(cache_name)
+            count += 1
+        return count
+    
+    def dump(self, cache_names: t.Optional[t.Iterable[str]] = None) -> int:
+        """
+        Write back the cache data categories that were changed. If the history
+        changed, the history index is rewritten once as well, no matter how
+        many clones were added.
+        
+        Parameters
+        ----------
+        cache_names: Optional[Iterable[str]] = None
+            The categories to consider. If `None`, every category is
+            considered.
+        
+        Returns
+        -------
+        int
+            The number of cache categories written back.
+        """
+        cache_names = AVAILABLE_CACHES if cache_names is None else cache_names
+        count = 0
+        for cache_name in cache_names:
+            if cache_name not in AVAILABLE_CACHES:
+                raise ValueError(f"Invalid cache name given: {cache_name}")
+            if cache_name not in self.dirty:
+                continue
+            self.loaded[cache_name].dump()
+            self.dirty.discard(cache_name)
+            count += 1
+            if cache_name == "history" and self.index_dirty:
+                self.write_history_index()
+                self.index_dirty = False
+        return count
+    
+    def get_value(self, desired: str) -> t.Optional[t.Any]:
+        """
+        Get cache value of desired key.
+        """
+        if desired == "last_clones":
+            return self.history().get_last_clones()
+        else:
+            raise ValueError(f"Invalid desired={desired}")
+    
+    def set_value(self, desired: str, value: t.Optional[t.Any] = None) -> None:
+        """
+        Set cache value of desired key.
+        """
+        if desired == "last_clones":
+            if isinstance(value, list):
+                self.history().set_last_clones(value)
+                self.mark_dirty("history")
+                self.index_dirty = True
+            else:
+                raise TypeError("Invalid type for last_clones")
+        else:
+            raise ValueError(f"Invalid desired={desired}")
+    
+    def add_value(self, desired: str, value: t.Any) -> None:
+        """
+        Add a value to the collection stored under the desired key.
+        See `add_cache_value`.
+        """
+        if desired == "last_clones":
+            if isinstance(value, str):
+                value = CloneRecord(value)
+            if isinstance(value, CloneRecord):
+                self.history().record_clone(value)
+                self.mark_dirty("history")
+                self.index_dirty = True
+            else:
+                raise TypeError("Invalid type for last_clones")
+        else:
+            raise ValueError(f"Invalid desired={desired}")
+    
+    def find_last_clones(
+        self,
+        host: t.Optional[str] = None,
+        repo: t.Optional[str] = None,
+        since: t.Optional[float] = None,
+        limit: t.Optional[int] = None
+    ) -> t.List[str]:
+        """
+        Find the paths to previously cloned repositories.
+        See `find_last_clones`.
+        """
+        return self.history().find_clones(host=host, repo=repo, since=since, limit=limit)
+    
+    def write_history_index(self) -> None:
+        """
+        Write the most recently cloned paths to `history_index_path`, newest
+        first and one per line, so that shell functions can look them up
+        without starting Python. The number of paths is limited by the
+        `index_length` history option. Paths containing line breaks are left
+        out.
+        """
+        options = DEFAULT_HISTORY_OPTIONS if self.history_options is None else self.history_options
+        length = int(options.get("index_length", DEFAULT_HISTORY_OPTIONS["index_length"]))
+        last_clones = self.history().find_clones(limit=length)
+        lines = [path for path in last_clones if "\n" not in path and "\r" not in path]
+        atomic_write_text(self.history_index_path, "".join(f"{line}\n" for line in lines))
+
+
+_STORE: CacheStore = CacheStore()
+
+
+def get_cache_store() -> CacheStore:
+    """
+    Get the cache store used by the functions in this module.
+    """
+    return _STORE
+
+def configure_caches(config_file: t.Optional[Path] = None) -> None:
+    """
+    Choose the backends used by each cache data category according to the
+    user's config. This should be called before the caches are accessed.
+    
+    Parameters
+    ----------
+    config_file: Optional[Path] = None
+        Path to the user's config file. If `None`, the default location is
+        used.
+    """
+    _STORE.configure(config_file)
 
 def load_caches(cache_names: t.Iterable[str]) -> int:
     """
-    Load the data belonging to certain cache data categories.
+    Load the data belonging to certain cache data categories. Calling this is
+    optional since categories are loaded when they are first accessed.
     
     Parameters
     ----------
@@ -38,31 +282,12 @@ def load_caches(cache_names: t.Iterable[str]) -> int:
     int
         The number of cache categories loaded.
     """
-    subprocess.run(["mkdir", "-p", str(USER_CACHE_FOLDER)])
-    count = 0
-    for cache_name in cache_names:
-        if cache_name == "history":
-            _create_file_if_not_exist(USER_HISTORY_CACHE_FILE)
-            global _HISTORY_CACHE
-            _HISTORY_CACHE = toml.load(USER_HISTORY_CACHE_FILE)
-        else:
-            raise ValueError(f"Invalid cache name given: {cache_name}")
-        count += 1
-    return count
-
-def _check_is_dict(obj: object) -> bool:
-    return isinstance(obj, dict)
-
-def _assert_is_dict(obj: object) -> None:
-    assert _check_is_dict(obj), "Expected cache object to be an instance of a dictionary."
-
-def _dump_cache(path: Path, cache: t.Dict[str, t.Any]) -> None:
-    with open(path, "w") as f:
-        toml.dump(cache, f)
+    return _STORE.load(cache_names)
 
 def dump_caches(cache_names: t.Iterable[str]) -> int:
     """
-    Dump the data belonging to certain cache data categories to their corresponding file.
+    Dump the data belonging to certain cache data categories to their
+    corresponding file. Categories that haven't changed are skipped.
     
     Parameters
     ----------
@@ -80,33 +305,46 @@ def dump_caches(cache_names: t.Iterable[str]) -> int:
     int
         The number of cache categories dumped.
     """
-    subprocess.run(["mkdir", "-p", str(USER_CACHE_FOLDER)])
-    count = 0
-    for cache_name in cache_names:
-        if cache_name == "history":
-            _assert_is_dict(_HISTORY_CACHE)
-            _dump_cache(USER_HISTORY_CACHE_FILE, _HISTORY_CACHE)
-        else:
-            raise ValueError(f"Invalid cache name given: {cache_name}")
-    return count
+    return _STORE.dump(cache_names)
 
 def get_cache_value(desired: str) -> t.Optional[t.Any]:
     """
     Get cache value of desired key.
     """
-    if desired == "last_clones":
-        return _HISTORY_CACHE.get("last_clones", [])
-    else:
-        raise ValueError(f"Invalid desired={desired}")
+    return _STORE.get_value(desired)
 
 def set_cache_value(desired: str, value: t.Optional[t.Any] = None) -> None:
     """
     Set cache value of desired key.
     """
-    if desired == "last_clones":
-        if isinstance(value, list):
-            _HISTORY_CACHE["last_clones"] = value
-        else:
-            raise TypeError("Invalid type for last_clones")
-    else:
-        raise ValueError(f"Invalid desired={desired}")
+    _STORE.set_value(desired, value)
+
+def add_cache_value(desired: str, value: t.Any) -> None:
+    """
+    Add a value to the collection stored under the desired key. Unlike
+    `set_cache_value`, this doesn't require the whole collection to be
+    rewritten.
+    
+    For "last_clones", the value (either a path or a
+    `quickclone.config.history.CloneRecord`) becomes the most recently cloned
+    repository.
+    """
+    _STORE.add_value(desired, value)
+
+def find_last_clones(
+    host: t.Optional[str] = None,
+    repo: t.Optional[str] = None,
+    since: t.Optional[float] = None,
+    limit: t.Optional[int] = None
+) -> t.List[str]:
+    """
+    Find the paths to previously cloned repositories from a certain host,
+    of a certain repository or cloned after a certain time, from newest to
+    oldest. See `quickclone.config.history.History.find_clones`.
+    
+    Raises
+    ------
+    NotImplementedError
+        If the history backend can't filter by `host`, `repo` or `since`.
+    """
+    return _STORE.find_last_clones(host=host, repo=repo, since=since, limit=limit)
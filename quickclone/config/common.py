@@ -8,6 +8,12 @@ The path to the default configuration file.
 """
 
 
+SHELL_FOLDER: Path = Path(__file__).parent.parent / "shell"
+"""
+The path to the shell integration scripts shipped with QuickClone.
+"""
+
+
 USER_CONFIG_FILE: Path = Path.home() / ".config" / "quickclone.toml"
 """
 The path to the user's configuration file.
@@ -24,7 +30,55 @@ USER_HISTORY_CACHE_FILE: Path = USER_CACHE_FOLDER / "history.toml"
 The path to the cache file storing the user's usage history of QuickClone.
 """
 
-CACHE_ITEMS: t.List[str] = ["history.toml"]
+USER_HISTORY_LOG_FILE: Path = USER_CACHE_FOLDER / "history.log"
+"""
+The path to the append-only log of clones that haven't been compacted into
+`USER_HISTORY_CACHE_FILE` yet.
+"""
+
+USER_HISTORY_DATABASE_FILE: Path = USER_CACHE_FOLDER / "history.sqlite3"
+"""
+The path to the database storing the user's clone history when the sqlite
+history backend is used.
+"""
+
+USER_HISTORY_INDEX_FILE: Path = USER_CACHE_FOLDER / "history.txt"
+"""
+The path to the plain-text mirror of the most recently cloned paths (newest
+first, one per line) read by the shell functions in `SHELL_FOLDER`.
+"""
+
+USER_SCHEMA_VERSION_FILE: Path = USER_CACHE_FOLDER / "schema_version"
+"""
+The path to the file storing the version of the cache layout, which is used to
+decide which compatibility migrations still have to be run.
+"""
+
+USER_MIRRORS_FOLDER: Path = USER_CACHE_FOLDER / "mirrors"
+"""
+The path to the directory storing bare mirrors of remote repositories, which
+clones borrow objects from (see `quickclone.delegation.mirrors`).
+"""
+
+USER_BUNDLES_FOLDER: Path = USER_CACHE_FOLDER / "bundles"
+"""
+The path to the directory storing git bundles of remote repositories, which
+clones start from (see `quickclone.delegation.bundles`).
+"""
+
+USER_RESOLUTIONS_CACHE_FILE: Path = USER_CACHE_FOLDER / "resolutions.json"
+"""
+The path to the file storing what the remote urls typed by the user resolved
+to (see `quickclone.delegation.resolutions`).
+"""
+
+CACHE_ITEMS: t.List[str] = [
+    "history.toml",
+    "history.log",
+    "history.sqlite3",
+    "history.txt",
+    "schema_version"
+]
 """
 List of file names in the cache folder.
 """
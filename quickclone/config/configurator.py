@@ -153,22 +153,42 @@ DEFAULT_CONFIG_FILE: Path = DEFAULTS_FOLDER / "quickclone.toml"
 Path to default configs.
 """
 
-DEFAULT_CONFIGURATION = Configurator.from_file(DEFAULT_CONFIG_FILE)
-"""
-An object storing the default configs for QuickClone.
-"""
+_DEFAULT_CONFIGURATION: t.Optional[Configurator] = None
+
+
+def get_default_configuration() -> Configurator:
+    """
+    Get the default configs for QuickClone. The defaults are only read from
+    `DEFAULT_CONFIG_FILE` the first time this function is called.
+    
+    Returns
+    -------
+    Configurator
+        An object storing the default configs for QuickClone.
+    """
+    global _DEFAULT_CONFIGURATION
+    if _DEFAULT_CONFIGURATION is None:
+        _DEFAULT_CONFIGURATION = Configurator.from_file(DEFAULT_CONFIG_FILE)
+    return _DEFAULT_CONFIGURATION
+
+
+def __getattr__(name: str) -> t.Any:
+    # `DEFAULT_CONFIGURATION` used to be built at import time.
+    if name == "DEFAULT_CONFIGURATION":
+        return get_default_configuration()
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 
 class SmartConfigurator(Configurator):
     """
     A child class of `Configurator` which can grab missing config items
-    from `DEFAULT_CONFIGURATION`.
+    from the default configuration (see `get_default_configuration`).
     """
     
     def __getitem__(self, key: t.Union[str, t.Iterable[str]]) -> t.Any:
         result = super().__getitem__(key)
         if result == "":
-            return DEFAULT_CONFIGURATION[key]
+            return get_default_configuration()[key]
         else:
             return result
 
@@ -176,8 +196,8 @@ class SmartConfigurator(Configurator):
 def load_user_config(path: t.Optional[Path] = None) -> SmartConfigurator:
     """
     Load the user's config. If no config file is found, an empty
-    `SmartConfigurator` will be returned and the defaults stored in
-    `DEFAULT_CONFIGURATION` will be used instead.
+    `SmartConfigurator` will be returned and the defaults returned by
+    `get_default_configuration` will be used instead.
     
     Parameters
     ----------
@@ -0,0 +1,121 @@
+from __future__ import annotations
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import time
+import typing as t
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def locked(
+    path: Path,
+    shared: bool = False,
+    blocking: bool = True
+) -> t.Generator[bool, None, None]:
+    """
+    Hold a lock on a lock file while the `with` block runs. This lets several
+    QuickClone processes take turns modifying the same files. The lock is
+    advisory, so it only protects against other code that uses this function
+    with the same lock file.
+    
+    Parameters
+    ----------
+    path: Path
+        Path to the lock file. It is created if it doesn't exist and is never
+        removed.
+    
+    shared: bool = False
+        Whether to take a shared lock, which can be held by several processes
+        at once but not together with an exclusive lock. Windows has no shared
+        locks, so an exclusive lock is taken there instead.
+    
+    blocking: bool = True
+        Whether to wait until the lock can be taken. If `False` and the lock
+        is held by someone else, the `with` block runs without the lock.
+    
+    Returns
+    -------
+    bool
+        Whether the lock was taken, which is always `True` if `blocking` is
+        `True`.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if not _lock(f.fileno(), shared, blocking):
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            _unlock(f.fileno())
+
+
+def _lock(fd: int, shared: bool = False, blocking: bool = True) -> bool:
+    if fcntl is not None:
+        operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        if not blocking:
+            operation |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(fd, operation)
+        except BlockingIOError:
+            return False
+        return True
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError: # LK_LOCK gives up after 10 seconds
+            if not blocking:
+                return False
+            time.sleep(0.1)
+        else:
+            return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return
+    os.lseek(fd, 0, os.SEEK_SET)
+    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    """
+    Replace the contents of a file without ever leaving a partially written
+    file behind. The text is written to a temporary file in the same folder,
+    which is then renamed over `path`.
+    
+    Parameters
+    ----------
+    path: Path
+        Path to the file.
+    
+    text: str
+        The new contents of the file.
+    
+    encoding: str = "utf-8"
+        The encoding of the file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Not using tempfile because importing it slows down `qkln -L`.
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.{time.time_ns()}.tmp")
+    fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,769 @@
+from __future__ import annotations
+from collections import OrderedDict
+import json
+import os
+from pathlib import Path
+import time
+import typing as t
+
+import toml
+
+from .common import (
+    USER_CONFIG_FILE,
+    USER_HISTORY_CACHE_FILE,
+    USER_HISTORY_DATABASE_FILE,
+    USER_HISTORY_LOG_FILE
+)
+from .files import atomic_write_text, locked
+
+HISTORY_LOG_COMPACT_THRESHOLD: int = 64 * 1024
+"""
+The size (in bytes) the history log may grow to before it gets compacted into
+the history snapshot.
+"""
+
+SQLITE_TIMEOUT: float = 30.0
+"""
+How long (in seconds) to wait for other processes to release the history
+database.
+"""
+
+HISTORY_BACKENDS: t.Set[str] = {"toml", "sqlite"}
+"""
+The available storage backends for the history of previous clones.
+"""
+
+HISTORY_MODES: t.Set[str] = {"list", "lru"}
+"""
+The available ways of keeping the history of previous clones. "list" keeps
+every clone while "lru" keeps each path once and only remembers the
+`capacity` most recently cloned paths.
+"""
+
+DEFAULT_HISTORY_OPTIONS: t.Dict[str, t.Any] = {
+    "backend": "toml",
+    "mode": "list",
+    "capacity": 100,
+    "index_length": 100
+}
+"""
+The defaults for the `[options.history]` table in `quickclone.toml`.
+"""
+
+
+class CloneRecord(object):
+    """
+    Information about a single clone operation.
+    
+    Parameters
+    ----------
+    dest_path: str
+        The path to the local clone.
+    
+    url: str = ""
+        The normalized locator of the remote repository
+        (see `quickclone.remote.normalize_remote`).
+    
+    host: str = ""
+        The host of the remote repository.
+    
+    repo: str = ""
+        The normalized path of the remote repository on its host.
+    
+    vcs: str = ""
+        The version control system used to clone the repository.
+    
+    timestamp: Optional[float] = None
+        When the clone started (in seconds since the epoch). If `None`, the
+        current time is used.
+    
+    returncode: Optional[int] = None
+        The exit code of the clone command.
+    
+    duration: Optional[float] = None
+        How long the clone took (in seconds).
+    """
+    
+    def __init__(
+        self,
+        dest_path: str,
+        url: str = "",
+        host: str = "",
+        repo: str = "",
+        vcs: str = "",
+        timestamp: t.Optional[float] = None,
+        returncode: t.Optional[int] = None,
+        duration: t.Optional[float] = None
+    ) -> None:
+        self.dest_path = dest_path
+        self.url = url
+        self.host = host
+        self.repo = repo
+        self.vcs = vcs
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.returncode = returncode
+        self.duration = duration
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"dest_path={repr(self.dest_path)}, "
+            f"url={repr(self.url)}, "
+            f"host={repr(self.host)}, "
+            f"repo={repr(self.repo)}, "
+            f"vcs={repr(self.vcs)}, "
+            f"timestamp={repr(self.timestamp)}, "
+            f"returncode={repr(self.returncode)}, "
+            f"duration={repr(self.duration)})"
+        )
+
+
+class RecentPaths(object):
+    """
+    A set of paths ordered by how recently they were added, holding at most
+    `capacity` paths. Adding a path that is already present moves it to the
+    front instead of duplicating it. Adding and membership tests are O(1).
+    
+    Parameters
+    ----------
+    capacity: int
+        The maximum number of paths to keep. When exceeded, the least recently
+        added path is dropped.
+    """
+    
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError(f"Invalid history capacity: {capacity}")
+        self.capacity = capacity
+        self.paths: t.OrderedDict[str, None] = OrderedDict()
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"capacity={repr(self.capacity)}, "
+            f"paths={repr(self.newest_first())})"
+        )
+    
+    def __contains__(self, path: object) -> bool:
+        return path in self.paths
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def add(self, path: str) -> None:
+        """
+        Add a path as the most recent one.
+        """
+        if path in self.paths:
+            self.paths.move_to_end(path)
+        else:
+            self.paths[path] = None
+            if len(self.paths) > self.capacity:
+                self.paths.popitem(last=False)
+    
+    def newest_first(self) -> t.List[str]:
+        """
+        Get the paths from the most recently added to the oldest.
+        """
+        return list(reversed(self.paths))
+
+
+class History(object):
+    """
+    Base class for the stores keeping the history of previously cloned
+    repositories.
+    """
+    
+    def load(self) -> None:
+        """
+        Prepare the history for reading and writing.
+        """
+    
+    def dump(self) -> None:
+        """
+        Write pending changes to disk.
+        """
+    
+    def get_last_clones(self) -> t.List[str]:
+        """
+        Get the paths to previously cloned repositories.
+        
+        Returns
+        -------
+        List[str]
+            The paths, from the most recent clone to the oldest one.
+        """
+        return []
+    
+    def set_last_clones(self, last_clones: t.List[str]) -> None:
+        """
+        Replace the paths to previously cloned repositories.
+        
+        Parameters
+        ----------
+        last_clones: List[str]
+            The new paths, from the most recent clone to the oldest one.
+        """
+        raise NotImplementedError
+    
+    def record_clone(self, record: CloneRecord) -> None:
+        """
+        Record a clone as the most recent one.
+        
+        Parameters
+        ----------
+        record: CloneRecord
+            Information about the clone.
+        """
+        raise NotImplementedError
+    
+    def find_clones(
+        self,
+        host: t.Optional[str] = None,
+        repo: t.Optional[str] = None,
+        since: t.Optional[float] = None,
+        limit: t.Optional[int] = None
+    ) -> t.List[str]:
+        """
+        Find the paths to previously cloned repositories matching some
+        criteria.
+        
+        Parameters
+        ----------
+        host: Optional[str] = None
+            Only return clones from this host.
+        
+        repo: Optional[str] = None
+            Only return clones of this repository. This can either be the
+            normalized locator of the repository (like
+            'github.com/RenoirTan/QuickClone') or its path on the host (like
+            'RenoirTan/QuickClone').
+        
+        since: Optional[float] = None
+            Only return clones made after this time (in seconds since the
+            epoch).
+        
+        limit: Optional[int] = None
+            The maximum number of paths to return.
+        
+        Raises
+        ------
+        NotImplementedError
+            If this store doesn't keep enough information to filter by `host`,
+            `repo` or `since`.
+        
+        Returns
+        -------
+        List[str]
+            The paths, from the most recent clone to the oldest one.
+        """
+        if host is not None or repo is not None or since is not None:
+            raise NotImplementedError(
+                f"{self.__class__.__name__} cannot filter clones by host, repository or time."
+            )
+        last_clones = self.get_last_clones()
+        return last_clones if limit is None else last_clones[:limit]
+
+
+class HistoryLog(History):
+    """
+    The history of previously cloned repositories.
+    
+    The history is made of 2 files: a snapshot (`history.toml`) storing the
+    paths to previous clones from newest to oldest under `last_clones`, and an
+    append-only log (`history.log`) storing the clones recorded since the last
+    compaction from oldest to newest, one JSON string per line. Recording a
+    clone only appends a line to the log. Once the log grows past
+    `compact_threshold` bytes, it is folded into the snapshot and removed.
+    
+    Several QuickClone processes can share the same history. Every read and
+    write happens while holding a lock on `lock_path`, compactions re-read
+    both files so that clones recorded by other processes are kept, and the
+    snapshot is replaced atomically.
+    
+    Parameters
+    ----------
+    snapshot_path: Path = USER_HISTORY_CACHE_FILE
+        Path to the history snapshot.
+    
+    log_path: Path = USER_HISTORY_LOG_FILE
+        Path to the append-only history log.
+    
+    compact_threshold: int = HISTORY_LOG_COMPACT_THRESHOLD
+        The size of the log (in bytes) that triggers a compaction.
+    
+    capacity: Optional[int] = None
+        If `None`, every clone is kept. Otherwise, the history only keeps the
+        `capacity` most recently cloned paths, each path at most once (see
+        `RecentPaths`).
+    
+    lock_path: Optional[Path] = None
+        Path to the lock file. If `None`, the snapshot's path with a '.lock'
+        suffix is used.
+    """
+    
+    def __init__(
+        self,
+        snapshot_path: Path = USER_HISTORY_CACHE_FILE,
+        log_path: Path = USER_HISTORY_LOG_FILE,
+        compact_threshold: int = HISTORY_LOG_COMPACT_THRESHOLD,
+        capacity: t.Optional[int] = None,
+        lock_path: t.Optional[Path] = None
+    ) -> None:
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.compact_threshold = compact_threshold
+        self.capacity = capacity
+        self.lock_path = snapshot_path.with_suffix(".lock") if lock_path is None else lock_path
+        self.snapshot: t.Dict[str, t.Any] = {}
+        self.appended: t.List[str] = []
+        self.recent: t.Optional[RecentPaths] = None
+        self.log_size = 0
+        self.replaced = False
+        # (inode, size) of the log when it was loaded and the (inode, offset)
+        # of every line this object appended since, which lets `dump` tell
+        # apart the clones recorded by other processes.
+        self.loaded_log: t.Optional[t.Tuple[int, int]] = None
+        self.own_lines: t.Set[t.Tuple[int, int]] = set()
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"snapshot_path={repr(self.snapshot_path)}, "
+            f"log_path={repr(self.log_path)}, "
+            f"compact_threshold={repr(self.compact_threshold)}, "
+            f"capacity={repr(self.capacity)}, "
+            f"lock_path={repr(self.lock_path)})"
+        )
+    
+    def load(self) -> None:
+        """
+        Read the snapshot and the log from disk. Missing files are treated as
+        empty and lines in the log that cannot be decoded (for example, a line
+        cut short by a crash) are skipped.
+        """
+        with locked(self.lock_path):
+            self.snapshot = self._read_snapshot()
+            lines, self.loaded_log = self._read_log()
+        self.appended = [path for _, path in lines]
+        self.log_size = 0 if self.loaded_log is None else self.loaded_log[1]
+        self.own_lines = set()
+        self.replaced = False
+        self._index()
+    
+    def get_last_clones(self) -> t.List[str]:
+        """
+        Get the paths to previously cloned repositories.
+        
+        Returns
+        -------
+        List[str]
+            The paths, from the most recent clone to the oldest one.
+        """
+        if self.recent is not None:
+            return self.recent.newest_first()
+        return self.appended[::-1] + self.snapshot.get("last_clones", [])
+    
+    def set_last_clones(self, last_clones: t.List[str]) -> None:
+        """
+        Replace the paths to previously cloned repositories. The change is
+        written to disk by `dump`, which keeps the clones that other processes
+        recorded in the meantime on top of `last_clones`.
+        
+        Parameters
+        ----------
+        last_clones: List[str]
+            The new paths, from the most recent clone to the oldest one.
+        """
+        self.snapshot["last_clones"] = list(last_clones)
+        self.appended = []
+        self.replaced = True
+        self._index()
+    
+    def record_clone(self, record: CloneRecord) -> None:
+        """
+        Record a clone as the most recent one by appending its path to the
+        log.
+        
+        Parameters
+        ----------
+        record: CloneRecord
+            Information about the clone. Only `record.dest_path` is stored.
+        """
+        path = record.dest_path
+        line = (json.dumps(path) + "\n").encode("utf-8")
+        with locked(self.lock_path):
+            with self.log_path.open("ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+                self.own_lines.add((os.fstat(f.fileno()).st_ino, offset))
+        self.appended.append(path)
+        if self.recent is not None:
+            self.recent.add(path)
+        self.log_size += len(line)
+    
+    def needs_compaction(self) -> bool:
+        """
+        Check whether the log has grown past the compaction threshold or, if
+        the history has a capacity, whether the snapshot holds more paths than
+        the capacity allows.
+        """
+        if self.log_size > self.compact_threshold:
+            return True
+        return (
+            self.capacity is not None and
+            len(self.snapshot.get("last_clones", [])) > self.capacity
+        )
+    
+    def compact(self) -> None:
+        """
+        Fold the log into the snapshot and remove the log. Both files are read
+        again before compacting so that clones recorded by other processes
+        aren't lost.
+        """
+        with locked(self.lock_path):
+            if self.replaced:
+                snapshot = self.snapshot
+                last_clones = snapshot.get("last_clones", [])
+                lines = self._read_log(self.loaded_log)[0]
+                appended = [
+                    path for line, path in lines if line not in self.own_lines
+                ]
+            else:
+                snapshot = self._read_snapshot()
+                last_clones = snapshot.get("last_clones", [])
+                appended = [path for _, path in self._read_log()[0]]
+            snapshot["last_clones"] = self._combine(last_clones, appended)
+            atomic_write_text(self.snapshot_path, toml.dumps(snapshot))
+            if self.log_path.exists():
+                self.log_path.unlink()
+        self.snapshot = snapshot
+        self.appended = []
+        self.log_size = 0
+        self.loaded_log = None
+        self.own_lines = set()
+        self.replaced = False
+        self._index()
+    
+    def dump(self) -> None:
+        """
+        Write pending changes to disk. The snapshot is only rewritten if the
+        history was replaced using `set_last_clones` or if the log needs to be
+        compacted.
+        """
+        if self.replaced or self.needs_compaction():
+            self.compact()
+    
+    def _combine(self, last_clones: t.List[str], appended: t.List[str]) -> t.List[str]:
+        if self.capacity is None:
+            return appended[::-1] + last_clones
+        recent = RecentPaths(self.capacity)
+        for path in reversed(last_clones):
+            recent.add(path)
+        for path in appended:
+            recent.add(path)
+        return recent.newest_first()
+    
+    def _index(self) -> None:
+        if self.capacity is None:
+            self.recent = None
+            return
+        self.recent = RecentPaths(self.capacity)
+        for path in reversed(self.snapshot.get("last_clones", [])):
+            self.recent.add(path)
+        for path in self.appended:
+            self.recent.add(path)
+    
+    def _read_snapshot(self) -> t.Dict[str, t.Any]:
+        if self.snapshot_path.exists():
+            return toml.load(self.snapshot_path)
+        else:
+            return {}
+    
+    def _read_log(
+        self,
+        since: t.Optional[t.Tuple[int, int]] = None
+    ) -> t.Tuple[t.List[t.Tuple[t.Tuple[int, int], str]], t.Optional[t.Tuple[int, int]]]:
+        # Returns the ((inode, offset), path) of each line and the
+        # (inode, size) of the log. If `since` is the (inode, size) of the same
+        # log seen earlier, only the lines appended after that are returned.
+        lines = []
+        try:
+            f = self.log_path.open("rb")
+        except FileNotFoundError:
+            return lines, None
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            offset = 0
+            if since is not None and since[0] == inode:
+                offset = f.seek(since[1])
+            for line in f:
+                try:
+                    path = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    path = None
+                if isinstance(path, str) and line.endswith(b"\n"):
+                    lines.append(((inode, offset), path))
+                offset += len(line)
+        return lines, (inode, offset)
+
+
+class SqliteHistory(History):
+    """
+    The history of previously cloned repositories stored in an SQLite database
+    with one row per clone. Unlike `HistoryLog`, this keeps the remote, host,
+    version control system, exit code and duration of every clone, and has
+    indexes for looking up clones by host, repository and time.
+    
+    Parameters
+    ----------
+    path: Path = USER_HISTORY_DATABASE_FILE
+        Path to the database.
+    
+    import_from: Optional[History] = None
+        Another history store whose clones are imported when the database is
+        created, so that switching backends keeps the history.
+    
+    capacity: Optional[int] = None
+        If `None`, every clone is kept. Otherwise, recording a clone replaces
+        the previous rows with the same destination path and only the rows of
+        the `capacity` most recent clones are kept.
+    """
+    
+    SCHEMA: str = """
+    CREATE TABLE IF NOT EXISTS clones (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT NOT NULL DEFAULT '',
+        host TEXT NOT NULL DEFAULT '',
+        repo TEXT NOT NULL DEFAULT '',
+        vcs TEXT NOT NULL DEFAULT '',
+        dest_path TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        returncode INTEGER,
+        duration REAL
+    );
+    CREATE INDEX IF NOT EXISTS clones_by_timestamp ON clones (timestamp);
+    CREATE INDEX IF NOT EXISTS clones_by_host ON clones (host, timestamp);
+    CREATE INDEX IF NOT EXISTS clones_by_url ON clones (url, timestamp);
+    CREATE INDEX IF NOT EXISTS clones_by_repo ON clones (repo, timestamp);
+    CREATE INDEX IF NOT EXISTS clones_by_dest_path ON clones (dest_path);
+    """
+    
+    def __init__(
+        self,
+        path: Path = USER_HISTORY_DATABASE_FILE,
+        import_from: t.Optional[History] = None,
+        capacity: t.Optional[int] = None
+    ) -> None:
+        if capacity is not None and capacity < 1:
+            raise ValueError(f"Invalid history capacity: {capacity}")
+        self.path = path
+        self.import_from = import_from
+        self.capacity = capacity
+        self.connection: t.Optional[t.Any] = None
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"path={repr(self.path)}, "
+            f"capacity={repr(self.capacity)})"
+        )
+    
+    def load(self) -> None:
+        if self.connection is not None:
+            return
+        # Imported here to keep it off the startup path of the toml backend.
+        try:
+            import sqlite3
+        except ImportError: # Python can be built without sqlite3
+            raise RuntimeError(
+                "The sqlite history backend requires Python's sqlite3 module."
+            )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        created = not self.path.exists()
+        # SQLite locks the database itself, so concurrent QuickClone processes
+        # only have to wait for each other's transactions to finish. Within one
+        # process the connection may be shared by threads (`qkln --stdin`),
+        # which serialize their access to it themselves.
+        self.connection = sqlite3.connect(
+            str(self.path),
+            timeout=SQLITE_TIMEOUT,
+            check_same_thread=False
+        )
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+        if created and self.import_from is not None:
+            self.import_from.load()
+            # When the imported clones were made is unknown.
+            self._insert_paths(self.import_from.get_last_clones(), 0.0)
+    
+    def dump(self) -> None:
+        if self.connection is not None:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
+    
+    def get_last_clones(self) -> t.List[str]:
+        return self.find_clones()
+    
+    def set_last_clones(self, last_clones: t.List[str]) -> None:
+        self.load()
+        with self.connection:
+            self.connection.execute("DELETE FROM clones")
+        self._insert_paths(last_clones, time.time())
+    
+    def record_clone(self, record: CloneRecord) -> None:
+        self.load()
+        with self.connection:
+            if self.capacity is not None:
+                self.connection.execute(
+                    "DELETE FROM clones WHERE dest_path = ?",
+                    (record.dest_path,)
+                )
+            self.connection.execute(
+                "INSERT INTO clones "
+                "(url, host, repo, vcs, dest_path, timestamp, returncode, duration) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.url,
+                    record.host.lower(),
+                    record.repo,
+                    record.vcs,
+                    record.dest_path,
+                    record.timestamp,
+                    record.returncode,
+                    record.duration
+                )
+            )
+            if self.capacity is not None:
+                self._prune()
+    
+    def find_clones(
+        self,
+        host: t.Optional[str] = None,
+        repo: t.Optional[str] = None,
+        since: t.Optional[float] = None,
+        limit: t.Optional[int] = None
+    ) -> t.List[str]:
+        self.load()
+        conditions = []
+        parameters: t.List[t.Any] = []
+        if host is not None:
+            conditions.append("host = ?")
+            parameters.append(host.lower())
+        if repo is not None:
+            repo = _strip_repo(repo)
+            conditions.append("(url = ? OR repo = ?)")
+            parameters.extend([repo, repo])
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            parameters.append(since)
+        query = "SELECT dest_path FROM clones"
+        if len(conditions) > 0:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        return [row[0] for row in self.connection.execute(query, parameters)]
+    
+    def _insert_paths(self, last_clones: t.List[str], timestamp: float) -> None:
+        if self.capacity is not None:
+            recent = RecentPaths(self.capacity)
+            for path in reversed(last_clones):
+                recent.add(path)
+            last_clones = recent.newest_first()
+        # Rows sharing a timestamp are ordered by id, so insert the oldest first.
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO clones (dest_path, timestamp) VALUES (?, ?)",
+                [(path, timestamp) for path in reversed(last_clones)]
+            )
+    
+    def _prune(self) -> None:
+        self.connection.execute(
+            "DELETE FROM clones WHERE id IN ("
+            "SELECT id FROM clones ORDER BY timestamp DESC, id DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self.capacity,)
+        )
+
+
+def _strip_repo(repo: str) -> str:
+    repo = repo.strip().strip("/")
+    if repo.endswith(".git"):
+        repo = repo[:-len(".git")]
+    return repo
+
+
+def read_history_options(config_file: t.Optional[Path] = None) -> t.Dict[str, t.Any]:
+    """
+    Read the `[options.history]` table from the user's config. The file is
+    parsed directly instead of going through
+    `quickclone.config.configurator` so that history lookups stay cheap.
+    
+    Parameters
+    ----------
+    config_file: Optional[Path] = None
+        Path to the user's config file. If `None`, `USER_CONFIG_FILE` is used.
+    
+    Returns
+    -------
+    Dict[str, Any]
+        The history options, with missing options filled in from
+        `DEFAULT_HISTORY_OPTIONS`.
+    """
+    config_file = USER_CONFIG_FILE if config_file is None else config_file
+    options = dict(DEFAULT_HISTORY_OPTIONS)
+    if config_file.is_file():
+        try:
+            configuration = toml.load(config_file)
+        except (UnicodeDecodeError, toml.TomlDecodeError):
+            return options
+        user_options = configuration.get("options", {}).get("history", {})
+        if isinstance(user_options, dict):
+            options.update(user_options)
+    return options
+
+
+def create_history(options: t.Optional[t.Mapping[str, t.Any]] = None) -> History:
+    """
+    Create the history store selected by the history options.
+    
+    Parameters
+    ----------
+    options: Optional[Mapping[str, Any]] = None
+        The history options (see `read_history_options`). If `None`,
+        `DEFAULT_HISTORY_OPTIONS` is used.
+    
+    Raises
+    ------
+    ValueError
+        If an invalid backend, mode or capacity was chosen.
+    
+    Returns
+    -------
+    History
+        The history store.
+    """
+    options = DEFAULT_HISTORY_OPTIONS if options is None else options
+    backend = options.get("backend", DEFAULT_HISTORY_OPTIONS["backend"])
+    mode = options.get("mode", DEFAULT_HISTORY_OPTIONS["mode"])
+    if mode == "list":
+        capacity = None
+    elif mode == "lru":
+        capacity = int(options.get("capacity", DEFAULT_HISTORY_OPTIONS["capacity"]))
+    else:
+        raise ValueError(
+            f"Invalid history mode: {mode}. "
+            f"Allowed: {', '.join(sorted(HISTORY_MODES))}"
+        )
+    if backend == "toml":
+        return HistoryLog(capacity=capacity)
+    elif backend == "sqlite":
+        return SqliteHistory(import_from=HistoryLog(), capacity=capacity)
+    else:
+        raise ValueError(
+            f"Invalid history backend: {backend}. "
+            f"Allowed: {', '.join(sorted(HISTORY_BACKENDS))}"
+        )
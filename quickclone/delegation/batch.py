@@ -0,0 +1,593 @@
+from __future__ import annotations
+from pathlib import Path
+import queue
+import shlex
+import subprocess
+import threading
+import time
+import typing as t
+
+from .retry import RetryPolicy, remove_partial_clone
+from .vcs.common import BaseCommand
+
+if t.TYPE_CHECKING:
+    from quickclone.config.configurator import SmartConfigurator
+    
+    from .resolutions import ResolutionCache
+
+
+__all__ = [
+    "DEFAULT_JOBS",
+    "ManifestEntry",
+    "read_manifest",
+    "CloneJob",
+    "CloneResult",
+    "create_clone_job",
+    "stream_clone_jobs"
+]
+
+
+DEFAULT_JOBS: int = 4
+"""
+The default number of clones run at the same time.
+"""
+
+
+class ManifestEntry(object):
+    """
+    A repository listed in a manifest file.
+    
+    Each non-empty line of a manifest that doesn't start with '#' lists one
+    repository in the same form as QuickClone's command line arguments:
+    
+    ```
+    REMOTE_URL [DEST_PATH] [-- VCS_ARGS...]
+    ```
+    
+    Parameters
+    ----------
+    remote_url: str
+        The (possibly incomplete) url of the remote repository.
+    
+    dest_path: str = ""
+        Where the repository should be cloned to. If empty, the destination is
+        chosen like it would be if no `DEST_PATH` was given on the command
+        line.
+    
+    vcs_args: Optional[List[str]] = None
+        Extra command line arguments for the version control system.
+    
+    line_number: int = 0
+        The line of the manifest this entry was read from, starting from 1.
+    """
+    
+    def __init__(
+        self,
+        remote_url: str,
+        dest_path: str = "",
+        vcs_args: t.Optional[t.List[str]] = None,
+        line_number: int = 0
+    ) -> None:
+        self.remote_url = remote_url
+        self.dest_path = dest_path
+        self.vcs_args = [] if vcs_args is None else vcs_args
+        self.line_number = line_number
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"remote_url={repr(self.remote_url)}, "
+            f"dest_path={repr(self.dest_path)}, "
+            f"vcs_args={repr(self.vcs_args)}, "
+            f"line_number={repr(self.line_number)})"
+        )
+    
+    def __eq__(self, other: t.Any) -> bool:
+        if not isinstance(other, ManifestEntry):
+            return NotImplemented
+        return (
+            self.remote_url == other.remote_url and
+            self.dest_path == other.dest_path and
+            self.vcs_args == other.vcs_args
+        )
+    
+    @classmethod
+    def parse(cls, line: str, line_number: int = 0) -> t.Optional[ManifestEntry]:
+        """
+        Parse a line of a manifest file.
+        
+        Parameters
+        ----------
+        line: str
+            The line to parse. Words are split like a POSIX shell would, so
+            paths containing spaces can be quoted.
+        
+        line_number: int = 0
+            The line number of `line` in the manifest.
+        
+        Raises
+        ------
+        ValueError
+            If the line has unbalanced quotes or more than 2 words before '--'.
+        
+        Returns
+        -------
+        Optional[ManifestEntry]
+            The entry on this line or `None` if the line is empty or a comment.
+        """
+        stripped = line.strip()
+        if stripped == "" or stripped.startswith("#"):
+            return None
+        words = shlex.split(stripped, comments=True)
+        if len(words) == 0:
+            return None
+        vcs_args: t.List[str] = []
+        if "--" in words:
+            separator = words.index("--")
+            vcs_args = words[separator+1:]
+            words = words[:separator]
+        if not 1 <= len(words) <= 2:
+            raise ValueError(
+                f"line {line_number}: expected 'REMOTE_URL [DEST_PATH] [-- VCS_ARGS...]', "
+                f"got {repr(stripped)}"
+            )
+        return cls(words[0], words[1] if len(words) == 2 else "", vcs_args, line_number)
+
+
+def read_manifest(path: Path) -> t.List[ManifestEntry]:
+    """
+    Read the repositories listed in a manifest file. See `ManifestEntry` for
+    the format of the manifest.
+    
+    Parameters
+    ----------
+    path: Path
+        The path to the manifest file.
+    
+    Raises
+    ------
+    ValueError
+        If a line in the manifest is invalid.
+    
+    Returns
+    -------
+    List[ManifestEntry]
+        The repositories in the manifest in the order they are listed.
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8") as manifest:
+        for line_number, line in enumerate(manifest, start=1):
+            entry = ManifestEntry.parse(line, line_number)
+            if entry is not None:
+                entries.append(entry)
+    return entries
+
+
+class CloneResult(object):
+    """
+    The outcome of a `CloneJob`.
+    
+    Parameters
+    ----------
+    job: CloneJob
+        The job that was run.
+    
+    returncode: Optional[int]
+        The exit code of the clone command or `None` if the command couldn't
+        be created or started.
+    
+    timestamp: float
+        When the job started as a UNIX timestamp.
+    
+    duration: float
+        How long the job took in seconds.
+    
+    output: str
+        The combined standard output and standard error of the command's last
+        attempt, or the reason why it couldn't be run.
+    
+    attempts: int = 1
+        How many times the command was run.
+    """
+    
+    def __init__(
+        self,
+        job: CloneJob,
+        returncode: t.Optional[int],
+        timestamp: float,
+        duration: float,
+        output: str,
+        attempts: int = 1
+    ) -> None:
+        self.job = job
+        self.returncode = returncode
+        self.timestamp = timestamp
+        self.duration = duration
+        self.output = output
+        self.attempts = attempts
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"job={repr(self.job)}, "
+            f"returncode={repr(self.returncode)}, "
+            f"timestamp={repr(self.timestamp)}, "
+            f"duration={repr(self.duration)}, "
+            f"output={repr(self.output)}, "
+            f"attempts={repr(self.attempts)})"
+        )
+    
+    @property
+    def succeeded(self) -> bool:
+        """
+        Whether the clone command ran and exited successfully.
+        """
+        return self.returncode == 0
+
+
+class CloneJob(object):
+    """
+    A clone that is run as part of a batch.
+    
+    Parameters
+    ----------
+    name: str
+        The name shown in the summary, usually the url given by the user.
+    
+    command: Optional[BaseCommand]
+        The clone command or `None` if it couldn't be created.
+    
+    details: Optional[Dict[str, Any]] = None
+        Extra details about the clone kept in the history (see
+        `quickclone.delegation.tasks.clone_details`).
+    
+    error: str = ""
+        Why `command` couldn't be created.
+    
+    retry: Optional[RetryPolicy] = None
+        When to run the command again if it fails. If `None`, the command is
+        only run once.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        command: t.Optional[BaseCommand],
+        details: t.Optional[t.Dict[str, t.Any]] = None,
+        error: str = "",
+        retry: t.Optional[RetryPolicy] = None
+    ) -> None:
+        self.name = name
+        self.command = command
+        self.details = {} if details is None else details
+        self.error = error
+        self.retry = retry
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"name={repr(self.name)}, "
+            f"command={repr(self.command)}, "
+            f"details={repr(self.details)}, "
+            f"error={repr(self.error)}, "
+            f"retry={repr(self.retry)})"
+        )
+    
+    def _dest_existed(self) -> bool:
+        dest_path = getattr(self.command, "dest_path", "")
+        return dest_path != "" and Path(dest_path).exists()
+    
+    def _prepare_retry(self, attempt: int, returncode: t.Optional[int], output: str) -> float:
+        """
+        Get how long to wait before trying again after a failed attempt, or a
+        negative number if the job shouldn't be tried again.
+        """
+        if self.retry is None or not self.retry.should_retry(
+            attempt,
+            returncode,
+            output,
+            str(self.details.get("host", ""))
+        ):
+            return -1.0
+        return self.retry.delay(attempt)
+    
+    def _run_once(self) -> t.Tuple[t.Optional[int], str]:
+        assert self.command is not None
+        try:
+            result = self.command.run(
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True
+            )
+        except OSError as e:
+            return None, str(e)
+        if isinstance(result, subprocess.SubprocessError):
+            return None, str(result)
+        return result.returncode, result.stdout or ""
+    
+    async def _run_once_async(self) -> t.Tuple[t.Optional[int], str]:
+        assert self.command is not None
+        try:
+            result = await self.command.run_async(
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
+            )
+        except OSError as e:
+            return None, str(e)
+        return result.returncode, (result.stdout or b"").decode(errors="replace")
+    
+    def run(self) -> CloneResult:
+        """
+        Run the clone command, capturing its output so that the output of
+        clones running at the same time isn't interleaved. The command's
+        standard input is closed so that it fails instead of waiting for input
+        that will never come. Transient failures are retried according to
+        `retry`, after removing what the failed attempt left behind.
+        
+        This never raises an exception, failures are reported in the result
+        instead.
+        """
+        start = time.time()
+        if self.command is None:
+            return CloneResult(self, None, start, 0.0, self.error)
+        existed = self._dest_existed()
+        attempt = 1
+        while True:
+            returncode, output = self._run_once()
+            delay = self._prepare_retry(attempt, returncode, output)
+            if delay < 0:
+                break
+            time.sleep(delay)
+            if self.command.CREATES_DEST_PATH:
+                remove_partial_clone(self.command.dest_path, existed)
+            attempt += 1
+        return CloneResult(self, returncode, start, time.time() - start, output, attempt)
+    
+    async def run_async(self) -> CloneResult:
+        """
+        Like `run`, but runs the clone command without blocking the event
+        loop. Cancelling the task running this coroutine terminates the clone
+        command.
+        """
+        import asyncio
+        
+        start = time.time()
+        if self.command is None:
+            return CloneResult(self, None, start, 0.0, self.error)
+        existed = self._dest_existed()
+        attempt = 1
+        while True:
+            returncode, output = await self._run_once_async()
+            delay = self._prepare_retry(attempt, returncode, output)
+            if delay < 0:
+                break
+            await asyncio.sleep(delay)
+            if self.command.CREATES_DEST_PATH:
+                remove_partial_clone(self.command.dest_path, existed)
+            attempt += 1
+        return CloneResult(self, returncode, start, time.time() - start, output, attempt)
+
+
+def create_clone_job(
+    entry: ManifestEntry,
+    vcs: str,
+    configs: SmartConfigurator,
+    cla_list: t.Optional[t.Iterable[str]] = None,
+    ignored: t.Optional[t.Set[str]] = None,
+    retry: t.Optional[RetryPolicy] = None,
+    sparse: t.Optional[t.Iterable[str]] = None,
+    profile_name: t.Optional[str] = None,
+    existing: t.Optional[str] = None,
+    worktree: bool = False,
+    cache: t.Optional[ResolutionCache] = None,
+    local_clones: t.Optional[t.Dict[str, t.List[str]]] = None
+) -> CloneJob:
+    """
+    Resolve a manifest entry into a clone job. If the entry's url can't be
+    resolved, the job records why instead of raising an exception, so that
+    one bad entry doesn't stop the whole batch.
+    
+    Parameters
+    ----------
+    entry: ManifestEntry
+        The repository to clone.
+    
+    vcs: str
+        Which version control system to use.
+    
+    configs: SmartConfigurator
+        Configuration object.
+    
+    cla_list: Optional[Iterable[str]] = None
+        Extra command line arguments passed after the entry's own.
+    
+    ignored: Optional[Set[str]] = None
+        Set of config options to ignore.
+    
+    retry: Optional[RetryPolicy] = None
+        When to run the clone again if it fails.
+    
+    sparse: Optional[Iterable[str]] = None
+        The directories to check out in a sparse checkout.
+    
+    profile_name: Optional[str] = None
+        The clone profile to use instead of the one chosen by the rules.
+    
+    existing: Optional[str] = None
+        What to do if the destination already holds a clone of the
+        repository. See `quickclone.delegation.tasks.create_clone_command`.
+    
+    worktree: bool = False
+        Whether to check out the repository as a worktree of a shared bare
+        repository.
+    
+    cache: Optional[ResolutionCache] = None
+        The cache storing what remote urls resolve to, which is shared by the
+        entries of a batch. See `quickclone.delegation.tasks.resolve_locator`.
+    
+    local_clones: Optional[Dict[str, List[str]]] = None
+        The clones of each remote repository found so far, which is shared by
+        the entries of a batch. See
+        `quickclone.delegation.tasks.find_local_clone`.
+    
+    Returns
+    -------
+    CloneJob
+        The job cloning the entry's repository.
+    """
+    from .tasks import clone_details, resolve_clone_command
+    
+    try:
+        command, built_url = resolve_clone_command(
+            vcs,
+            configs,
+            entry.remote_url,
+            entry.dest_path,
+            [*entry.vcs_args, *([] if cla_list is None else cla_list)],
+            {},
+            ignored,
+            sparse,
+            profile_name,
+            existing,
+            worktree,
+            cache,
+            local_clones
+        )
+    except Exception as e:
+        return CloneJob(entry.remote_url, None, error=str(e))
+    return CloneJob(entry.remote_url, command, clone_details(built_url, vcs), retry=retry)
+
+
+_DONE = object()
+"""
+Sentinel telling the next stage of `stream_clone_jobs` that there is no more
+work.
+"""
+
+
+def _put(items: queue.Queue, item: t.Any, stop: threading.Event) -> bool:
+    """
+    Put an item into a bounded queue, giving up if `stop` is set while
+    waiting for space. Returns whether the item was put into the queue.
+    """
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=0.1)
+        except queue.Full:
+            continue
+        return True
+    return False
+
+
+def stream_clone_jobs(
+    lines: t.Iterable[str],
+    resolve: t.Callable[[ManifestEntry], CloneJob],
+    max_workers: int = DEFAULT_JOBS,
+    queue_size: t.Optional[int] = None
+) -> t.Iterator[CloneResult]:
+    """
+    Clone the repositories listed in `lines` as the lines arrive, without
+    reading all of them first.
+    
+    The lines are read and resolved into jobs by one thread, run by
+    `max_workers` worker threads and the results are yielded to the calling
+    thread, so reading, resolving and cloning overlap. The stages are
+    connected by queues holding at most `queue_size` items: if the clones
+    can't keep up, reading stops until a worker is free, so memory use
+    doesn't grow with the length of the input.
+    
+    Parameters
+    ----------
+    lines: Iterable[str]
+        Lines in the same format as a manifest file (see `ManifestEntry`),
+        like `sys.stdin`.
+    
+    resolve: Callable[[ManifestEntry], CloneJob]
+        Turns each entry into a clone job, like `create_clone_job`. This is
+        called from the reading thread.
+    
+    max_workers: int = DEFAULT_JOBS
+        The maximum number of clones running at the same time.
+    
+    queue_size: Optional[int] = None
+        The maximum number of items waiting between stages. Defaults to
+        `max_workers`.
+    
+    Raises
+    ------
+    ValueError
+        If `max_workers` or `queue_size` is less than 1.
+    
+    Returns
+    -------
+    Iterator[CloneResult]
+        The results of the jobs in the order they finish. Lines that aren't
+        valid manifest entries produce failed results. If reading `lines` or
+        `resolve` raises an exception, it is raised again once the jobs that
+        were already started have finished.
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+    queue_size = max_workers if queue_size is None else queue_size
+    if queue_size < 1:
+        raise ValueError(f"queue_size must be at least 1, got {queue_size}")
+    jobs: queue.Queue = queue.Queue(maxsize=queue_size)
+    results: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors: t.List[BaseException] = []
+    
+    def read() -> None:
+        try:
+            for line_number, line in enumerate(lines, start=1):
+                try:
+                    entry = ManifestEntry.parse(line, line_number)
+                except ValueError as e:
+                    job = CloneJob(line.strip(), None, error=str(e))
+                else:
+                    if entry is None:
+                        continue
+                    job = resolve(entry)
+                if not _put(jobs, job, stop):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            for _ in range(max_workers):
+                if not _put(jobs, _DONE, stop):
+                    return
+    
+    def work() -> None:
+        while not stop.is_set():
+            try:
+                job = jobs.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if job is _DONE:
+                break
+            if not _put(results, job.run(), stop):
+                return
+        _put(results, _DONE, stop)
+    
+    threads = [threading.Thread(target=read, name="qkln-read", daemon=True)]
+    threads.extend(
+        threading.Thread(target=work, name=f"qkln-clone-{i}", daemon=True)
+        for i in range(max_workers)
+    )
+    for thread in threads:
+        thread.start()
+    try:
+        finished = 0
+        while finished < max_workers:
+            result = results.get()
+            if result is _DONE:
+                finished += 1
+            else:
+                yield result
+    finally:
+        # Only matters if the caller stops early: unblock the other stages so
+        # that they exit instead of waiting for space forever.
+        stop.set()
+    if len(errors) > 0:
+        raise errors[0]
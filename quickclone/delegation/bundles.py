@@ -0,0 +1,241 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+import shutil
+import typing as t
+
+from quickclone.config.common import USER_BUNDLES_FOLDER
+from quickclone.config.files import locked
+
+from .mirrors import RepositoryCache, parse_size
+
+if t.TYPE_CHECKING:
+    from quickclone.config.configurator import Configurator
+
+
+__all__ = [
+    "DEFAULT_BUNDLE_OPTIONS",
+    "Bundle",
+    "BundleCache"
+]
+
+
+DEFAULT_BUNDLE_OPTIONS: t.Dict[str, t.Any] = {
+    "enabled": False,
+    "max_size": "20G"
+}
+"""
+The options used by `BundleCache.from_options` when they aren't set.
+"""
+
+
+class Bundle(object):
+    """
+    A git bundle of every ref of a remote repository in a `BundleCache`.
+    
+    Parameters
+    ----------
+    cache: BundleCache
+        The cache storing the bundle.
+    
+    key: str
+        The normalized remote url identifying the repository (see
+        `quickclone.remote.normalize_remote`).
+    
+    remote: str
+        The url the bundle is created from.
+    """
+    
+    def __init__(self, cache: BundleCache, key: str, remote: str) -> None:
+        self.cache = cache
+        self.key = key
+        self.remote = remote
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"cache={repr(self.cache)}, "
+            f"key={repr(self.key)}, "
+            f"remote={repr(self.remote)})"
+        )
+    
+    @property
+    def path(self) -> Path:
+        """
+        Where the bundle is stored.
+        """
+        return self.cache.path_for(self.key)
+    
+    def exists(self) -> bool:
+        """
+        Check whether the bundle has been created.
+        """
+        return self.path.is_file()
+    
+    def touch(self) -> None:
+        """
+        Mark the bundle as used, so that it is removed after the bundles that
+        have been used less recently.
+        """
+        try:
+            os.utime(self.path)
+        except OSError:
+            pass
+    
+    def refresh(self) -> bool:
+        """
+        Create or update the bundle. See `BundleCache.refresh`.
+        """
+        return self.cache.refresh(self.key, self.remote)
+    
+    def in_use(self) -> t.ContextManager[bool]:
+        """
+        Keep the bundle from being evicted while the `with` block runs. See
+        `RepositoryCache.in_use`.
+        """
+        return self.cache.in_use(self.path)
+
+
+class BundleCache(RepositoryCache):
+    """
+    A directory of git bundles, which are single-file snapshots of remote
+    repositories, keyed by their normalized remote url.
+    
+    Clones can start from the bundle of their remote repository instead of an
+    empty repository (see
+    `quickclone.delegation.vcs.git.GitCloneCommand.use_bundle`), so only the
+    commits made since the bundle was refreshed are downloaded. Unlike
+    mirrors, bundles are only refreshed when asked to (like with
+    `qkln --bundle`), and clones never depend on them once they are done, so
+    they can be copied to other machines and removed at any time.
+    
+    Parameters
+    ----------
+    root: Path = USER_BUNDLES_FOLDER
+        The directory storing the bundles.
+    
+    See `quickclone.delegation.mirrors.RepositoryCache` for the other
+    parameters.
+    """
+    
+    SUFFIX: str = ".bundle"
+    
+    def __init__(
+        self,
+        root: Path = USER_BUNDLES_FOLDER,
+        max_size: t.Optional[int] = None,
+        git: str = "git"
+    ) -> None:
+        super().__init__(root, max_size, git)
+    
+    @classmethod
+    def from_options(
+        cls,
+        options: t.Mapping[str, t.Any],
+        root: Path = USER_BUNDLES_FOLDER
+    ) -> BundleCache:
+        """
+        Create a bundle cache from the `[options.bundles]` table of a config
+        file. Missing options are taken from `DEFAULT_BUNDLE_OPTIONS`.
+        """
+        max_size = options.get("max_size")
+        if max_size is None or max_size == "":
+            max_size = DEFAULT_BUNDLE_OPTIONS["max_size"]
+        return cls(root, parse_size(max_size))
+    
+    @classmethod
+    def from_configurator(
+        cls,
+        configs: Configurator,
+        root: Path = USER_BUNDLES_FOLDER
+    ) -> BundleCache:
+        """
+        Create a bundle cache from the `options.bundles` section of the user's
+        config.
+        """
+        return cls.from_options(
+            {
+                key: configs.from_dotted_string(f"options.bundles.{key}")
+                for key in DEFAULT_BUNDLE_OPTIONS
+            },
+            root
+        )
+    
+    def _is_copy(self, path: Path) -> bool:
+        return path.is_file()
+    
+    def _size(self, path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+    
+    def bundle(self, key: str, remote: str) -> Bundle:
+        """
+        Get the bundle of a remote repository. The bundle isn't created until
+        it is refreshed.
+        """
+        return Bundle(self, key, remote)
+    
+    def refresh(self, key: str, remote: str) -> bool:
+        """
+        Create the bundle of a remote repository, or update it if it already
+        exists, then remove the least recently used bundles if the cache is
+        too large.
+        
+        The repository is mirrored into a temporary directory, starting from
+        the existing bundle if there is one so that only the new objects are
+        downloaded, and bundled with `git bundle create --all`. The new bundle
+        replaces the old one atomically, so clones starting from it never see
+        a partial bundle.
+        
+        Parameters
+        ----------
+        key: str
+            The normalized remote url identifying the repository.
+        
+        remote: str
+            The url to fetch the repository from.
+        
+        Returns
+        -------
+        bool
+            Whether the bundle was created or updated.
+        """
+        path = self.path_for(key)
+        with locked(self._lock_path(path)):
+            temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            written = path.with_name(f"{path.name}.{os.getpid()}.new")
+            if temporary.exists():
+                shutil.rmtree(temporary)
+            try:
+                if path.is_file():
+                    process = self._git("clone", "--mirror", "--quiet", str(path), str(temporary))
+                    if process.returncode == 0:
+                        self._git("--git-dir", str(temporary), "remote", "set-url", "origin", remote)
+                        process = self._git(
+                            "--git-dir", str(temporary), "fetch", "--prune", "--quiet", "origin"
+                        )
+                else:
+                    process = self._git("clone", "--mirror", "--quiet", remote, str(temporary))
+                if process.returncode != 0:
+                    return False
+                process = self._git(
+                    "--git-dir", str(temporary), "bundle", "create", "--quiet", str(written), "--all"
+                )
+                if process.returncode != 0:
+                    return False
+                os.replace(written, path)
+            finally:
+                shutil.rmtree(temporary, ignore_errors=True)
+                if written.exists():
+                    written.unlink()
+        self.evict(keep={path})
+        return True
+    
+    def bundles(self) -> t.List[Path]:
+        """
+        Get the paths to every bundle in the cache, from the least to the most
+        recently used.
+        """
+        return self.copies()
@@ -0,0 +1,390 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+import re
+import shutil
+import subprocess
+import typing as t
+from urllib.parse import quote
+
+from quickclone.config.common import USER_MIRRORS_FOLDER
+from quickclone.config.files import locked
+
+if t.TYPE_CHECKING:
+    from quickclone.config.configurator import Configurator
+
+
+__all__ = [
+    "DEFAULT_MIRROR_OPTIONS",
+    "parse_size",
+    "directory_size",
+    "Mirror",
+    "RepositoryCache",
+    "MirrorCache"
+]
+
+
+DEFAULT_MIRROR_OPTIONS: t.Dict[str, t.Any] = {
+    "enabled": False,
+    "dissociate": True,
+    "max_size": "20G"
+}
+"""
+The options used by `MirrorCache.from_options` when they aren't set.
+"""
+
+SIZE_UNITS: t.Dict[str, int] = {
+    "": 1,
+    "k": 1024,
+    "m": 1024 ** 2,
+    "g": 1024 ** 3,
+    "t": 1024 ** 4
+}
+"""
+Multipliers for the suffixes accepted by `parse_size`.
+"""
+
+
+def parse_size(size: t.Union[str, int, float]) -> int:
+    """
+    Convert a size like '500M' or '20G' (powers of 1024, an optional trailing
+    'B' is allowed) into a number of bytes. Numbers are taken as bytes.
+    
+    Raises
+    ------
+    ValueError
+        If the size can't be parsed or is negative.
+    """
+    if isinstance(size, (int, float)):
+        if size < 0:
+            raise ValueError(f"invalid size: {size}")
+        return int(size)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*", size.lower())
+    if match is None:
+        raise ValueError(f"invalid size: {size}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def directory_size(path: Path) -> int:
+    """
+    Get the total size of the files in a directory in bytes, without
+    following symbolic links.
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class Mirror(object):
+    """
+    A bare mirror of a remote repository in a `MirrorCache`.
+    
+    Parameters
+    ----------
+    cache: MirrorCache
+        The cache storing the mirror.
+    
+    key: str
+        The normalized remote url identifying the repository (see
+        `quickclone.remote.normalize_remote`).
+    
+    remote: str
+        The url the mirror is cloned and fetched from.
+    """
+    
+    def __init__(self, cache: MirrorCache, key: str, remote: str) -> None:
+        self.cache = cache
+        self.key = key
+        self.remote = remote
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"cache={repr(self.cache)}, "
+            f"key={repr(self.key)}, "
+            f"remote={repr(self.remote)})"
+        )
+    
+    @property
+    def path(self) -> Path:
+        """
+        Where the mirror is stored.
+        """
+        return self.cache.path_for(self.key)
+    
+    def refresh(self) -> bool:
+        """
+        Create or update the mirror. See `MirrorCache.refresh`.
+        """
+        return self.cache.refresh(self.key, self.remote)
+    
+    def in_use(self) -> t.ContextManager[bool]:
+        """
+        Keep the mirror from being evicted while the `with` block runs. See
+        `RepositoryCache.in_use`.
+        """
+        return self.cache.in_use(self.path)
+
+
+class RepositoryCache(object):
+    """
+    A directory of copies of remote repositories, keyed by their normalized
+    remote url, which are removed in least recently used order once they take
+    up too much space. Subclasses decide what a copy is and how it is
+    refreshed.
+    
+    Parameters
+    ----------
+    root: Path
+        The directory storing the copies.
+    
+    max_size: Optional[int] = None
+        The total size in bytes the copies may take up. Once they take up
+        more, the least recently used copies are removed. If `None`, copies
+        are never removed.
+    
+    git: str = "git"
+        The git executable.
+    """
+    
+    SUFFIX: str = ""
+    """
+    The suffix of the copies' file names.
+    """
+    
+    def __init__(
+        self,
+        root: Path,
+        max_size: t.Optional[int] = None,
+        git: str = "git"
+    ) -> None:
+        self.root = root
+        self.max_size = max_size
+        self.git = git
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"root={repr(self.root)}, "
+            f"max_size={repr(self.max_size)}, "
+            f"git={repr(self.git)})"
+        )
+    
+    def path_for(self, key: str) -> Path:
+        """
+        Get where the copy of the repository identified by `key` is stored.
+        """
+        return self.root / f"{quote(key, safe='')}{self.SUFFIX}"
+    
+    def _lock_path(self, path: Path) -> Path:
+        return path.with_name(f"{path.name}.lock")
+    
+    def in_use(self, path: Path) -> t.ContextManager[bool]:
+        """
+        Mark the copy at `path` as in use while the `with` block runs, like
+        while a clone reads from it, so that `evict` doesn't remove it in the
+        meantime. Several processes can use the same copy at once, but it
+        can't be refreshed until they are done with it.
+        """
+        return locked(self._lock_path(path), shared=True)
+    
+    def _git(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [self.git, *args],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+    
+    def _is_copy(self, path: Path) -> bool:
+        return path.is_dir()
+    
+    def _size(self, path: Path) -> int:
+        return directory_size(path)
+    
+    def copies(self) -> t.List[Path]:
+        """
+        Get the paths to every copy in the cache, from the least to the most
+        recently used.
+        """
+        if not self.root.is_dir():
+            return []
+        paths = [
+            path for path in self.root.iterdir()
+            if path.suffix == self.SUFFIX and self._is_copy(path)
+        ]
+        return sorted(paths, key=lambda path: path.stat().st_mtime)
+    
+    def evict(self, keep: t.Iterable[Path] = ()) -> t.List[Path]:
+        """
+        Remove the least recently used copies until the cache is within
+        `max_size`. Does nothing if `max_size` is `None`. Copies that are in
+        use (see `in_use`) or being refreshed are skipped.
+        
+        Parameters
+        ----------
+        keep: Iterable[Path] = ()
+            Copies that must not be removed, like the one that is about to be
+            used.
+        
+        Returns
+        -------
+        List[Path]
+            The copies that were removed.
+        """
+        if self.max_size is None:
+            return []
+        keep = set(keep)
+        copies = self.copies()
+        sizes = {path: self._size(path) for path in copies}
+        total = sum(sizes.values())
+        removed = []
+        for path in copies:
+            if total <= self.max_size:
+                break
+            if path in keep:
+                continue
+            # Copies that are being refreshed or cloned from are skipped.
+            with locked(self._lock_path(path), blocking=False) as acquired:
+                if not acquired:
+                    continue
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                elif path.exists():
+                    path.unlink()
+            total -= sizes[path]
+            removed.append(path)
+        return removed
+
+
+class MirrorCache(RepositoryCache):
+    """
+    A directory of bare mirrors of remote repositories, keyed by their
+    normalized remote url.
+    
+    Clones borrow objects from the mirror of their remote repository (see
+    `quickclone.delegation.vcs.git.GitCloneCommand.use_mirror`), so only the
+    objects the mirror doesn't have yet are downloaded when the mirror is
+    refreshed.
+    
+    Parameters
+    ----------
+    root: Path = USER_MIRRORS_FOLDER
+        The directory storing the mirrors.
+    
+    See `RepositoryCache` for the other parameters.
+    """
+    
+    SUFFIX: str = ".git"
+    
+    def __init__(
+        self,
+        root: Path = USER_MIRRORS_FOLDER,
+        max_size: t.Optional[int] = None,
+        git: str = "git"
+    ) -> None:
+        super().__init__(root, max_size, git)
+    
+    @classmethod
+    def from_options(
+        cls,
+        options: t.Mapping[str, t.Any],
+        root: Path = USER_MIRRORS_FOLDER
+    ) -> MirrorCache:
+        """
+        Create a mirror cache from the `[options.mirrors]` table of a config
+        file. Missing options are taken from `DEFAULT_MIRROR_OPTIONS`.
+        
+        Mirrors are only removed to stay within `max_size` if `dissociate` is
+        set, because clones that don't dissociate keep borrowing objects from
+        their mirror and would break if it were removed.
+        """
+        def get(key: str) -> t.Any:
+            value = options.get(key)
+            return DEFAULT_MIRROR_OPTIONS[key] if value is None or value == "" else value
+        
+        max_size = parse_size(get("max_size")) if get("dissociate") else None
+        return cls(root, max_size)
+    
+    @classmethod
+    def from_configurator(
+        cls,
+        configs: Configurator,
+        root: Path = USER_MIRRORS_FOLDER
+    ) -> MirrorCache:
+        """
+        Create a mirror cache from the `options.mirrors` section of the user's
+        config.
+        """
+        return cls.from_options(
+            {
+                key: configs.from_dotted_string(f"options.mirrors.{key}")
+                for key in DEFAULT_MIRROR_OPTIONS
+            },
+            root
+        )
+    
+    def mirror(self, key: str, remote: str) -> Mirror:
+        """
+        Get the mirror of a remote repository. The mirror isn't created until
+        it is refreshed.
+        """
+        return Mirror(self, key, remote)
+    
+    def refresh(self, key: str, remote: str) -> bool:
+        """
+        Create the mirror of a remote repository, or fetch what it is missing
+        if it already exists, then remove the least recently used mirrors if
+        the cache is too large.
+        
+        Other processes refreshing the same mirror wait for this one to
+        finish. A mirror is cloned into a temporary directory first, so an
+        interrupted clone never leaves a broken mirror behind.
+        
+        Parameters
+        ----------
+        key: str
+            The normalized remote url identifying the repository.
+        
+        remote: str
+            The url to clone or fetch the mirror from.
+        
+        Returns
+        -------
+        bool
+            Whether the mirror exists afterwards. A mirror that exists but
+            couldn't be updated is still usable.
+        """
+        path = self.path_for(key)
+        with locked(self._lock_path(path)):
+            if (path / "HEAD").exists():
+                self._git("--git-dir", str(path), "remote", "set-url", "origin", remote)
+                self._git("--git-dir", str(path), "fetch", "--prune", "--quiet", "origin")
+            else:
+                temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                if temporary.exists():
+                    shutil.rmtree(temporary)
+                process = self._git("clone", "--mirror", "--quiet", remote, str(temporary))
+                if process.returncode != 0:
+                    shutil.rmtree(temporary, ignore_errors=True)
+                    return False
+                if path.exists():
+                    shutil.rmtree(path)
+                os.rename(temporary, path)
+            # The modification time of a mirror records when it was last used.
+            os.utime(path)
+        self.evict(keep={path})
+        return True
+    
+    def mirrors(self) -> t.List[Path]:
+        """
+        Get the paths to every mirror in the cache, from the least to the most
+        recently used.
+        """
+        return self.copies()
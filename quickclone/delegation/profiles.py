@@ -0,0 +1,315 @@
+from __future__ import annotations
+import fnmatch
+from functools import lru_cache
+import re
+import typing as t
+
+if t.TYPE_CHECKING:
+    from quickclone.config.configurator import Configurator
+    from quickclone.remote import BaseLocator
+
+
+__all__ = [
+    "PROFILE_OPTIONS",
+    "ProfileRule",
+    "ProfileMatch",
+    "ProfileMatcher",
+    "profile_args",
+    "profile_sparse",
+    "get_profile",
+    "find_profile"
+]
+
+
+PROFILE_OPTIONS: t.Set[str] = {"filter", "depth", "single_branch", "no_tags", "sparse", "args"}
+"""
+The options a clone profile can set:
+
+1. 'filter' (str): partial clone filter, like 'blob:none' (`--filter`).
+2. 'depth' (int): number of commits to clone (`--depth`).
+3. 'single_branch' (bool): only clone one branch (`--single-branch`).
+4. 'no_tags' (bool): don't clone tags (`--no-tags`).
+5. 'sparse' (List[str]): only check out these directories (see
+   `quickclone.delegation.vcs.git.GitCloneCommand.use_sparse`). This isn't
+   converted by `profile_args`.
+6. 'args' (List[str]): extra command line arguments, which are also passed to
+   version control systems other than git.
+"""
+
+
+class ProfileRule(object):
+    """
+    A rule applying a clone profile to the repositories whose normalized url
+    (see `quickclone.remote.normalize_remote`) matches a glob pattern, like
+    'github.com/my-org/*'. Like in `fnmatch`, '*' also matches '/'.
+    
+    Parameters
+    ----------
+    index: int
+        The position of the rule in the rule table, starting from 0.
+    
+    pattern: str
+        The glob pattern.
+    
+    profile: str
+        The name of the profile to apply.
+    """
+    
+    def __init__(self, index: int, pattern: str, profile: str) -> None:
+        self.index = index
+        self.pattern = pattern
+        self.profile = profile
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"index={repr(self.index)}, "
+            f"pattern={repr(self.pattern)}, "
+            f"profile={repr(self.profile)})"
+        )
+    
+    def __eq__(self, other: t.Any) -> bool:
+        if not isinstance(other, ProfileRule):
+            return NotImplemented
+        return (
+            self.index == other.index and
+            self.pattern == other.pattern and
+            self.profile == other.profile
+        )
+
+
+class ProfileMatch(object):
+    """
+    The rule matching a repository and the options of its profile.
+    """
+    
+    def __init__(self, rule: ProfileRule, options: t.Mapping[str, t.Any]) -> None:
+        self.rule = rule
+        self.options = options
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"rule={repr(self.rule)}, "
+            f"options={repr(self.options)})"
+        )
+    
+    def __str__(self) -> str:
+        if self.rule.index < 0:
+            return f"profile '{self.rule.profile}' (chosen explicitly)"
+        return (
+            f"rule {self.rule.index + 1} ('{self.rule.pattern}') "
+            f"-> profile '{self.rule.profile}'"
+        )
+
+
+class ProfileMatcher(object):
+    """
+    Finds the first rule in a rule table whose pattern matches a normalized
+    url.
+    
+    The patterns are compiled into one regular expression, so matching a url
+    takes one search no matter how many rules there are. Use `compile` to
+    reuse matchers for the same rule table.
+    
+    Parameters
+    ----------
+    rules: Sequence[ProfileRule]
+        The rules in order of priority.
+    """
+    
+    def __init__(self, rules: t.Sequence[ProfileRule]) -> None:
+        self.rules = list(rules)
+        if len(self.rules) == 0:
+            self.regex: t.Optional[t.Pattern[str]] = None
+        else:
+            self.regex = re.compile("|".join(
+                f"(?P<r{i}>{fnmatch.translate(rule.pattern)})"
+                for i, rule in enumerate(self.rules)
+            ))
+    
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rules={repr(self.rules)})"
+    
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def compile(rules: t.Tuple[t.Tuple[str, str], ...]) -> ProfileMatcher:
+        """
+        Get the matcher for a rule table given as (pattern, profile) pairs.
+        Matchers are cached, so the patterns are only compiled once.
+        """
+        return ProfileMatcher([
+            ProfileRule(i, pattern, profile)
+            for i, (pattern, profile) in enumerate(rules)
+        ])
+    
+    def match(self, key: str) -> t.Optional[ProfileRule]:
+        """
+        Find the first rule matching a normalized url.
+        
+        Parameters
+        ----------
+        key: str
+            The normalized url, like 'github.com/RenoirTan/QuickClone'.
+        
+        Returns
+        -------
+        Optional[ProfileRule]
+            The matching rule with the lowest index or `None` if no rules
+            match.
+        """
+        if self.regex is None:
+            return None
+        # Each alternative ends with '\Z', so the leftmost alternative that
+        # matches the whole url wins.
+        match = self.regex.match(key)
+        if match is None or match.lastgroup is None:
+            return None
+        return self.rules[int(match.lastgroup[1:])]
+
+
+def profile_args(options: t.Mapping[str, t.Any], vcs: str = "git") -> t.List[str]:
+    """
+    Convert the options of a clone profile into command line arguments.
+    
+    Parameters
+    ----------
+    options: Mapping[str, Any]
+        The profile's options. See `PROFILE_OPTIONS`.
+    
+    vcs: str = "git"
+        The version control system. Only 'args' applies to version control
+        systems other than git.
+    
+    Raises
+    ------
+    ValueError
+        If the profile has an unknown option or an option has an invalid
+        value.
+    
+    Returns
+    -------
+    List[str]
+        The command line arguments.
+    """
+    unknown = set(options) - PROFILE_OPTIONS
+    if len(unknown) > 0:
+        raise ValueError(f"unknown profile options: {', '.join(sorted(unknown))}")
+    args: t.List[str] = []
+    if vcs == "git":
+        if "filter" in options:
+            args.append(f"--filter={options['filter']}")
+        if "depth" in options:
+            depth = options["depth"]
+            if isinstance(depth, bool) or not isinstance(depth, int) or depth < 1:
+                raise ValueError(f"depth must be a positive integer, got {repr(depth)}")
+            args.extend(["--depth", str(depth)])
+        if options.get("single_branch") is True:
+            args.append("--single-branch")
+        if options.get("no_tags") is True:
+            args.append("--no-tags")
+    extra = options.get("args", [])
+    if not isinstance(extra, list) or not all(isinstance(arg, str) for arg in extra):
+        raise ValueError(f"args must be a list of strings, got {repr(extra)}")
+    args.extend(extra)
+    return args
+
+
+def profile_sparse(options: t.Mapping[str, t.Any]) -> t.Optional[t.List[str]]:
+    """
+    Get the directories a clone profile checks out, or `None` if the profile
+    doesn't use a sparse checkout.
+    
+    Raises
+    ------
+    ValueError
+        If 'sparse' isn't a list of strings.
+    """
+    sparse = options.get("sparse")
+    if sparse is None:
+        return None
+    if not isinstance(sparse, list) or not all(isinstance(path, str) for path in sparse):
+        raise ValueError(f"sparse must be a list of strings, got {repr(sparse)}")
+    return sparse
+
+
+def get_profile(configs: Configurator, name: str) -> ProfileMatch:
+    """
+    Get a clone profile by its name, regardless of the rules.
+    
+    Raises
+    ------
+    ValueError
+        If the profile doesn't exist.
+    """
+    options = configs[["options", "profiles", name]]
+    if not isinstance(options, dict):
+        raise ValueError(f"unknown profile: {name}")
+    return ProfileMatch(ProfileRule(-1, "", name), options)
+
+
+def find_profile(
+    configs: Configurator,
+    remote: BaseLocator,
+    ignored: t.Optional[t.Set[str]] = None,
+    name: t.Optional[str] = None
+) -> t.Optional[ProfileMatch]:
+    """
+    Find the clone profile applying to a remote repository according to the
+    `options.rules` table of the user's config.
+    
+    Parameters
+    ----------
+    configs: Configurator
+        Configuration object.
+    
+    remote: BaseLocator
+        The locator of the remote repository.
+    
+    ignored: Optional[Set[str]] = None
+        Set of config options to ignore. If 'options.rules' is ignored, no
+        profile applies.
+    
+    name: Optional[str] = None
+        The name of a profile to use instead of the one chosen by the rules
+        (like `qkln --profile NAME`).
+    
+    Raises
+    ------
+    ValueError
+        If the rule table is invalid or a rule refers to a profile that
+        doesn't exist.
+    
+    Returns
+    -------
+    Optional[ProfileMatch]
+        The first matching rule and its profile's options, or `None` if no
+        rules match.
+    """
+    from quickclone.remote import normalize_remote
+    
+    if name is not None:
+        return get_profile(configs, name)
+    if ignored is not None and "options.rules" in ignored:
+        return None
+    table = configs.from_dotted_string("options.rules")
+    if table == "" or table is None:
+        return None
+    if not isinstance(table, list):
+        raise ValueError("options.rules must be an array of tables")
+    rules = []
+    for i, rule in enumerate(table):
+        if (
+            not isinstance(rule, dict) or
+            not isinstance(rule.get("pattern"), str) or
+            not isinstance(rule.get("profile"), str)
+        ):
+            raise ValueError(f"rule {i + 1} in options.rules needs a 'pattern' and a 'profile'")
+        rules.append((rule["pattern"], rule["profile"]))
+    rule = ProfileMatcher.compile(tuple(rules)).match(normalize_remote(remote))
+    if rule is None:
+        return None
+    options = configs[["options", "profiles", rule.profile]]
+    if not isinstance(options, dict):
+        raise ValueError(f"rule {rule.index + 1} refers to an unknown profile: {rule.profile}")
+    return ProfileMatch(rule, options)
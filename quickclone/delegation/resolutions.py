@@ -0,0 +1,313 @@
+from __future__ import annotations
+from collections import OrderedDict
+import hashlib
+import json
+from pathlib import Path
+import typing as t
+
+from quickclone import VERSION
+from quickclone.config.common import USER_RESOLUTIONS_CACHE_FILE
+from quickclone.config.files import atomic_write_text, locked
+from quickclone.remote.locators import UniformResourceLocator
+
+if t.TYPE_CHECKING:
+    from quickclone.config.configurator import Configurator
+
+
+__all__ = [
+    "DEFAULT_RESOLUTION_OPTIONS",
+    "Resolution",
+    "ResolutionCache",
+    "config_hash"
+]
+
+
+DEFAULT_RESOLUTION_OPTIONS: t.Dict[str, t.Any] = {
+    "enabled": True,
+    "max_entries": 1024
+}
+"""
+The options used by `ResolutionCache.from_options` when they aren't set.
+"""
+
+
+def config_hash(configs: Configurator) -> str:
+    """
+    Hash the contents of the user's config, the default config and the version
+    of QuickClone, which together decide what a remote url typed by the user
+    resolves to.
+    """
+    from quickclone.config.configurator import get_default_configuration
+    
+    contents = json.dumps(
+        [VERSION, configs.configuration, get_default_configuration().configuration],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(contents.encode("utf-8")).hexdigest()
+
+
+class Resolution(object):
+    """
+    What a remote url typed by the user resolves to.
+    
+    Parameters
+    ----------
+    parts: Mapping[str, Any]
+        The parts of the complete locator of the remote repository, as given
+        by `dict(built_url)`.
+    
+    final_url: str
+        The url passed to the version control system.
+    
+    dest_path: str
+        The path the repository is cloned to if the user doesn't choose one.
+    """
+    
+    def __init__(self, parts: t.Mapping[str, t.Any], final_url: str, dest_path: str) -> None:
+        self.parts = dict(parts)
+        self.final_url = final_url
+        self.dest_path = dest_path
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"parts={repr(self.parts)}, "
+            f"final_url={repr(self.final_url)}, "
+            f"dest_path={repr(self.dest_path)})"
+        )
+    
+    def __eq__(self, other: t.Any) -> bool:
+        if not isinstance(other, Resolution):
+            return NotImplemented
+        return (
+            self.parts == other.parts and
+            self.final_url == other.final_url and
+            self.dest_path == other.dest_path
+        )
+    
+    def locator(self) -> UniformResourceLocator:
+        """
+        Rebuild the complete locator of the remote repository without parsing
+        anything. Each call returns a new locator.
+        """
+        return UniformResourceLocator(**self.parts)
+    
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        """
+        Convert the resolution into a JSON-serializable dictionary.
+        """
+        return {"parts": self.parts, "final_url": self.final_url, "dest_path": self.dest_path}
+    
+    @classmethod
+    def from_dict(cls, data: t.Mapping[str, t.Any]) -> Resolution:
+        """
+        Load a resolution stored by `Resolution.to_dict`.
+        
+        Raises
+        ------
+        KeyError, TypeError
+            If `data` is missing a field or isn't a mapping.
+        """
+        return cls(data["parts"], data["final_url"], data["dest_path"])
+
+
+class ResolutionCache(object):
+    """
+    A least recently used cache of what remote urls typed by the user resolve
+    to, so that the same shorthands (like 'RenoirTan/QuickClone') aren't
+    parsed and completed with the defaults in the config again and again.
+    
+    Entries are keyed by the remote url, the hash of the config (see
+    `config_hash`), the version control system and the set of ignored
+    options, so editing the config makes the old entries unreachable. They
+    are kept in memory for the lifetime of the cache and are only read from
+    and written back to `path` by `load` and `dump`.
+    
+    Parameters
+    ----------
+    path: Path = USER_RESOLUTIONS_CACHE_FILE
+        The file storing the cache between runs.
+    
+    max_entries: int = 1024
+        The number of entries kept before the least recently used ones are
+        evicted.
+    
+    config_hash: str = ""
+        The hash of the config used to resolve the urls.
+    
+    Raises
+    ------
+    ValueError
+        If `max_entries` is less than 1.
+    """
+    
+    def __init__(
+        self,
+        path: Path = USER_RESOLUTIONS_CACHE_FILE,
+        max_entries: int = 1024,
+        config_hash: str = ""
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, not {max_entries}")
+        self.path = path
+        self.max_entries = max_entries
+        self.config_hash = config_hash
+        self._entries: t.OrderedDict[str, Resolution] = OrderedDict()
+        self._loaded = False
+        self._changed = False
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"path={repr(self.path)}, "
+            f"max_entries={repr(self.max_entries)}, "
+            f"config_hash={repr(self.config_hash)})"
+        )
+    
+    def __len__(self) -> int:
+        self.load()
+        return len(self._entries)
+    
+    @classmethod
+    def from_options(
+        cls,
+        options: t.Mapping[str, t.Any],
+        config_hash: str = "",
+        path: Path = USER_RESOLUTIONS_CACHE_FILE
+    ) -> t.Optional[ResolutionCache]:
+        """
+        Create a resolution cache from the `[options.resolutions]` table of a
+        config file. Missing options are taken from
+        `DEFAULT_RESOLUTION_OPTIONS`. Returns `None` if the cache is disabled.
+        """
+        def get(key: str) -> t.Any:
+            value = options.get(key)
+            return DEFAULT_RESOLUTION_OPTIONS[key] if value is None or value == "" else value
+        
+        if get("enabled") is not True:
+            return None
+        return cls(path, get("max_entries"), config_hash)
+    
+    @classmethod
+    def from_configurator(
+        cls,
+        configs: Configurator,
+        ignored: t.Optional[t.Set[str]] = None,
+        path: Path = USER_RESOLUTIONS_CACHE_FILE
+    ) -> t.Optional[ResolutionCache]:
+        """
+        Create a resolution cache from the `options.resolutions` section of
+        the user's config. Returns `None` if the cache is disabled or
+        `options.resolutions.enabled` is in `ignored`.
+        """
+        if ignored is not None and "options.resolutions.enabled" in ignored:
+            return None
+        return cls.from_options(
+            {
+                key: configs.from_dotted_string(f"options.resolutions.{key}")
+                for key in DEFAULT_RESOLUTION_OPTIONS
+            },
+            config_hash(configs),
+            path
+        )
+    
+    def key(self, remote_url: str, vcs: str, ignored: t.Optional[t.Iterable[str]] = None) -> str:
+        """
+        Get the key of the entry storing what `remote_url` resolves to.
+        """
+        return json.dumps([remote_url, self.config_hash, vcs, sorted(ignored or [])])
+    
+    def get(
+        self,
+        remote_url: str,
+        vcs: str,
+        ignored: t.Optional[t.Iterable[str]] = None
+    ) -> t.Optional[Resolution]:
+        """
+        Get what `remote_url` resolves to, or `None` if it isn't cached. The
+        entry becomes the most recently used one.
+        """
+        self.load()
+        key = self.key(remote_url, vcs, ignored)
+        resolution = self._entries.get(key)
+        if resolution is not None:
+            self._entries.move_to_end(key)
+        return resolution
+    
+    def put(
+        self,
+        remote_url: str,
+        vcs: str,
+        ignored: t.Optional[t.Iterable[str]],
+        resolution: Resolution
+    ) -> None:
+        """
+        Store what `remote_url` resolves to, evicting the least recently used
+        entries if there are more than `max_entries` of them.
+        """
+        self.load()
+        key = self.key(remote_url, vcs, ignored)
+        self._entries[key] = resolution
+        self._entries.move_to_end(key)
+        self._evict(self._entries)
+        self._changed = True
+    
+    def load(self) -> None:
+        """
+        Read the entries stored in `path` the first time this is called.
+        Entries that are already in memory take precedence.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        self._entries = self._merge(self._read())
+    
+    def dump(self) -> bool:
+        """
+        Write the entries back to `path` if they changed. Entries written by
+        other processes in the meantime are kept, but the ones in memory are
+        treated as more recently used.
+        
+        Returns
+        -------
+        bool
+            Whether the file could be written. Failing to write it is harmless
+            since the urls are simply resolved again next time.
+        """
+        if not self._changed:
+            return True
+        try:
+            with locked(self.path.with_suffix(".lock")):
+                entries = self._merge(self._read())
+                atomic_write_text(self.path, json.dumps({
+                    "version": 1,
+                    "entries": [[key, resolution.to_dict()] for key, resolution in entries.items()]
+                }))
+        except OSError:
+            return False
+        self._changed = False
+        return True
+    
+    def _read(self) -> t.OrderedDict[str, Resolution]:
+        # A missing, unreadable or corrupt file is treated like an empty cache.
+        entries: t.OrderedDict[str, Resolution] = OrderedDict()
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for key, resolution in data["entries"]:
+                entries[key] = Resolution.from_dict(resolution)
+        except (OSError, ValueError, KeyError, TypeError):
+            return OrderedDict()
+        return entries
+    
+    def _merge(self, entries: t.OrderedDict[str, Resolution]) -> t.OrderedDict[str, Resolution]:
+        # The entries in memory are more recent than the ones in `entries`.
+        for key, resolution in self._entries.items():
+            entries.pop(key, None)
+            entries[key] = resolution
+        self._evict(entries)
+        return entries
+    
+    def _evict(self, entries: t.OrderedDict[str, Resolution]) -> None:
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
@@ -0,0 +1,344 @@
+from __future__ import annotations
+from collections import deque
+import os
+from pathlib import Path
+import random
+import re
+import shutil
+import subprocess
+import sys
+import typing as t
+
+from .vcs.common import BaseCommand
+
+if t.TYPE_CHECKING:
+    from quickclone.config.configurator import Configurator
+
+
+__all__ = [
+    "TRANSIENT_PATTERNS",
+    "PERMANENT_PATTERNS",
+    "RetryPolicy",
+    "remove_partial_clone",
+    "run_teeing_stderr"
+]
+
+
+TRANSIENT_PATTERNS: t.List[str] = [
+    r"connection reset",
+    r"connection refused",
+    r"connection timed out",
+    r"operation timed out",
+    r"early eof",
+    r"unexpected disconnect",
+    r"the remote end hung up unexpectedly",
+    r"rpc failed",
+    r"transfer closed with outstanding read data remaining",
+    r"the requested url returned error: 5\d\d",
+    r"http(?: error)? 5\d\d",
+    r"\b(?:502|503|504) (?:bad gateway|service unavailable|gateway time-?out)",
+    r"temporary failure in name resolution",
+    r"gnutls_handshake\(\) failed",
+    r"ssl_read|ssl_connect|ssl_error_syscall",
+    r"index-pack failed",
+    r"too many requests|rate limit",
+]
+"""
+Patterns (matched case-insensitively) in a version control system's error
+output that indicate a failure which might not happen again, like a dropped
+connection or an overloaded server.
+"""
+
+PERMANENT_PATTERNS: t.List[str] = [
+    r"repository not found",
+    r"does not appear to be a git repository",
+    r"authentication failed",
+    r"permission denied",
+    r"already exists and is not an empty directory",
+    r"the requested url returned error: 4(?!29)\d\d",
+    r"could not resolve host",
+]
+"""
+Patterns in a version control system's error output that indicate a failure
+which retrying won't fix. These take precedence over `TRANSIENT_PATTERNS`,
+since git often reports 'the remote end hung up unexpectedly' after the actual
+reason.
+"""
+
+DEFAULT_RETRY_OPTIONS: t.Dict[str, t.Any] = {
+    "attempts": 3,
+    "base_delay": 1.0,
+    "max_delay": 30.0,
+    "hosts": {}
+}
+"""
+The options used by `RetryPolicy.from_options` when they aren't set.
+"""
+
+OUTPUT_TAIL_LENGTH: int = 64 * 1024
+"""
+How many bytes at the end of a command's error output `run_teeing_stderr`
+keeps for classifying failures.
+"""
+
+
+class RetryPolicy(object):
+    """
+    Decides whether a failed clone should be tried again and how long to wait
+    before doing so.
+    
+    Failures are retried only if the command's error output matches one of
+    `transient_patterns` and none of `permanent_patterns`. The delay before
+    the n-th retry is chosen uniformly between 0 and
+    `min(max_delay, base_delay * 2 ** (n - 1))` ("full jitter"), so that many
+    clones failing at once don't all retry at the same time.
+    
+    Parameters
+    ----------
+    attempts: int = 3
+        The maximum number of times a clone is attempted, including the first
+        attempt. 1 disables retries.
+    
+    base_delay: float = 1.0
+        The maximum delay in seconds before the first retry.
+    
+    max_delay: float = 30.0
+        The upper limit of the delay in seconds before any retry.
+    
+    host_attempts: Optional[Mapping[str, int]] = None
+        The maximum number of attempts for clones from certain hosts, which
+        overrides `attempts`.
+    
+    transient_patterns: Optional[Iterable[str]] = None
+        Regular expressions matching transient failures. Defaults to
+        `TRANSIENT_PATTERNS`.
+    
+    permanent_patterns: Optional[Iterable[str]] = None
+        Regular expressions matching permanent failures. Defaults to
+        `PERMANENT_PATTERNS`.
+    
+    rng: Optional[random.Random] = None
+        Source of randomness for the jitter.
+    
+    Raises
+    ------
+    ValueError
+        If an attempt count is less than 1 or a delay is negative.
+    """
+    
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        host_attempts: t.Optional[t.Mapping[str, int]] = None,
+        transient_patterns: t.Optional[t.Iterable[str]] = None,
+        permanent_patterns: t.Optional[t.Iterable[str]] = None,
+        rng: t.Optional[random.Random] = None
+    ) -> None:
+        host_attempts = {} if host_attempts is None else host_attempts
+        for count in [attempts, *host_attempts.values()]:
+            if int(count) < 1:
+                raise ValueError(f"attempts must be at least 1, got {count}")
+        if base_delay < 0 or max_delay < 0:
+            raise ValueError("delays can't be negative")
+        self.attempts = int(attempts)
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.host_attempts = {host.lower(): int(count) for host, count in host_attempts.items()}
+        self.transient_patterns = list(
+            TRANSIENT_PATTERNS if transient_patterns is None else transient_patterns
+        )
+        self.permanent_patterns = list(
+            PERMANENT_PATTERNS if permanent_patterns is None else permanent_patterns
+        )
+        self._transient = re.compile("|".join(self.transient_patterns), re.IGNORECASE)
+        self._permanent = re.compile("|".join(self.permanent_patterns), re.IGNORECASE)
+        self.rng = random.Random() if rng is None else rng
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"attempts={repr(self.attempts)}, "
+            f"base_delay={repr(self.base_delay)}, "
+            f"max_delay={repr(self.max_delay)}, "
+            f"host_attempts={repr(self.host_attempts)})"
+        )
+    
+    @classmethod
+    def from_options(cls, options: t.Mapping[str, t.Any]) -> RetryPolicy:
+        """
+        Create a retry policy from the `[options.retry]` table of a config
+        file. Missing options are taken from `DEFAULT_RETRY_OPTIONS`.
+        """
+        def get(key: str) -> t.Any:
+            value = options.get(key)
+            return DEFAULT_RETRY_OPTIONS[key] if value is None or value == "" else value
+        
+        return cls(
+            attempts=get("attempts"),
+            base_delay=get("base_delay"),
+            max_delay=get("max_delay"),
+            host_attempts=get("hosts")
+        )
+    
+    @classmethod
+    def from_configurator(cls, configs: Configurator) -> RetryPolicy:
+        """
+        Create a retry policy from the `options.retry` section of the user's
+        config.
+        """
+        return cls.from_options({
+            key: configs.from_dotted_string(f"options.retry.{key}")
+            for key in DEFAULT_RETRY_OPTIONS
+        })
+    
+    def attempts_for(self, host: str = "") -> int:
+        """
+        Get the maximum number of attempts for clones from `host`.
+        """
+        return self.host_attempts.get(host.lower(), self.attempts)
+    
+    def is_transient(self, returncode: t.Optional[int], output: str) -> bool:
+        """
+        Check whether a failed command might succeed if it is run again.
+        
+        Parameters
+        ----------
+        returncode: Optional[int]
+            The exit code of the command or `None` if it couldn't be started.
+            Commands that couldn't be started or were killed by a signal are
+            never retried.
+        
+        output: str
+            The error output of the command.
+        
+        Returns
+        -------
+        bool
+            Whether the failure is transient.
+        """
+        if returncode is None or returncode <= 0:
+            return False
+        if self._permanent.search(output) is not None:
+            return False
+        return self._transient.search(output) is not None
+    
+    def should_retry(
+        self,
+        attempt: int,
+        returncode: t.Optional[int],
+        output: str,
+        host: str = ""
+    ) -> bool:
+        """
+        Check whether a command should be run again after its `attempt`-th
+        attempt (starting from 1) failed.
+        """
+        return attempt < self.attempts_for(host) and self.is_transient(returncode, output)
+    
+    def delay(self, attempt: int) -> float:
+        """
+        Get how long to wait in seconds after the `attempt`-th attempt
+        (starting from 1) before trying again.
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self.rng.uniform(0, ceiling)
+
+
+def remove_partial_clone(dest_path: str, existed: bool) -> None:
+    """
+    Remove what a failed clone left behind at `dest_path` so that it can be
+    tried again.
+    
+    Parameters
+    ----------
+    dest_path: str
+        The destination of the clone.
+    
+    existed: bool
+        Whether `dest_path` existed before the first attempt. Since version
+        control systems only clone into empty directories, an existing
+        directory is emptied instead of being removed.
+    """
+    if dest_path == "":
+        return
+    path = Path(dest_path)
+    if not path.is_dir():
+        return
+    if not existed:
+        shutil.rmtree(path)
+        return
+    for child in path.iterdir():
+        if child.is_dir() and not child.is_symlink():
+            shutil.rmtree(child)
+        else:
+            child.unlink()
+
+
+def run_teeing_stderr(command: BaseCommand) -> t.Tuple[int, str]:
+    """
+    Run a command, copying its error output to this process's error output
+    while keeping the end of it for `RetryPolicy.is_transient`. The command's
+    standard input and output are inherited.
+    
+    Like `BaseCommand.run`, this calls `command.prepare` first. Since git
+    only shows its progress when its error output is a terminal, the
+    command's `PROGRESS_ARGS` are added if this process's error output is a
+    terminal.
+    
+    Parameters
+    ----------
+    command: BaseCommand
+        The command to run.
+    
+    Raises
+    ------
+    OSError
+        If the command could not be started.
+    
+    Returns
+    -------
+    Tuple[int, str]
+        The exit code of the command (or of its first follow-up command that
+        failed, see `BaseCommand.follow_up`) and the last `OUTPUT_TAIL_LENGTH`
+        bytes of its error output.
+    """
+    command.prepare()
+    cl = command.format_command_list()
+    if sys.stderr.isatty():
+        cl.extend(getattr(command, "PROGRESS_ARGS", []))
+    try:
+        returncode, output = _run_teeing_stderr(cl)
+        if returncode == 0:
+            for step in command.follow_up():
+                returncode, output = _run_teeing_stderr(step)
+                if returncode != 0:
+                    break
+    finally:
+        command.finish()
+    return returncode, output
+
+
+def _run_teeing_stderr(cl: t.List[str]) -> t.Tuple[int, str]:
+    process = subprocess.Popen(cl, stderr=subprocess.PIPE)
+    assert process.stderr is not None
+    tail: t.Deque[bytes] = deque()
+    tail_length = 0
+    stderr = getattr(sys.stderr, "buffer", None)
+    with process.stderr:
+        while True:
+            chunk = os.read(process.stderr.fileno(), 4096)
+            if chunk == b"":
+                break
+            if stderr is not None:
+                stderr.write(chunk)
+                stderr.flush()
+            else:
+                sys.stderr.write(chunk.decode(errors="replace"))
+            tail.append(chunk)
+            tail_length += len(chunk)
+            while tail_length - len(tail[0]) >= OUTPUT_TAIL_LENGTH:
+                tail_length -= len(tail.popleft())
+    returncode = process.wait()
+    return returncode, b"".join(tail).decode(errors="replace")
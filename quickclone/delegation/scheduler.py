@@ -0,0 +1,141 @@
+from __future__ import annotations
+import asyncio
+import typing as t
+
+from .batch import DEFAULT_JOBS, CloneJob, CloneResult
+
+
+__all__ = ["CloneScheduler"]
+
+
+class CloneScheduler(object):
+    """
+    Runs clone jobs concurrently on an asyncio event loop, with a limit on the
+    number of clones running at the same time and a separate limit on the
+    number of clones from the same host, so that a batch doesn't hammer one
+    server.
+    
+    Parameters
+    ----------
+    max_jobs: int = DEFAULT_JOBS
+        The maximum number of clones running at the same time.
+    
+    max_jobs_per_host: Optional[int] = None
+        The maximum number of clones from the same host running at the same
+        time. If `None`, only `max_jobs` applies.
+    
+    Raises
+    ------
+    ValueError
+        If either limit is less than 1.
+    """
+    
+    def __init__(
+        self,
+        max_jobs: int = DEFAULT_JOBS,
+        max_jobs_per_host: t.Optional[int] = None
+    ) -> None:
+        if max_jobs < 1:
+            raise ValueError(f"max_jobs must be at least 1, got {max_jobs}")
+        if max_jobs_per_host is not None and max_jobs_per_host < 1:
+            raise ValueError(f"max_jobs_per_host must be at least 1, got {max_jobs_per_host}")
+        self.max_jobs = max_jobs
+        self.max_jobs_per_host = max_jobs_per_host
+        # The semaphores are created on first use, since before Python 3.10
+        # they are bound to the event loop that is current when they are
+        # created.
+        self._semaphore: t.Optional[asyncio.Semaphore] = None
+        self._host_semaphores: t.Dict[str, asyncio.Semaphore] = {}
+        self._tasks: t.Set[asyncio.Future] = set()
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"max_jobs={repr(self.max_jobs)}, "
+            f"max_jobs_per_host={repr(self.max_jobs_per_host)})"
+        )
+    
+    @staticmethod
+    def host_of(job: CloneJob) -> str:
+        """
+        Get the key used to limit the number of clones from the same host as
+        `job`.
+        """
+        return str(job.details.get("host", "")).lower()
+    
+    def _global_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_jobs)
+        return self._semaphore
+    
+    def _host_semaphore(self, host: str) -> t.Optional[asyncio.Semaphore]:
+        if self.max_jobs_per_host is None:
+            return None
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_jobs_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+    
+    async def run(self, job: CloneJob) -> CloneResult:
+        """
+        Run a clone job once both its host and the scheduler have a free slot.
+        
+        The host's slot is taken first, so that jobs waiting for a busy host
+        don't hold on to slots that jobs for other hosts could use.
+        """
+        if job.command is None:
+            return await job.run_async()
+        host_semaphore = self._host_semaphore(self.host_of(job))
+        if host_semaphore is None:
+            async with self._global_semaphore():
+                return await job.run_async()
+        async with host_semaphore:
+            async with self._global_semaphore():
+                return await job.run_async()
+    
+    async def as_completed(self, jobs: t.Iterable[CloneJob]) -> t.AsyncIterator[CloneResult]:
+        """
+        Run clone jobs and yield their results in the order they finish.
+        
+        If the caller stops iterating early (or the task iterating is
+        cancelled), the jobs that haven't finished are cancelled, which
+        terminates their clone commands.
+        
+        Parameters
+        ----------
+        jobs: Iterable[CloneJob]
+            The jobs to run.
+        
+        Returns
+        -------
+        AsyncIterator[CloneResult]
+            The results of the jobs.
+        """
+        tasks = [asyncio.ensure_future(self.run(job)) for job in jobs]
+        self._tasks.update(tasks)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._tasks.difference_update(tasks)
+    
+    def cancel(self) -> int:
+        """
+        Cancel every job that is waiting or running. This must be called from
+        the thread running the event loop (use `loop.call_soon_threadsafe`
+        from other threads).
+        
+        Returns
+        -------
+        int
+            The number of jobs that were cancelled.
+        """
+        count = 0
+        for task in list(self._tasks):
+            if task.cancel():
+                count += 1
+        return count
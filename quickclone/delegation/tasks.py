@@ -1,15 +1,39 @@
+import os
 import typing as t
 
 from quickclone.config.configurator import SmartConfigurator
-from quickclone.local import local_dest_path
-from quickclone.remote import UniformResourceLocator, remote_to_string
+from quickclone.local import git_remote_url, local_dest_path
+from quickclone.remote import (
+    DirtyLocator,
+    UniformResourceLocator,
+    normalize_path,
+    normalize_remote,
+    remote_to_string
+)
 
 from .errors import InvalidVcsError
+from .profiles import find_profile, profile_args, profile_sparse
+from .resolutions import Resolution, ResolutionCache
 from .vcs.common import Command
-from .vcs.git import GitCloneCommand
+from .vcs.git import GitCloneCommand, GitUpdateCommand, GitWorktreeCommand
 from .vcs.mercurial import MercurialCloneCommand
 
 
+EXISTING_MODES: t.Set[str] = {"update", "clone"}
+"""
+What `create_clone_command` can do when the destination already holds a
+clone of the remote repository: 'update' it with a fetch and a fast-forward,
+or 'clone' anyway (which makes git fail).
+"""
+
+
+LOCAL_CLONE_SCAN_LIMIT: int = 64
+"""
+How many of the most recent clones in the history `find_local_clone` checks
+for a clone of the remote repository.
+"""
+
+
 def create_clone_command(
     vcs: str,
     configs: SmartConfigurator,
@@ -17,7 +41,13 @@ def create_clone_command(
     dest_path: str = "",
     cla_list: t.Optional[t.Iterable[str]] = None,
     cla_dict: t.Optional[t.Mapping[str, str]] = None,
-    ignored: t.Optional[t.Set[str]] = None
+    ignored: t.Optional[t.Set[str]] = None,
+    sparse: t.Optional[t.Iterable[str]] = None,
+    profile_name: t.Optional[str] = None,
+    existing: t.Optional[str] = None,
+    worktree: bool = False,
+    resolution: t.Optional[Resolution] = None,
+    local_clones: t.Optional[t.Dict[str, t.List[str]]] = None
 ) -> Command:
     """
     Create a clone command for a version control system.
@@ -47,15 +77,60 @@ def create_clone_command(
     ignored: Set[str] | None = None
         Set of config options to ignore.
     
+    sparse: Iterable[str] | None = None
+        The directories to check out in a sparse checkout, which override the
+        ones from the clone profile. Only git supports sparse checkouts.
+    
+    profile_name: str | None = None
+        The name of the clone profile to use instead of the one chosen by the
+        rules in the config.
+    
+    existing: str | None = None
+        What to do if the destination already holds a git clone of the remote
+        repository (see `EXISTING_MODES`). If `None`, `options.local.existing`
+        is used.
+    
+    worktree: bool = False
+        Whether to check out the remote repository as a worktree of a bare
+        repository shared by all of its checkouts (see
+        `quickclone.delegation.vcs.git.GitWorktreeCommand`). The bare
+        repository is kept next to the repository's default location in
+        `options.local.remotes_dir`, with a '.git' suffix.
+    
+    resolution: Resolution | None = None
+        What `built_url` resolved to (see `resolve_locator`), so that the url
+        passed to the version control system and the default destination
+        aren't worked out again.
+    
+    local_clones: Dict[str, List[str]] | None = None
+        The clones of each remote repository found so far, shared by the
+        commands of a batch. See `find_local_clone`.
+    
     Raises
     ------
     InvalidVcsError
         If `vcs` is invalid or not supported.
     
+    ValueError
+        If the clone profile (see
+        `quickclone.delegation.profiles.find_profile`) is invalid, a sparse
+        checkout is requested for a version control system other than git,
+        `existing` is invalid, or a worktree is requested for a version control
+        system other than git, with a sparse checkout or without
+        `options.local.remotes_dir`.
+    
     Returns
     -------
     Command
-        The command used to clone the remote repository.
+        The command used to clone the remote repository, including the
+        arguments of the matching clone profile, or a
+        `quickclone.delegation.vcs.git.GitUpdateCommand` if the destination
+        already holds a clone which should be updated. If
+        `options.local.reuse_clones` is set and another clone of the remote
+        repository is found (see `find_local_clone`), git clones from it
+        instead of the remote repository. Otherwise, git borrows objects from
+        a mirror if `options.mirrors.enabled` is set, or starts from a bundle
+        if `options.bundles.enabled` is set and the bundle exists.
     """
     if cla_list is None:
         cla_list = list()
@@ -64,28 +139,428 @@ def create_clone_command(
     if ignored is None:
         ignored = set()
     
+    if resolution is None:
+        resolution = resolve_built_url(vcs, configs, built_url, ignored)
+    final_url = resolution.final_url
+    profile = find_profile(configs, built_url, ignored, profile_name)
+    if profile is not None:
+        # Arguments from the command line come last so that they win.
+        cla_list = [*profile_args(profile.options, vcs), *cla_list]
+        if sparse is None:
+            sparse = profile_sparse(profile.options)
+    if dest_path == "":
+        dest_path = resolution.dest_path
+    else:
+        dest_path = local_dest_path(
+            dest_path,
+            configs.from_dotted_string("options.local.remotes_dir"),
+            built_url.get_host(),
+            built_url.get_path(),
+            "options.local.remotes_dir" in ignored
+        )
+    
+    command = create_clone_command_with_processed(
+        vcs,
+        configs,
+        final_url,
+        dest_path,
+        cla_list,
+        cla_dict,
+        ignored
+    )
+    if existing is None:
+        existing = (
+            "clone" if "options.local.existing" in ignored
+            else configs.from_dotted_string("options.local.existing")
+        )
+    if existing not in EXISTING_MODES:
+        raise ValueError(f"invalid value for options.local.existing: {existing}")
+    if (
+        existing == "update" and
+        isinstance(command, GitCloneCommand) and
+        is_clone_of(command.clone_path(), built_url)
+    ):
+        # The profile's arguments are meant for `git clone`, not `git fetch`.
+        return GitUpdateCommand(final_url, command.clone_path())
+    if worktree:
+        return create_worktree_command(
+            vcs,
+            configs,
+            built_url,
+            final_url,
+            dest_path,
+            cla_list,
+            cla_dict,
+            ignored,
+            sparse
+        )
+    local_source = None
+    if (
+        isinstance(command, GitCloneCommand) and
+        configs.from_dotted_string("options.local.reuse_clones") is True and
+        "options.local.reuse_clones" not in ignored
+    ):
+        local_source = find_local_clone(
+            configs,
+            built_url,
+            command.clone_path(),
+            ignored,
+            local_clones
+        )
+    if local_source is not None:
+        command.use_local(local_source)
+    elif (
+        isinstance(command, GitCloneCommand) and
+        configs.from_dotted_string("options.mirrors.enabled") is True and
+        "options.mirrors.enabled" not in ignored
+    ):
+        from .mirrors import MirrorCache
+        
+        mirrors = MirrorCache.from_configurator(configs)
+        command.use_mirror(
+            mirrors.mirror(normalize_remote(built_url), final_url),
+            bool(configs.from_dotted_string("options.mirrors.dissociate"))
+        )
+    elif (
+        isinstance(command, GitCloneCommand) and
+        configs.from_dotted_string("options.bundles.enabled") is True and
+        "options.bundles.enabled" not in ignored
+    ):
+        from .bundles import BundleCache
+        
+        bundle = BundleCache.from_configurator(configs).bundle(normalize_remote(built_url), final_url)
+        if bundle.exists():
+            command.use_bundle(bundle)
+    if sparse is not None:
+        if not isinstance(command, GitCloneCommand):
+            raise ValueError(f"sparse checkouts are not supported by {vcs}")
+        command.use_sparse(sparse)
+    return command
+
+
+def create_worktree_command(
+    vcs: str,
+    configs: SmartConfigurator,
+    built_url: UniformResourceLocator,
+    final_url: str,
+    dest_path: str,
+    cla_list: t.Iterable[str],
+    cla_dict: t.Mapping[str, str],
+    ignored: t.Set[str],
+    sparse: t.Optional[t.Iterable[str]] = None
+) -> GitWorktreeCommand:
+    """
+    Create the command checking out a remote repository as a worktree of its
+    shared bare repository. See `create_clone_command`.
+    """
+    if vcs != "git":
+        raise ValueError(f"worktrees are not supported by {vcs}")
+    if sparse is not None:
+        raise ValueError("worktrees can't be combined with sparse checkouts")
+    remotes_dir = configs.from_dotted_string("options.local.remotes_dir")
+    if remotes_dir == "" or "options.local.remotes_dir" in ignored:
+        raise ValueError("worktrees need options.local.remotes_dir to store the bare repository")
+    bare_path = local_dest_path("", remotes_dir, built_url.get_host(), built_url.get_path(), False)
+    return GitWorktreeCommand(final_url, dest_path, f"{bare_path}.git", *cla_list, **cla_dict)
+
+
+def resolve_built_url(
+    vcs: str,
+    configs: SmartConfigurator,
+    built_url: UniformResourceLocator,
+    ignored: t.Optional[t.Set[str]] = None
+) -> Resolution:
+    """
+    Work out the url passed to the version control system and the default
+    destination of a complete locator. `built_url` is marked as an SCP
+    locator if `options.remote.force_scp` is set.
+    """
+    if ignored is None:
+        ignored = set()
     built_url.detect_explicitness(
         configs.from_dotted_string("options.remote.force_scp"),
         "options.remote.force_scp" in ignored
     )
-    final_url = remote_to_string(built_url, vcs)
-    dest_path = local_dest_path(
-        dest_path,
-        configs.from_dotted_string("options.local.remotes_dir"),
-        built_url.get_host(),
-        built_url.get_path(),
-        "options.local.remotes_dir" in ignored
+    return Resolution(
+        dict(built_url),
+        remote_to_string(built_url, vcs),
+        local_dest_path(
+            "",
+            configs.from_dotted_string("options.local.remotes_dir"),
+            built_url.get_host(),
+            built_url.get_path(),
+            "options.local.remotes_dir" in ignored
+        )
     )
+
+
+def resolve_locator(
+    vcs: str,
+    configs: SmartConfigurator,
+    remote_url: str,
+    ignored: t.Optional[t.Set[str]] = None,
+    cache: t.Optional[ResolutionCache] = None
+) -> Resolution:
+    """
+    Complete a remote url typed by the user using the defaults in `configs`.
+    
+    Parameters
+    ----------
+    cache: ResolutionCache | None = None
+        The cache to look the url up in first. The cache must have been
+        created with the hash of `configs`. If the url isn't cached, it is
+        resolved and stored in the cache.
+    
+    Raises
+    ------
+    ValueError
+        If `remote_url` could not be parsed.
+    
+    Returns
+    -------
+    Resolution
+        What `remote_url` resolves to.
+    """
+    if cache is not None:
+        resolution = cache.get(remote_url, vcs, ignored)
+        if resolution is not None:
+            return resolution
+    built_url = UniformResourceLocator.from_user_and_defaults(
+        DirtyLocator.process_dirty_url(remote_url),
+        configs.to_locator_builder()
+    )
+    resolution = resolve_built_url(vcs, configs, built_url, ignored)
+    if cache is not None:
+        cache.put(remote_url, vcs, ignored, resolution)
+    return resolution
+
+
+def resolve_remote(
+    vcs: str,
+    configs: SmartConfigurator,
+    remote_url: str,
+    ignored: t.Optional[t.Set[str]] = None,
+    cache: t.Optional[ResolutionCache] = None
+) -> t.Tuple[UniformResourceLocator, str]:
+    """
+    Complete a remote url typed by the user using the defaults in `configs`,
+    without creating a clone command. See `resolve_locator`.
+    
+    Raises
+    ------
+    ValueError
+        If `remote_url` could not be parsed.
+    
+    Returns
+    -------
+    Tuple[UniformResourceLocator, str]
+        The complete locator of the remote repository and the url passed to
+        the version control system.
+    """
+    resolution = resolve_locator(vcs, configs, remote_url, ignored, cache)
+    return resolution.locator(), resolution.final_url
+
+
+def resolve_clone_command(
+    vcs: str,
+    configs: SmartConfigurator,
+    remote_url: str,
+    dest_path: str = "",
+    cla_list: t.Optional[t.Iterable[str]] = None,
+    cla_dict: t.Optional[t.Mapping[str, str]] = None,
+    ignored: t.Optional[t.Set[str]] = None,
+    sparse: t.Optional[t.Iterable[str]] = None,
+    profile_name: t.Optional[str] = None,
+    existing: t.Optional[str] = None,
+    worktree: bool = False,
+    cache: t.Optional[ResolutionCache] = None,
+    local_clones: t.Optional[t.Dict[str, t.List[str]]] = None
+) -> t.Tuple[Command, UniformResourceLocator]:
+    """
+    Create a clone command from a remote url typed by the user, filling in the
+    missing parts of the url using the defaults in `configs`.
+    
+    Parameters
+    ----------
+    remote_url: str
+        The (possibly incomplete) url of the remote repository, like
+        'RenoirTan/QuickClone'.
+    
+    cache: ResolutionCache | None = None
+        The cache storing what remote urls resolve to. See `resolve_locator`.
+    
+    See `create_clone_command` for the other parameters.
+    
+    Raises
+    ------
+    InvalidVcsError
+        If `vcs` is invalid or not supported.
     
-    return create_clone_command_with_processed(
+    ValueError
+        If `remote_url` could not be parsed.
+    
+    Returns
+    -------
+    Tuple[Command, UniformResourceLocator]
+        The command used to clone the remote repository and the complete
+        locator of the remote repository.
+    """
+    resolution = resolve_locator(vcs, configs, remote_url, ignored, cache)
+    built_url = resolution.locator()
+    command = create_clone_command(
         vcs,
         configs,
-        final_url,
+        built_url,
         dest_path,
         cla_list,
         cla_dict,
-        ignored
+        ignored,
+        sparse,
+        profile_name,
+        existing,
+        worktree,
+        resolution,
+        local_clones
     )
+    return command, built_url
+
+
+def is_clone_of(path: str, built_url: UniformResourceLocator) -> bool:
+    """
+    Check whether `path` is a git repository whose 'origin' remote is the same
+    repository as `built_url`, regardless of how the remote is accessed (see
+    `quickclone.remote.normalize_remote`).
+    """
+    url = git_remote_url(path)
+    if url is None:
+        return False
+    try:
+        return normalize_remote(DirtyLocator.process_dirty_url(url)) == normalize_remote(built_url)
+    except ValueError:
+        return False
+
+
+def find_local_clone(
+    configs: SmartConfigurator,
+    built_url: UniformResourceLocator,
+    dest_path: str,
+    ignored: t.Optional[t.Set[str]] = None,
+    local_clones: t.Optional[t.Dict[str, t.List[str]]] = None
+) -> t.Optional[str]:
+    """
+    Find a git clone of a remote repository on this machine other than the
+    one at `dest_path`, so that it can be cloned locally.
+    
+    The repository's default location in `options.local.remotes_dir` is
+    checked first, then the paths of the `LOCAL_CLONE_SCAN_LIMIT` most recent
+    clones of the repository in the history, from the most recent clone to
+    the oldest one. If the history backend doesn't know which repository each
+    path is a clone of, the most recent clones of any repository are checked
+    instead. A path only counts if its 'origin' remote is the same repository
+    (see `is_clone_of`), so moved or deleted clones are skipped.
+    
+    Parameters
+    ----------
+    configs: SmartConfigurator
+        Configuration object.
+    
+    built_url: UniformResourceLocator
+        The locator of the remote repository.
+    
+    dest_path: str
+        Where the repository is about to be cloned to.
+    
+    ignored: Optional[Set[str]] = None
+        Set of config options to ignore.
+    
+    local_clones: Optional[Dict[str, List[str]]] = None
+        The clones of each remote repository found by earlier calls, keyed by
+        the normalized remote url (see `quickclone.remote.normalize_remote`).
+        The clones of `built_url` are looked up and added to it if they aren't
+        in it yet, so passing the same dictionary to every call made for a
+        batch only looks up the clones of each remote repository once.
+    
+    Returns
+    -------
+    Optional[str]
+        The path to an existing clone or `None` if there isn't one.
+    """
+    if ignored is None:
+        ignored = set()
+    if local_clones is None:
+        clones: t.Iterable[str] = _find_local_clones(configs, built_url, ignored)
+    else:
+        key = normalize_remote(built_url)
+        if key not in local_clones:
+            local_clones[key] = list(_find_local_clones(configs, built_url, ignored))
+        clones = local_clones[key]
+    destination = os.path.abspath(dest_path)
+    for clone in clones:
+        if os.path.abspath(clone) != destination:
+            return clone
+    return None
+
+
+def _find_local_clones(
+    configs: SmartConfigurator,
+    built_url: UniformResourceLocator,
+    ignored: t.Set[str]
+) -> t.Generator[str, None, None]:
+    from quickclone.config.cache import find_last_clones
+    
+    candidates = []
+    remotes_dir = configs.from_dotted_string("options.local.remotes_dir")
+    if remotes_dir != "" and "options.local.remotes_dir" not in ignored:
+        candidates.append(local_dest_path(
+            "",
+            remotes_dir,
+            built_url.get_host(),
+            built_url.get_path(),
+            False
+        ))
+    try:
+        candidates.extend(find_last_clones(
+            repo=normalize_remote(built_url),
+            limit=LOCAL_CLONE_SCAN_LIMIT
+        ))
+    except NotImplementedError:
+        # This history backend doesn't know which repository each path is a
+        # clone of, but `is_clone_of` checks that anyway.
+        candidates.extend(find_last_clones(limit=LOCAL_CLONE_SCAN_LIMIT))
+    checked = set()
+    for candidate in candidates:
+        path = os.path.abspath(candidate)
+        if path in checked:
+            continue
+        checked.add(path)
+        if is_clone_of(candidate, built_url):
+            yield candidate
+
+
+def clone_details(built_url: UniformResourceLocator, vcs: str) -> t.Dict[str, str]:
+    """
+    Get the details about a clone that are kept in the history, as keyword
+    arguments for `quickclone.config.history.CloneRecord`.
+    
+    Parameters
+    ----------
+    built_url: UniformResourceLocator
+        The locator of the remote repository.
+    
+    vcs: str
+        The version control system used to clone the repository.
+    
+    Returns
+    -------
+    Dict[str, str]
+        The normalized url, host, repository path and version control system.
+    """
+    return {
+        "url": normalize_remote(built_url),
+        "host": built_url.get_host(),
+        "repo": normalize_path(built_url.get_path()),
+        "vcs": vcs
+    }
 
 
 def create_clone_command_with_processed(
@@ -9,11 +9,24 @@ from quickclone.delegation.errors import CommandNotFoundError
 __all__ = ["BaseCommand", "Command"]
 
 
+TERMINATE_TIMEOUT: float = 5.0
+"""
+How long a cancelled command is given to exit before it is killed.
+"""
+
+
 class BaseCommand(object):
     """
     Base class for representing commands.
     """
     
+    CREATES_DEST_PATH: bool = True
+    """
+    Whether the command creates its `dest_path`, so that what a failed attempt
+    left there can be removed before the command is tried again. Commands
+    working on an existing repository must set this to `False`.
+    """
+    
     def __init__(self, location: str = "", *args: t.Any, **kwargs: t.Any) -> None:
         self.location = location
         self.args = args
@@ -43,23 +56,136 @@ class BaseCommand(object):
         return " ".join(map(shlex.quote, self.format_command_list()))
         # return shlex.join(self.format_command_list()) # >= 3.8
     
-    def run(self) -> t.Union[subprocess.CompletedProcess, subprocess.SubprocessError]:
+    def prepare(self) -> None:
+        """
+        Do the work that has to be done right before the command runs, but not
+        when it is only formatted (like with `--pretend`). This is called by
+        `run` and `run_async`, and does nothing by default.
+        """
+        pass
+    
+    def finish(self) -> None:
+        """
+        Undo what `prepare` did once the command and its follow-up commands
+        are done, whether they succeeded or not. This is called by `run` and
+        `run_async`, and does nothing by default.
+        """
+        pass
+    
+    def follow_up(self) -> t.List[t.List[str]]:
+        """
+        Get the commands that have to be run after this command succeeds to
+        finish its work, as lists of command-line arguments. `run` and
+        `run_async` run them in order and stop at the first one that fails.
+        
+        Returns
+        -------
+        List[List[str]]
+            The follow-up commands. There are none by default.
+        """
+        return []
+    
+    def run(
+        self,
+        **kwargs: t.Any
+    ) -> t.Union[subprocess.CompletedProcess, subprocess.SubprocessError]:
         """
         Run the command represented by this object using Python's subprocess
         module and return the result from `subprocess.run`.
         
+        Parameters
+        ----------
+        **kwargs: Any
+            Extra keyword arguments passed to `subprocess.run`, like `stdout`
+            and `stderr` to capture the command's output.
+        
         Returns
         -------
         subprocess.CompletedProcess | subprocess.SubprocessError
-            The result of running the command.
+            The result of running the command, or the result of the first
+            follow-up command (see `follow_up`) that failed.
         """
+        self.prepare()
         cl = self.format_command_list()
         try:
-            process = subprocess.run(cl)
+            process = subprocess.run(cl, **kwargs)
+            if process.returncode == 0:
+                for step in self.follow_up():
+                    process = subprocess.run(step, **kwargs)
+                    if process.returncode != 0:
+                        break
         except subprocess.SubprocessError as se:
             return se
         else:
             return process
+        finally:
+            self.finish()
+    
+    async def run_async(self, **kwargs: t.Any) -> subprocess.CompletedProcess:
+        """
+        Run the command represented by this object without blocking the event
+        loop, using `asyncio.create_subprocess_exec`.
+        
+        If the task running this coroutine is cancelled, the command is
+        terminated (or killed if it doesn't exit within `TERMINATE_TIMEOUT`
+        seconds) and waited for before the cancellation is propagated, so that
+        no processes are left behind.
+        
+        Parameters
+        ----------
+        **kwargs: Any
+            Extra keyword arguments passed to `asyncio.create_subprocess_exec`,
+            like `stdout` and `stderr` to capture the command's output.
+        
+        Raises
+        ------
+        OSError
+            If the command could not be started.
+        
+        Returns
+        -------
+        subprocess.CompletedProcess
+            The result of running the command, or the result of the first
+            follow-up command (see `follow_up`) that failed. Captured output
+            is stored as bytes.
+        """
+        import asyncio
+        
+        await asyncio.get_running_loop().run_in_executor(None, self.prepare)
+        try:
+            result = await self._exec_async(self.format_command_list(), kwargs)
+            if result.returncode == 0:
+                for step in self.follow_up():
+                    result = await self._exec_async(step, kwargs)
+                    if result.returncode != 0:
+                        break
+        finally:
+            self.finish()
+        return result
+    
+    @staticmethod
+    async def _exec_async(
+        cl: t.List[str],
+        kwargs: t.Mapping[str, t.Any]
+    ) -> subprocess.CompletedProcess:
+        import asyncio
+        
+        process = await asyncio.create_subprocess_exec(*cl, **kwargs)
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            # Reading the rest of the output also closes the pipes, which
+            # `process.wait` doesn't do.
+            try:
+                process.terminate()
+                await asyncio.wait_for(process.communicate(), TERMINATE_TIMEOUT)
+            except ProcessLookupError:
+                pass
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.communicate()
+            raise
+        return subprocess.CompletedProcess(cl, process.returncode, stdout, stderr)
 
 
 class Command(BaseCommand):
@@ -69,6 +195,12 @@ class Command(BaseCommand):
     
     COMMAND_NAME: str = "echo" # Dummy command
     
+    PROGRESS_ARGS: t.List[str] = []
+    """
+    Arguments that make the command show its progress even if its output
+    isn't a terminal.
+    """
+    
     def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
         location = shutil.which(self.COMMAND_NAME)
         if location is None:
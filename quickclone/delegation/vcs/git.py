@@ -1,7 +1,18 @@
+from __future__ import annotations
+from contextlib import ExitStack
+import os
+from pathlib import Path
+import subprocess
 import typing as t
 
+from quickclone.local import git_dir, read_git_config
+
 from .common import Command
 
+if t.TYPE_CHECKING:
+    from quickclone.delegation.bundles import Bundle
+    from quickclone.delegation.mirrors import Mirror
+
 
 class GitCloneCommand(Command):
     """
@@ -10,16 +21,337 @@ class GitCloneCommand(Command):
     
     COMMAND_NAME: str = "git"
     
+    PROGRESS_ARGS: t.List[str] = ["--progress"]
+    
     def __init__(self, remote: str, dest_path: str, *args: t.Any, **kwargs: t.Any) -> None:
         super().__init__(*args, **kwargs)
         self.remote = remote
         self.dest_path = dest_path
+        self.mirror: t.Optional[Mirror] = None
+        self.dissociate = False
+        self.sparse: t.Optional[t.List[str]] = None
+        self.local_source: t.Optional[str] = None
+        self.default_branch: t.Optional[str] = None
+        self.bundle: t.Optional[Bundle] = None
+        # Keeps the mirror or bundle from being evicted during the clone.
+        self._in_use = ExitStack()
+    
+    def use_mirror(self, mirror: Mirror, dissociate: bool = False) -> None:
+        """
+        Borrow objects from a local mirror of the remote repository
+        (`--reference-if-able`), so that only the objects missing from the
+        mirror are downloaded. The mirror is refreshed right before the clone
+        runs and isn't evicted until the clone is done.
+        
+        Parameters
+        ----------
+        mirror: Mirror
+            The mirror of the remote repository.
+        
+        dissociate: bool = False
+            Whether to copy the borrowed objects into the clone afterwards
+            (`--dissociate`), so that the clone keeps working if the mirror is
+            removed.
+        """
+        self.mirror = mirror
+        self.dissociate = dissociate
+    
+    def use_local(self, source: str) -> None:
+        """
+        Clone from an existing clone of the same remote repository on this
+        machine with `git clone --local`, which hardlinks its objects instead
+        of downloading them. Afterwards, 'origin' is pointed at the remote
+        repository and fetched (see `follow_up`), so only the objects the
+        existing clone doesn't have are downloaded.
+        
+        The new clone then checks out the remote repository's default branch
+        at the commit the remote repository is at, whichever branch is
+        checked out in `source`. The default branch is looked up right before
+        the clone runs and stored in `default_branch`. If it can't be looked
+        up, the branch checked out in `source` is reset to the remote
+        repository's HEAD instead.
+        
+        Parameters
+        ----------
+        source: str
+            The path to the existing clone.
+        """
+        self.local_source = source
+    
+    def use_bundle(self, bundle: Bundle) -> None:
+        """
+        Clone from a bundle of the remote repository, then point 'origin' at
+        the remote repository, fetch and fast-forward the checked out branch
+        (see `follow_up`), so only the commits made since the bundle was
+        refreshed are downloaded.
+        
+        If the bundle is gone by the time the command runs, the remote
+        repository is cloned as usual.
+        
+        Parameters
+        ----------
+        bundle: Bundle
+            The bundle of the remote repository.
+        """
+        self.bundle = bundle
+    
+    def source(self) -> str:
+        """
+        Get what git clones from: an existing clone (see `use_local`), a
+        bundle (see `use_bundle`) or the remote repository.
+        """
+        if self.local_source is not None:
+            return self.local_source
+        if self.bundle is not None:
+            return str(self.bundle.path)
+        return self.remote
+    
+    def use_sparse(self, patterns: t.Iterable[str]) -> None:
+        """
+        Only check out some directories of the repository using a cone-mode
+        sparse checkout. The repository is cloned with
+        `--sparse --no-checkout`, then `git sparse-checkout set --cone` and
+        `git checkout` are run (see `follow_up`), so files outside of the
+        directories are never written.
+        
+        Parameters
+        ----------
+        patterns: Iterable[str]
+            The directories to check out, relative to the root of the
+            repository. Files directly in the root are always checked out.
+        
+        Raises
+        ------
+        ValueError
+            If no directories are given.
+        """
+        patterns = [pattern.strip("/") for pattern in patterns]
+        if len(patterns) == 0 or "" in patterns:
+            raise ValueError("a sparse checkout needs at least one directory")
+        self.sparse = patterns
+    
+    def clone_path(self) -> str:
+        """
+        Get the directory git clones into, which is the name of the remote
+        repository if `dest_path` is empty.
+        """
+        if self.dest_path != "":
+            return self.dest_path
+        # Like git, 'host/repo/.git' and 'host/repo.git' both become 'repo'.
+        remote = self.source().rstrip("/")
+        if remote.endswith("/.git"):
+            remote = remote[:-len("/.git")]
+        name = remote.replace(":", "/").split("/")[-1]
+        return name[:-len(".git")] if name.endswith(".git") else name
+    
+    def follow_up(self) -> t.List[t.List[str]]:
+        steps = []
+        if self.sparse is not None:
+            steps.extend([
+                [self.location, "-C", self.clone_path(), "sparse-checkout", "set", "--cone", *self.sparse],
+                [self.location, "-C", self.clone_path(), "checkout"]
+            ])
+        if self.source() != self.remote:
+            steps.extend([
+                [self.location, "-C", self.clone_path(), "remote", "set-url", "origin", self.remote],
+                [self.location, "-C", self.clone_path(), "fetch", "--prune", "origin"]
+            ])
+        if self.local_source is not None:
+            # The existing clone may be behind the remote repository or be on
+            # another branch.
+            git = [self.location, "-C", self.clone_path()]
+            branch = self.default_branch
+            if branch is None:
+                steps.extend([
+                    [*git, "remote", "set-head", "origin", "--auto"],
+                    [*git, "reset", "--hard", "origin/HEAD"]
+                ])
+            else:
+                steps.extend([
+                    [*git, "remote", "set-head", "origin", branch],
+                    [*git, "checkout", "-B", branch, "--track", f"origin/{branch}"]
+                ])
+        elif self.bundle is not None:
+            # The bundle may be older than the remote repository.
+            steps.append([self.location, "-C", self.clone_path(), "merge", "--ff-only"])
+        return steps
+    
+    def prepare(self) -> None:
+        if self.local_source is not None:
+            self.default_branch = self._remote_default_branch()
+            return
+        if self.mirror is not None:
+            self.mirror.refresh()
+            self._in_use.enter_context(self.mirror.in_use())
+        elif self.bundle is not None:
+            self._in_use.enter_context(self.bundle.in_use())
+            if self.bundle.exists():
+                self.bundle.touch()
+            else:
+                self.bundle = None
+    
+    def finish(self) -> None:
+        self._in_use.close()
+    
+    def _remote_default_branch(self) -> t.Optional[str]:
+        try:
+            process = subprocess.run(
+                [self.location, "ls-remote", "--symref", self.remote, "HEAD"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                universal_newlines=True,
+                env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+            )
+        except OSError:
+            return None
+        if process.returncode != 0:
+            return None
+        # The symbolic ref is listed as 'ref: refs/heads/<branch>\tHEAD'.
+        for line in process.stdout.splitlines():
+            ref, _, name = line.partition("\t")
+            if name == "HEAD" and ref.startswith("ref: refs/heads/"):
+                return ref[len("ref: refs/heads/"):]
+        return None
     
     def format_command_list(self) -> t.List[str]:
         cl = super().format_command_list()
         assert len(cl) >= 1
-        inject = ["clone", self.remote]
+        inject = ["clone"]
+        if self.local_source is not None:
+            inject.append("--local")
+        elif self.mirror is not None:
+            inject.extend(["--reference-if-able", str(self.mirror.path)])
+            if self.dissociate:
+                inject.append("--dissociate")
+        if self.sparse is not None:
+            inject.extend(["--sparse", "--no-checkout"])
+        inject.append(self.source())
         if self.dest_path != "":
             inject.append(self.dest_path)
         rcl = cl[:1] + inject + cl[1:] 
         return rcl
+
+
+class GitUpdateCommand(Command):
+    """
+    A class representing a `git fetch` followed by a `git merge --ff-only`,
+    which brings an existing clone at `dest_path` up to date instead of
+    cloning the remote repository again.
+    
+    Only the objects that are new since the last fetch are downloaded. If the
+    current branch has diverged from its upstream branch, the merge fails and
+    the clone is left as it is. A detached HEAD, like in the worktrees made by
+    `GitWorktreeCommand`, is fast-forwarded to 'origin/HEAD' instead.
+    """
+    
+    COMMAND_NAME: str = "git"
+    
+    PROGRESS_ARGS: t.List[str] = ["--progress"]
+    
+    CREATES_DEST_PATH: bool = False
+    
+    def __init__(self, remote: str, dest_path: str, *args: t.Any, **kwargs: t.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.remote = remote
+        self.dest_path = dest_path
+    
+    def follow_up(self) -> t.List[t.List[str]]:
+        merge = [self.location, "-C", self.dest_path, "merge", "--ff-only"]
+        if self._head_detached():
+            merge.append("origin/HEAD")
+        return [merge]
+    
+    def _head_detached(self) -> bool:
+        head_dir = git_dir(self.dest_path)
+        if head_dir is None:
+            return False
+        try:
+            head = (head_dir / "HEAD").read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return False
+        return not head.startswith("ref:")
+    
+    def format_command_list(self) -> t.List[str]:
+        cl = super().format_command_list()
+        assert len(cl) >= 1
+        inject = ["-C", self.dest_path, "fetch", "--prune", "origin"]
+        return cl[:1] + inject + cl[1:]
+
+
+class GitWorktreeCommand(Command):
+    """
+    A class representing the commands that check out a remote repository as a
+    worktree of a bare repository shared by every checkout of that remote
+    repository, so that each extra checkout only costs its working tree.
+    
+    If the bare repository doesn't exist yet, it is cloned with
+    `git clone --bare` (with the extra arguments, like `--filter`), otherwise
+    it is fetched. Then `git worktree add --detach` checks out the remote
+    repository's default branch at `dest_path`. The checkout starts on a
+    detached HEAD because a branch can only be checked out in one worktree.
+    
+    Parameters
+    ----------
+    remote: str
+        The url of the remote repository.
+    
+    dest_path: str
+        Where to check out the worktree.
+    
+    bare_path: str
+        The bare repository shared by the worktrees.
+    """
+    
+    COMMAND_NAME: str = "git"
+    
+    PROGRESS_ARGS: t.List[str] = ["--progress"]
+    
+    def __init__(
+        self,
+        remote: str,
+        dest_path: str,
+        bare_path: str,
+        *args: t.Any,
+        **kwargs: t.Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.remote = remote
+        self.dest_path = dest_path
+        self.bare_path = bare_path
+    
+    def bare_exists(self) -> bool:
+        """
+        Check whether the bare repository has been created.
+        """
+        return (Path(self.bare_path) / "HEAD").is_file()
+    
+    def _has_fetch_refspec(self) -> bool:
+        config = read_git_config(Path(self.bare_path) / "config")
+        return config is not None and config.has_option('remote "origin"', "fetch")
+    
+    def follow_up(self) -> t.List[t.List[str]]:
+        git = [self.location, "--git-dir", self.bare_path]
+        steps = []
+        if not self._has_fetch_refspec():
+            # `git clone --bare` doesn't set up remote-tracking branches, so
+            # fetching would not update anything.
+            steps.extend([
+                [*git, "config", "remote.origin.fetch", "+refs/heads/*:refs/remotes/origin/*"],
+                [*git, "fetch", "--prune", "origin"],
+                [*git, "remote", "set-head", "origin", "--auto"]
+            ])
+        steps.extend([
+            # Forget worktrees whose directories were removed, so that a
+            # checkout can be made at the same path again.
+            [*git, "worktree", "prune"],
+            [*git, "worktree", "add", "--detach", self.dest_path, "origin/HEAD"]
+        ])
+        return steps
+    
+    def format_command_list(self) -> t.List[str]:
+        cl = super().format_command_list()
+        assert len(cl) >= 1
+        if self.bare_exists():
+            return [cl[0], "--git-dir", self.bare_path, "fetch", "--prune", "origin"]
+        return cl[:1] + ["clone", "--bare", self.remote, self.bare_path] + cl[1:]
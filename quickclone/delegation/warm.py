@@ -0,0 +1,153 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import shutil
+import subprocess
+import time
+import typing as t
+
+from .batch import DEFAULT_JOBS
+
+if t.TYPE_CHECKING:
+    from .bundles import Bundle
+    from .mirrors import Mirror
+
+
+__all__ = [
+    "WARM_NICENESS",
+    "WarmResult",
+    "lower_priority",
+    "history_remotes",
+    "warm_caches"
+]
+
+
+WARM_NICENESS: int = 10
+"""
+How much `lower_priority` increases the niceness of this process by.
+"""
+
+
+class WarmResult(object):
+    """
+    The outcome of refreshing a cached copy of a repository.
+    
+    Parameters
+    ----------
+    copy: Union[Mirror, Bundle]
+        The mirror or bundle that was refreshed.
+    
+    succeeded: bool
+        Whether the copy exists and is usable afterwards.
+    
+    duration: float
+        How long refreshing took in seconds.
+    
+    error: str = ""
+        The exception raised while refreshing, if any.
+    """
+    
+    def __init__(
+        self,
+        copy: t.Union[Mirror, Bundle],
+        succeeded: bool,
+        duration: float,
+        error: str = ""
+    ) -> None:
+        self.copy = copy
+        self.succeeded = succeeded
+        self.duration = duration
+        self.error = error
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"copy={repr(self.copy)}, "
+            f"succeeded={repr(self.succeeded)}, "
+            f"duration={repr(self.duration)}, "
+            f"error={repr(self.error)})"
+        )
+
+
+def lower_priority(niceness: int = WARM_NICENESS) -> t.List[str]:
+    """
+    Lower the CPU priority (with `os.nice`) and, where `ionice` is available,
+    the I/O priority (to the idle class) of this process. Processes started
+    afterwards, like git, inherit both.
+    
+    Returns
+    -------
+    List[str]
+        What was lowered: 'cpu' and/or 'io'.
+    """
+    lowered = []
+    if hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+            lowered.append("cpu")
+        except OSError:
+            pass
+    ionice = shutil.which("ionice")
+    if ionice is not None:
+        process = subprocess.run(
+            [ionice, "-c", "3", "-p", str(os.getpid())],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        if process.returncode == 0:
+            lowered.append("io")
+    return lowered
+
+
+def history_remotes(paths: t.Iterable[str]) -> t.List[str]:
+    """
+    Get the 'origin' remote urls of the git repositories at `paths` (like the
+    paths in the history), without duplicates. Paths that aren't git
+    repositories anymore are skipped.
+    """
+    from quickclone.local import git_remote_url
+    
+    remotes: t.List[str] = []
+    seen: t.Set[str] = set()
+    for path in paths:
+        url = git_remote_url(path)
+        if url is not None and url not in seen:
+            seen.add(url)
+            remotes.append(url)
+    return remotes
+
+
+def _refresh(copy: t.Union[Mirror, Bundle]) -> WarmResult:
+    start = time.time()
+    try:
+        succeeded = copy.refresh()
+    except Exception as e:
+        return WarmResult(copy, False, time.time() - start, str(e))
+    return WarmResult(copy, succeeded, time.time() - start)
+
+
+def warm_caches(
+    copies: t.Iterable[t.Union[Mirror, Bundle]],
+    max_workers: int = DEFAULT_JOBS
+) -> t.Iterator[WarmResult]:
+    """
+    Refresh mirrors and bundles on a pool of at most `max_workers` threads.
+    Use `lower_priority` first so that interactive work isn't slowed down.
+    
+    Raises
+    ------
+    ValueError
+        If `max_workers` is less than 1.
+    
+    Returns
+    -------
+    Iterator[WarmResult]
+        The results in the order the copies finish refreshing.
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_refresh, copy) for copy in copies]
+        for future in as_completed(futures):
+            yield future.result()
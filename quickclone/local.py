@@ -1,4 +1,6 @@
+import configparser
 from pathlib import Path
+import typing as t
 
 
 def make_path(path: str) -> str:
@@ -55,3 +57,105 @@ def local_dest_path(
             return make_path(user_input)
         else:
             return make_path(Path(remotes_dir) / Path(host) / Path(path))
+
+
+def read_git_config(config_path: Path) -> t.Optional[configparser.ConfigParser]:
+    """
+    Read a git config file, like '.git/config', without starting git.
+    
+    git's config files are close enough to INI files for sections like
+    `[remote "origin"]`, but keys may repeat (like 'fetch'), in which case only
+    the last value is kept.
+    
+    Returns
+    -------
+    Optional[configparser.ConfigParser]
+        The parsed config or `None` if the file doesn't exist or couldn't be
+        parsed.
+    """
+    if not config_path.is_file():
+        return None
+    parser = configparser.ConfigParser(strict=False, interpolation=None)
+    try:
+        parser.read(config_path, encoding="utf-8")
+    except (configparser.Error, UnicodeDecodeError):
+        return None
+    return parser
+
+
+def git_dir(path: str, common: bool = False) -> t.Optional[Path]:
+    """
+    Find the git directory of the git repository at `path` without starting
+    git.
+    
+    Usually this is '.git', but in linked worktrees and submodules '.git' is
+    a file pointing at the actual git directory ('gitdir: ...').
+    
+    Parameters
+    ----------
+    path: str
+        The path to the repository's working tree.
+    
+    common: bool = False
+        Whether to return the git directory shared by every worktree of the
+        repository (see 'commondir'), which holds the config and the refs,
+        instead of the one holding the worktree's own HEAD and index. They are
+        the same unless `path` is a linked worktree.
+    
+    Returns
+    -------
+    Optional[Path]
+        The git directory, or `None` if `path` isn't the root of a git
+        repository.
+    """
+    if path == "":
+        return None
+    dot_git = Path(path) / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    try:
+        contents = dot_git.read_text(encoding="utf-8").strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not contents.startswith("gitdir:"):
+        return None
+    gitdir = Path(path) / contents[len("gitdir:"):].strip()
+    if not gitdir.is_dir():
+        return None
+    if common:
+        try:
+            commondir = (gitdir / "commondir").read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return gitdir
+        except (OSError, UnicodeDecodeError):
+            return None
+        gitdir = gitdir / commondir
+    return gitdir
+
+
+def git_remote_url(path: str, remote: str = "origin") -> t.Optional[str]:
+    """
+    Get the url of a remote of the git repository at `path` by reading its
+    config (see `git_dir`), without starting git.
+    
+    Parameters
+    ----------
+    path: str
+        The path to the repository's working tree.
+    
+    remote: str = "origin"
+        The name of the remote.
+    
+    Returns
+    -------
+    Optional[str]
+        The url of the remote, or `None` if `path` isn't the root of a git
+        repository or the remote doesn't exist.
+    """
+    common_dir = git_dir(path, common=True)
+    if common_dir is None:
+        return None
+    parser = read_git_config(common_dir / "config")
+    if parser is None:
+        return None
+    return parser.get(f'remote "{remote}"', "url", fallback=None)
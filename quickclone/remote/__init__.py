@@ -34,10 +34,54 @@ def remote_to_string(remote: UniformResourceLocator, scm: str) -> str:
         remote.kwargs.get("explicit_scp") and
         scm in SCM_WITH_EXPLICIT_SCP
     ):
-        scp_locator = ScpLocator.from_locator(remote)
-        if remote.get_username() == "": # Separate if statements for other SCMs.
+        username = remote.get_username()
+        if username == "": # Separate if statements for other SCMs.
             if scm == "git":
-                scp_locator.username = "git"
-        return str(scp_locator)
+                username = "git"
+        return str(ScpLocator(remote.get_host(), username, remote.get_password(), remote.get_path()))
     else:
         return str(remote)
+
+
+def normalize_remote(remote: BaseLocator) -> str:
+    """
+    Convert a locator into a key identifying the remote repository regardless
+    of how it is accessed. The scheme, user information, query and fragment
+    are dropped, the host name is lowercased and slashes around the path as
+    well as the '.git' suffix are removed. For example, both
+    'https://github.com/RenoirTan/QuickClone.git' and
+    'git@github.com:RenoirTan/QuickClone' become
+    'github.com/RenoirTan/QuickClone'.
+    
+    Parameters
+    ----------
+    remote: BaseLocator
+        The locator identifying the remote repository.
+    
+    Returns
+    -------
+    str
+        The normalized locator.
+    """
+    port_part = f":{remote.get_port()}" if remote.get_port() != "" else ""
+    return f"{remote.get_host().lower()}{port_part}/{normalize_path(remote.get_path())}"
+
+
+def normalize_path(path: str) -> str:
+    """
+    Remove the slashes around a repository's path and its '.git' suffix.
+    
+    Parameters
+    ----------
+    path: str
+        The path of the remote repository.
+    
+    Returns
+    -------
+    str
+        The normalized path.
+    """
+    path = path.strip("/")
+    if path.endswith(".git"):
+        path = path[:-len(".git")]
+    return path
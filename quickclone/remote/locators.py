@@ -1,12 +1,8 @@
 from __future__ import annotations
+from operator import attrgetter
 import typing as t
 
-from .parser import (
-    parse_authority,
-    parse_dirty_url,
-    parse_full_url,
-    parse_scp_dirty_loc
-)
+from .parser import get_parser_engine
 
 __all__ = [
     "BaseLocator",
@@ -17,6 +13,13 @@ __all__ = [
 ]
 
 
+MAX_LOCATOR_LENGTH: int = 2048
+"""
+The longest locator `DirtyLocator.process_dirty_url` accepts, like the URL
+length limit of most browsers. Real repository locators are far shorter.
+"""
+
+
 LOCATOR_FIELDS: str = """
 Fields
 ------
@@ -72,27 +75,46 @@ fragment: str
 FIELDS = ["scheme", "host", "username", "password", "port", "path", "query", "fragment"]
 
 
+def _read_only(name: str) -> property:
+    # Reading the slot through `attrgetter` doesn't run any Python code.
+    return property(attrgetter(f"_{name}"), doc=f"The {name} (read-only).")
+
+
+def _authority_to_string(host: str, username: str, password: str, port: str) -> str:
+    userpass_part = username
+    if password != "":
+        userpass_part += f":{password}"
+    if len(userpass_part) > 0:
+        userpass_part += "@"
+    port_part = f":{port}" if port != "" else ""
+    return userpass_part + host + port_part
+
+
 class BaseLocator(object):
     """
     Base class for classes representing Uniform Resource Locators (URLs).
     This stores the parts of the URL like the domain name or path in the URL.
     
+    Locators are immutable so that they can be converted to a string only
+    once, and they use `__slots__` so that resolving many of them (like with
+    `qkln --stdin`) takes less memory. Only `kwargs` can be modified.
+    
     Fields
     ------
     scheme: str
         The scheme used to access the remote repository.
         Comes before everything else in a URL and is suffixed by '://'.
         Examples: https, ssh
-
+    
     host: str
         The host where the remote repository is located.
         Examples: github.com, 1.1.1.1
-
+    
     username: str
         The username used to access the remote repository.
         Comes before the host and is separated from the latter by '@'.
         Examples: git (in git@github.com)
-
+    
     password: str
         Password of the user used to authenticate themselves.
         If present, must come after a username (separated by ':') and before
@@ -105,21 +127,21 @@ class BaseLocator(object):
         The port used to connect to the server.
         If present, must come after the host name and must be an integer
         between 0 and 65535 (inclusive).
-
+    
     path: str
         The path to the remote repository
         (not referring to where the local clone is located).
         Comes after the host and separated from it by '/'.
         Examples: RenoirTan/QuickClone
         (in https://github.com/RenoirTan/QuickClone)
-
+    
     query: str
         The parameters in the URL.
         Comes after the path or host and the start of the query section is
         denoted by '?'.
         You can chain multiple key-value pairs using '&' as the separator.
         Examples: key=value (in https://example.com?key=value)
-
+    
     fragment: str
         The fragment identifying a secondary resource.
         The last part of the URL. The fragment section is denoted by '#'.
@@ -130,6 +152,28 @@ class BaseLocator(object):
         Miscellaneous data.
     """
     
+    __slots__ = (
+        "_scheme",
+        "_host",
+        "_username",
+        "_password",
+        "_port",
+        "_path",
+        "_query",
+        "_fragment",
+        "_kwargs",
+        "_string"
+    )
+    
+    scheme = _read_only("scheme")
+    host = _read_only("host")
+    username = _read_only("username")
+    password = _read_only("password")
+    port = _read_only("port")
+    path = _read_only("path")
+    query = _read_only("query")
+    fragment = _read_only("fragment")
+    
     def __init__(
         self,
         scheme: str = "",
@@ -154,16 +198,16 @@ class BaseLocator(object):
             The scheme used to access the remote repository.
             Comes before everything else in a URL and is suffixed by '://'.
             Examples: https, ssh
-
+        
         host: str = ""
             The host where the remote repository is located.
             Examples: github.com, 1.1.1.1
-
+        
         username: str = ""
             The username used to access the remote repository.
             Comes before the host and is separated from the latter by '@'.
             Examples: git (in git@github.com)
-
+        
         password: str = ""
             Password of the user used to authenticate themselves.
             If present, must come after a username (separated by ':') and before
@@ -176,21 +220,21 @@ class BaseLocator(object):
             The port used to connect to the server.
             If present, must come after the host name and must be an integer
             between 0 and 65535 (inclusive).
-
+        
         path: str = ""
             The path to the remote repository
             (not referring to where the local clone is located).
             Comes after the host and separated from it by '/'.
             Examples: RenoirTan/QuickClone
             (in https://github.com/RenoirTan/QuickClone)
-
+        
         query: str = ""
             The parameters in the URL.
             Comes after the path or host and the start of the query section is
             denoted by '?'.
             You can chain multiple key-value pairs using '&' as the separator.
             Examples: key=value (in https://example.com?key=value)
-
+        
         fragment: str = ""
             The fragment identifying a secondary resource.
             The last part of the URL. The fragment section is denoted by '#'.
@@ -200,29 +244,34 @@ class BaseLocator(object):
         **kwargs: Any
             Miscellaneous data.
         """
-        self.scheme = scheme
-        self.host = host
-        self.username = username
-        self.password = password
-        self.port = port
-        self.path = path
-        self.query = query
-        self.fragment = fragment
-        self.kwargs = kwargs
+        self._scheme = scheme
+        self._host = host
+        self._username = username
+        self._password = password
+        self._port = port
+        self._path = path
+        self._query = query
+        self._fragment = fragment
+        # Most locators don't have any miscellaneous data, so their dictionary
+        # is only kept once it is needed.
+        self._kwargs = kwargs if kwargs else None
+        self._string: t.Optional[str] = None
     
     def __str__(self) -> str:
-        scheme_part = f"{self.get_scheme()}://" if self.get_scheme() != "" else ""
-        authority_part = str(UrlAuthority(
-            self.get_host(),
-            self.get_username(),
-            self.get_password(),
-            self.get_port()
-        ))
-        path_part = f"/{self.get_path()}" if self.get_path() != "" else ""
-        query_part = f"?{self.get_query()}" if self.get_query() != "" else ""
-        fragment_part = f"#{self.get_fragment()}" if self.get_fragment() != "" else ""
-        return scheme_part + authority_part + path_part + query_part + fragment_part
-        
+        if self._string is None:
+            scheme_part = f"{self.get_scheme()}://" if self.get_scheme() != "" else ""
+            authority_part = _authority_to_string(
+                self.get_host(),
+                self.get_username(),
+                self.get_password(),
+                self.get_port()
+            )
+            path_part = f"/{self.get_path()}" if self.get_path() != "" else ""
+            query_part = f"?{self.get_query()}" if self.get_query() != "" else ""
+            fragment_part = f"#{self.get_fragment()}" if self.get_fragment() != "" else ""
+            self._string = scheme_part + authority_part + path_part + query_part + fragment_part
+        return self._string
+    
     def __repr__(self) -> str:
         return (
             f"{self.__class__.__name__}("
@@ -245,41 +294,49 @@ class BaseLocator(object):
         yield "path", self.get_path()
         yield "query", self.get_query()
         yield "fragment", self.get_fragment()
-        yield from self.kwargs.items()
+        if self._kwargs is not None:
+            yield from self._kwargs.items()
+    
+    @property
+    def kwargs(self) -> t.Dict[str, t.Any]:
+        """Miscellaneous data, which can be modified."""
+        if self._kwargs is None:
+            self._kwargs = {}
+        return self._kwargs
     
     def get_scheme(self) -> str:
         """Get the scheme used to access the remote repository."""
-        return self.scheme
-
+        return self._scheme
+    
     def get_host(self) -> str:
         """Get the host name of the website hosting the remote repository."""
-        return self.host
-
+        return self._host
+    
     def get_username(self) -> str:
         """Get the username used to access the remote repository."""
-        return self.username
-
+        return self._username
+    
     def get_password(self) -> str:
         """Get the password used to access the remote repository."""
-        return self.password
+        return self._password
     
     def get_port(self) -> str:
         """
         Get the port used to access the server hosting the remote repository.
         """
-        return self.port
-
+        return self._port
+    
     def get_path(self) -> str:
         """Get the path of the remote repository (in the website)."""
-        return self.path
-
+        return self._path
+    
     def get_query(self) -> str:
         """Get the parameters (as a single string)."""
-        return self.query
-
+        return self._query
+    
     def get_fragment(self) -> str:
         """Get the fragment."""
-        return self.fragment
+        return self._fragment
 
 
 class UniformResourceLocator(BaseLocator):
@@ -292,16 +349,16 @@ class UniformResourceLocator(BaseLocator):
         The scheme used to access the remote repository.
         Comes before everything else in a URL and is suffixed by '://'.
         Examples: https, ssh
-
+    
     host: str
         The host where the remote repository is located.
         Examples: github.com, 1.1.1.1
-
+    
     username: str
         The username used to access the remote repository.
         Comes before the host and is separated from the latter by '@'.
         Examples: git (in git@github.com)
-
+    
     password: str
         Password of the user used to authenticate themselves.
         If present, must come after a username (separated by ':') and before
@@ -314,31 +371,73 @@ class UniformResourceLocator(BaseLocator):
         The port used to connect to the server.
         If present, must come after the host name and must be an integer
         between 0 and 65535 (inclusive).
-
+    
     path: str
         The path to the remote repository
         (not referring to where the local clone is located).
         Comes after the host and separated from it by '/'.
         Examples: RenoirTan/QuickClone
         (in https://github.com/RenoirTan/QuickClone)
-
+    
     query: str
         The parameters in the URL.
         Comes after the path or host and the start of the query section is
         denoted by '?'.
         You can chain multiple key-value pairs using '&' as the separator.
         Examples: key=value (in https://example.com?key=value)
-
+    
     fragment: str
         The fragment identifying a secondary resource.
         The last part of the URL. The fragment section is denoted by '#'.
         Examples: History
         (in https://en.wikipedia.org/wiki/Python_(programming_language)#History)
+    
+    The URL is checked for errors once when it is created (see
+    `find_faults`). Converting a URL with errors to a string raises the first
+    one.
     """
     
+    __slots__ = ("_faults",)
+    
+    def __init__(
+        self,
+        scheme: str = "",
+        host: str = "",
+        username: str = "",
+        password: str = "",
+        path: str = "",
+        port: str = "",
+        query: str = "",
+        fragment: str = "",
+        **kwargs
+    ) -> None:
+        BaseLocator.__init__(
+            self,
+            scheme,
+            host,
+            username,
+            password,
+            path,
+            port,
+            query,
+            fragment
+        )
+        # Set here so that `kwargs` isn't copied into another dictionary.
+        self._kwargs = kwargs if kwargs else None
+        self._faults: t.Tuple[str, ...] = ()
+        if scheme == "" or host == "" or (username == "" and password != ""):
+            self._faults = tuple(
+                fault for fault, found in [
+                    ("Username not given but password given.", username == "" and password != ""),
+                    ("No scheme specified.", scheme == ""),
+                    ("Empty host.", host == "")
+                ]
+                if found
+            )
+    
     def __str__(self) -> str:
-        for fault in self.find_faults():
-            raise fault
+        if self._faults:
+            raise ValueError(self._faults[0])
         return super().__str__()
     
     def find_faults(self) -> t.Generator[BaseException, None, None]:
@@ -352,13 +451,9 @@ class UniformResourceLocator(BaseLocator):
             All the errors that are encountered when reviewing the URL. If no
             errors are found, no exceptions will be yielded.
         """
-        if self.get_username() == "" and self.get_password() != "":
-            yield ValueError("Username not given but password given.")
-        if self.get_scheme() == "":
-            yield ValueError("No scheme specified.")
-        if self.get_host() == "":
-            yield ValueError("Empty host.")
-
+        for fault in self._faults:
+            yield ValueError(fault)
+    
     def validate(self) -> bool:
         """
         Validate this URL by making sure no errors are found in this URL.
@@ -369,8 +464,8 @@ class UniformResourceLocator(BaseLocator):
         bool
             `True` if this URL has no errors in it and `False` otherwise.
         """
-        return sum(map(lambda _: 1, self.find_faults())) == 0
-
+        return not self._faults
+    
     def detect_explicitness(self, force_scp: bool, ignore_force_scp: bool) -> None:
         """
         Detect whether this locator was explicitly written as an SCP locator
@@ -411,7 +506,7 @@ class UniformResourceLocator(BaseLocator):
         -------
         UniformResourceLocator
         """
-        parsed = parse_full_url(url, none_str="to_str")
+        parsed = get_parser_engine().parse_full_url(url, none_str="to_str")
         if parsed == {}:
             raise ValueError(f"Invalid URL: {url}")
         url: UniformResourceLocator = UniformResourceLocator(**parsed)
@@ -470,16 +565,16 @@ class DirtyLocator(BaseLocator):
         The scheme used to access the remote repository.
         Comes before everything else in a URL and is suffixed by '://'.
         Examples: https, ssh
-
+    
     host: str
         The host where the remote repository is located.
         Examples: github.com, 1.1.1.1
-
+    
     username: str
         The username used to access the remote repository.
         Comes before the host and is separated from the latter by '@'.
         Examples: git (in git@github.com)
-
+    
     password: str
         Password of the user used to authenticate themselves.
         If present, must come after a username (separated by ':') and before
@@ -492,21 +587,21 @@ class DirtyLocator(BaseLocator):
         The port used to connect to the server.
         If present, must come after the host name and must be an integer
         between 0 and 65535 (inclusive).
-
+    
     path: str
         The path to the remote repository
         (not referring to where the local clone is located).
         Comes after the host and separated from it by '/'.
         Examples: RenoirTan/QuickClone
         (in https://github.com/RenoirTan/QuickClone)
-
+    
     query: str
         The parameters in the URL.
         Comes after the path or host and the start of the query section is
         denoted by '?'.
         You can chain multiple key-value pairs using '&' as the separator.
         Examples: key=value (in https://example.com?key=value)
-
+    
     fragment: str
         The fragment identifying a secondary resource.
         The last part of the URL. The fragment section is denoted by '#'.
@@ -514,31 +609,51 @@ class DirtyLocator(BaseLocator):
         (in https://en.wikipedia.org/wiki/Python_(programming_language)#History)
     """
     
+    __slots__ = ()
+    
     @classmethod
-    def process_dirty_url(cls, dirty_url: str) -> DirtyLocator:
+    def process_dirty_url(
+        cls,
+        dirty_url: str,
+        max_length: int = MAX_LOCATOR_LENGTH
+    ) -> DirtyLocator:
         """
         Process a user-inputted URL (`dirty_url`).
-
+        
+        Locators longer than `max_length` are rejected before being parsed,
+        which bounds how long parsing can take with either parser engine
+        (see `quickclone.remote.parser.PARSER_ENGINES`), so that one bad
+        locator can't hold up a batch of clones.
+        
         Parameters
         ----------
         cls: typing.Type[UrlAuthority]
             The UrlAuthority class.
-
+        
         dirty_url: str
             The user-inputted URL.
         
+        max_length: int = MAX_LOCATOR_LENGTH
+            The maximum length of `dirty_url`.
+        
         Raises
         ------
         ValueError
             If regex could not find matches using the `dirty_url`.
-
+            OR If `dirty_url` is too long.
+        
         Returns
         -------
         UrlAuthority
         """
-        result: t.Dict[str, str] = parse_dirty_url(dirty_url, none_str="to_str")
+        if len(dirty_url) > max_length:
+            raise ValueError(
+                f"Locator is too long ({len(dirty_url)} characters, the limit is {max_length})"
+            )
+        engine = get_parser_engine()
+        result: t.Dict[str, str] = engine.parse_dirty_url(dirty_url, none_str="to_str")
         if result == {}:
-            result = parse_scp_dirty_loc(dirty_url, none_str="to_str")
+            result = engine.parse_scp_dirty_loc(dirty_url, none_str="to_str")
             result["scheme"] = "ssh"
             result["explicit_scp"] = True
         if result == {}:
@@ -557,16 +672,16 @@ class LocatorBuilder(BaseLocator):
         The scheme used to access the remote repository.
         Comes before everything else in a URL and is suffixed by '://'.
         Examples: https, ssh
-
+    
     host: str
         The host where the remote repository is located.
         Examples: github.com, 1.1.1.1
-
+    
     username: str
         The username used to access the remote repository.
         Comes before the host and is separated from the latter by '@'.
         Examples: git (in git@github.com)
-
+    
     password: str
         Password of the user used to authenticate themselves.
         If present, must come after a username (separated by ':') and before
@@ -579,70 +694,81 @@ class LocatorBuilder(BaseLocator):
         The port used to connect to the server.
         If present, must come after the host name and must be an integer
         between 0 and 65535 (inclusive).
-
+    
     path: str
         The path to the remote repository
         (not referring to where the local clone is located).
         Comes after the host and separated from it by '/'.
         Examples: RenoirTan/QuickClone
         (in https://github.com/RenoirTan/QuickClone)
-
+    
     query: str
         The parameters in the URL.
         Comes after the path or host and the start of the query section is
         denoted by '?'.
         You can chain multiple key-value pairs using '&' as the separator.
         Examples: key=value (in https://example.com?key=value)
-
+    
     fragment: str
         The fragment identifying a secondary resource.
         The last part of the URL. The fragment section is denoted by '#'.
         Examples: History
         (in https://en.wikipedia.org/wiki/Python_(programming_language)#History)
     """
-
+    
+    __slots__ = ()
+    
     DEFAULT_SCHEME: str = "https"
     """
     The default scheme used to access the remote repository. By default this is "https".
     """
-
+    
     DEFAULT_HOST: str = "github.com"
     """
     The default host where the remote repository is located. By default this is "github.com".
     """
-
+    
     def get_scheme(self) -> str:
         """Get the scheme used to access the remote repository."""
-        return self.DEFAULT_SCHEME if self.scheme == "" else self.scheme
-
+        return self.DEFAULT_SCHEME if self._scheme == "" else self._scheme
+    
     def get_host(self) -> str:
         """Get the host name of the website hosting the remote repository."""
-        return self.DEFAULT_HOST if self.host == "" else self.host
+        return self.DEFAULT_HOST if self._host == "" else self._host
 
 
 class UrlAuthority(object):
     """
     The authority component in a URL. This includes the host name, username
     password and port in the URL. Example: username:password@example.com:80
-
+    
     Parameters
     ----------
     self: UrlAuthority
         The UrlAuthority object to be initialised.
-
+    
     host: str
         The host name of the URL.
-
+    
     username: str = ""
         The username in the URL.
-
+    
     password: str = ""
         The password in the URL.
     
     port: str = ""
         The port in the URL. Must be a value between 0 and 65535 (inclusive).
+    
+    Like locators, authorities are immutable.
     """
-
+    
+    __slots__ = ("_host", "_username", "_password", "_port", "_string")
+    
+    host = _read_only("host")
+    username = _read_only("username")
+    password = _read_only("password")
+    port = _read_only("port")
+    
     def __init__(
         self,
         host: str,
@@ -650,30 +776,27 @@ class UrlAuthority(object):
         password: str = "",
         port: str = ""
     ) -> None:
-        self.host = host
-        self.username = username
-        self.password = password
-        self.port = port
+        self._host = host
+        self._username = username
+        self._password = password
+        self._port = port
+        self._string: t.Optional[str] = None
     
     def __str__(self) -> str:
-        userpass_part = self.username
-        if self.password != "":
-            userpass_part += f":{self.password}"
-        if len(userpass_part) > 0:
-            userpass_part += "@"
-        port_part = f":{self.port}" if self.port != "" else ""
-        return userpass_part + self.host + port_part
-
+        if self._string is None:
+            self._string = _authority_to_string(self._host, self._username, self._password, self._port)
+        return self._string
+    
     @classmethod
     def process_authority(cls, authority: str) -> UrlAuthority:
         """
         Convert an authority (as a string) into a `UrlAuthority` object.
-
+        
         Parameters
         ----------
         cls: typing.Type[UrlAuthority]
             The UrlAuthority class.
-
+        
         authority: str
             The authority section in the URL.
         
@@ -681,12 +804,12 @@ class UrlAuthority(object):
         ------
         ValueError
             If password provided without providing username.
-
+        
         Returns
         -------
         UrlAuthority
         """
-        result = parse_authority(authority, none_str="to_str")
+        result = get_parser_engine().parse_authority(authority, none_str="to_str")
         host = result["host"]
         username = result["username"]
         password = result["password"]
@@ -38,7 +38,7 @@ def extract_groups(
         `extract_group(..., combine={"path": ["path_type1", "path_type2"], ...})`
         in the final dictionary. However, if more than 1 of any of the 2
         possible groups appear, a ValueError will be raised.
-        
+    
     Raises
     ------
     ValueError
@@ -90,10 +90,156 @@ def extract_groups(
     return result
 
 
+class LocatorParser(object):
+    """
+    A parser splitting locators matched by a regex into a dictionary of named
+    groups, like `extract_groups` but faster.
+    
+    Where each group of each name is in the regex, how `None` and empty
+    strings are converted and how named groups are combined are worked out
+    once when the parser is created, so every call only searches the regex
+    and builds the dictionary from `re.Match.groups` in one pass.
+    
+    Parameters
+    ----------
+    regex: re.Pattern[str]
+        A compiled regex pattern.
+    
+    names: Iterable[str]
+        A list of named groups that the parser should encounter in the regex
+        matches.
+    
+    combine: Optional[Mapping[str, List[str]]] = None
+        Named groups treated as the same named group. See `extract_groups`.
+    """
+    
+    _NONE_STRS: t.Tuple[str, ...] = ("ignore", "to_none", "to_str")
+    
+    def __init__(
+        self,
+        regex: re.Pattern[str],
+        names: t.Iterable[str],
+        combine: t.Optional[t.Mapping[str, t.List[str]]] = None
+    ) -> None:
+        self.regex = regex
+        self.names = list(names)
+        self.combine = {} if combine is None else dict(combine)
+        # Named groups missing from the regex point to a `None` added after
+        # the values of the groups.
+        missing = regex.groups
+        self._pad = False
+        self._fields: t.List[t.Tuple[str, t.Tuple[int, ...]]] = []
+        for name in self.names:
+            indices = []
+            for related in self.combine.get(name, [name]):
+                index = regex.groupindex.get(related)
+                if index is None:
+                    self._pad = True
+                    indices.append(missing)
+                else:
+                    indices.append(index - 1)
+            self._fields.append((name, tuple(indices)))
+        self._simple: t.Optional[t.List[t.Tuple[str, int]]] = None
+        if all(len(indices) == 1 for _, indices in self._fields):
+            self._simple = [(name, indices[0]) for name, indices in self._fields]
+    
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"regex={repr(self.regex)}, "
+            f"names={repr(self.names)}, "
+            f"combine={repr(self.combine)})"
+        )
+    
+    def __call__(
+        self,
+        input: str,
+        none_str: str = "ignore",
+        combine: t.Optional[t.Mapping[str, t.List[str]]] = None
+    ) -> t.Dict[str, t.Optional[str]]:
+        """
+        Parse a locator.
+        
+        Parameters
+        ----------
+        input: str
+            The locator.
+        
+        none_str: str = "ignore"
+            How `None` and empty strings are converted. See `extract_groups`.
+        
+        combine: Optional[Mapping[str, List[str]]] = None
+            Named groups to combine instead of the ones given when the parser
+            was created. See `extract_groups`.
+        
+        Raises
+        ------
+        ValueError
+            See `extract_groups`.
+        
+        Returns
+        -------
+        Dict[str, Optional[str]]
+            The named groups and their values, or an empty dictionary if the
+            regex doesn't match `input`.
+        """
+        matches = self.regex.search(input)
+        if matches is None:
+            return {}
+        if combine is not None:
+            return extract_groups(matches, self.names, none_str, combine)
+        return self.extract(matches, none_str)
+    
+    def extract(self, matches: re.Match, none_str: str = "ignore") -> t.Dict[str, t.Optional[str]]:
+        """
+        Extract the named groups from the matches of this parser's regex, like
+        `extract_groups(matches, names, none_str, combine)`.
+        """
+        if none_str not in self._NONE_STRS:
+            raise ValueError(f"Invalid none_str: {none_str}")
+        values = matches.groups()
+        if self._pad:
+            values += (None,)
+        if self._simple is not None:
+            if none_str == "ignore":
+                return {name: values[index] for name, index in self._simple}
+            elif none_str == "to_str":
+                return {
+                    name: "" if values[index] is None else values[index]
+                    for name, index in self._simple
+                }
+            else:
+                return {
+                    name: None if values[index] == "" else values[index]
+                    for name, index in self._simple
+                }
+        result: t.Dict[str, t.Optional[str]] = {}
+        for name, indices in self._fields:
+            for index in indices:
+                value = values[index]
+                if value is None or value == "":
+                    if none_str == "to_none":
+                        value = None
+                    elif none_str == "to_str":
+                        value = ""
+                current_value = result.get(name)
+                if current_value is not None and value is not None:
+                    raise ValueError(
+                        f"'{name}' has already been filled by '{current_value}' "
+                        f"but a new value ('{value}') was found."
+                    )
+                elif current_value is None:
+                    result[name] = value
+            if name not in result:
+                result[name] = None if none_str == "to_str" else ""
+        return result
+
+
 def make_parser(
     regex: re.Pattern[str],
-    names: t.Iterable[str]
-) -> t.Callable[[str, t.Mapping[t.str, t.Any]], t.Dict[str, t.Optional[str]]]:
+    names: t.Iterable[str],
+    combine: t.Optional[t.Mapping[str, t.List[str]]] = None
+) -> LocatorParser:
     """
     Create a function that can parse locators.
     
@@ -107,20 +253,15 @@ def make_parser(
         A list of named groups that the parser should encounter in the regex
         matches.
     
+    combine: Optional[Mapping[str, List[str]]] = None
+        Named groups treated as the same named group. See `extract_groups`.
+    
     Returns
     -------
-    Callable[[str, Mapping[t.Str, Any]], Dict[str, Optional[str]]]
-        The parser function.
+    LocatorParser
+        The parser, which is called like a function.
     """
-    
-    def parser(input: str, **kwargs: t.Any) -> t.Dict[str, t.Optional[str]]:
-        matches = regex.search(input)
-        if matches is None:
-            return {}
-        else:
-            return extract_groups(matches, names, **kwargs)
-    
-    return parser
+    return LocatorParser(regex, names, combine)
 
 
 UNRESERVED: str = r"[0-9a-zA-Z._~\-]"
@@ -251,7 +392,7 @@ authority: str
     The authority segment in a URL.
 
 **kwargs: Any
-    Keyword arguments to be passed to `extract_groups`.
+    Keyword arguments to be passed to `LocatorParser.__call__`.
 
 Returns
 -------
@@ -286,7 +427,7 @@ url: str
     The full URL.
 
 **kwargs: Any
-    Keyword arguments to be passed to `extract_groups`.
+    Keyword arguments to be passed to `LocatorParser.__call__`.
 
 Returns
 -------
@@ -323,7 +464,7 @@ url: str
     The user-inputted URL.
 
 **kwargs: Any
-    Keyword arguments to be passed to `extract_groups`.
+    Keyword arguments to be passed to `LocatorParser.__call__`.
 
 Returns
 -------
@@ -355,7 +496,7 @@ url: str
     The full URL.
 
 **kwargs: Any
-    Keyword arguments to be passed to `extract_groups`.
+    Keyword arguments to be passed to `LocatorParser.__call__`.
 
 Returns
 -------
@@ -388,10 +529,120 @@ url: str
     The user-inputted URL.
 
 **kwargs: Any
-    Keyword arguments to be passed to `extract_groups`.
+    Keyword arguments to be passed to `LocatorParser.__call__`.
 
 Returns
 -------
 Dict[str, Optional[str]]
     The parts of the locator.
 """
+
+
+class ParserEngine(object):
+    """
+    A set of functions parsing each kind of locator. The functions take the
+    same arguments and return the same dictionaries as the parsers in this
+    module.
+    
+    Parameters
+    ----------
+    name: str
+        The name of the engine, like 'regex'.
+    
+    parse_authority, parse_full_url, parse_dirty_url, parse_scp_full_loc,
+    parse_scp_dirty_loc: Callable[..., Dict[str, Optional[str]]]
+        The parsers.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        parse_authority: t.Callable[..., t.Dict[str, t.Optional[str]]],
+        parse_full_url: t.Callable[..., t.Dict[str, t.Optional[str]]],
+        parse_dirty_url: t.Callable[..., t.Dict[str, t.Optional[str]]],
+        parse_scp_full_loc: t.Callable[..., t.Dict[str, t.Optional[str]]],
+        parse_scp_dirty_loc: t.Callable[..., t.Dict[str, t.Optional[str]]]
+    ) -> None:
+        self.name = name
+        self.parse_authority = parse_authority
+        self.parse_full_url = parse_full_url
+        self.parse_dirty_url = parse_dirty_url
+        self.parse_scp_full_loc = parse_scp_full_loc
+        self.parse_scp_dirty_loc = parse_scp_dirty_loc
+    
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={repr(self.name)})"
+
+
+REGEX_ENGINE: ParserEngine = ParserEngine(
+    "regex",
+    parse_authority,
+    parse_full_url,
+    parse_dirty_url,
+    parse_scp_full_loc,
+    parse_scp_dirty_loc
+)
+"""
+The parser engine using the regular expressions in this module.
+"""
+
+
+PARSER_ENGINES: t.Tuple[str, ...] = ("regex", "tokenizer")
+"""
+The names of the parser engines. The first one is the default.
+
+1. 'regex': the regular expressions in this module, which can backtrack a lot
+   on long or malformed locators.
+2. 'tokenizer': `quickclone.remote.tokenizer`, which tokenizes locators in
+   linear time.
+
+Both engines accept the same locators and split them the same way.
+"""
+
+
+_parser_engine: t.Optional[ParserEngine] = None
+
+
+def get_parser_engine(name: t.Optional[str] = None) -> ParserEngine:
+    """
+    Get a parser engine by its name (see `PARSER_ENGINES`), or the engine
+    chosen with `set_parser_engine` if `name` is `None`.
+    
+    Raises
+    ------
+    ValueError
+        If there is no engine called `name`.
+    """
+    global _parser_engine
+    
+    if name is None:
+        if _parser_engine is None:
+            _parser_engine = get_parser_engine(PARSER_ENGINES[0])
+        return _parser_engine
+    if name == "regex":
+        return REGEX_ENGINE
+    if name == "tokenizer":
+        from .tokenizer import TOKENIZER_ENGINE
+        return TOKENIZER_ENGINE
+    raise ValueError(f"unknown parser engine: {name}")
+
+
+def set_parser_engine(name: str) -> ParserEngine:
+    """
+    Choose the parser engine used by the locators in
+    `quickclone.remote.locators`.
+    
+    Raises
+    ------
+    ValueError
+        If there is no engine called `name`.
+    
+    Returns
+    -------
+    ParserEngine
+        The chosen engine.
+    """
+    global _parser_engine
+    
+    _parser_engine = get_parser_engine(name)
+    return _parser_engine
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import typing as t
 
-from .locators import BaseLocator, UrlAuthority
+from .locators import BaseLocator, _authority_to_string, _read_only
 
 
 class ScpLocator(object):
@@ -16,12 +16,12 @@ class ScpLocator(object):
     host: str = ""
         The host where the remote repository is located.
         Examples: github.com, 1.1.1.1
-
+    
     username: str = ""
         The username used to access the remote repository.
         Comes before the host and is separated from the latter by '@'.
         Examples: git (in git@github.com)
-
+    
     password: str = ""
         Password of the user used to authenticate themselves.
         If present, must come after a username (separated by ':') and before
@@ -36,8 +36,18 @@ class ScpLocator(object):
     
     **kwargs: Any
         Miscellaneous data.
+    
+    Like `quickclone.remote.locators.BaseLocator`, SCP locators are immutable
+    except for `kwargs`.
     """
     
+    __slots__ = ("_host", "_username", "_password", "_path", "_kwargs", "_string")
+    
+    host = _read_only("host")
+    username = _read_only("username")
+    password = _read_only("password")
+    path = _read_only("path")
+    
     def __init__(
         self,
         host: str = "",
@@ -46,26 +56,27 @@ class ScpLocator(object):
         path: str = "",
         **kwargs
     ) -> None:
-        self.host = host
-        self.username = username
-        self.password = password
-        self.path = path
-        self.kwargs = kwargs
+        self._host = host
+        self._username = username
+        self._password = password
+        self._path = path
+        self._kwargs = kwargs if kwargs else None
+        self._string: t.Optional[str] = None
     
     def __str__(self) -> str:
-        authority_part = authority_part = str(
-            UrlAuthority(self.get_host(), self.get_username(), self.get_password(), "")
-        )
-        path_part = f":{self.get_path()}" if self.get_path() != "" else ""
-        return authority_part + path_part
-        
+        if self._string is None:
+            authority_part = _authority_to_string(self._host, self._username, self._password, "")
+            path_part = f":{self._path}" if self._path != "" else ""
+            self._string = authority_part + path_part
+        return self._string
+    
     def __repr__(self) -> str:
         return (
             f"{self.__class__.__name__}("
             f"host={repr(self.host)}, "
             f"username={repr(self.username)}, "
             f"password={repr(self.password)}, "
-            f"path={repr(self.path)}"
+            f"path={repr(self.path)})"
         )
     
     def __iter__(self) -> t.Generator[t.Tuple[str, str], None, None]:
@@ -74,21 +85,28 @@ class ScpLocator(object):
         yield "password", self.get_password()
         yield "path", self.get_path()
     
+    @property
+    def kwargs(self) -> t.Dict[str, t.Any]:
+        """Miscellaneous data, which can be modified."""
+        if self._kwargs is None:
+            self._kwargs = {}
+        return self._kwargs
+    
     def get_host(self) -> str:
         """Get the host name of the website hosting the remote repository."""
-        return self.host
+        return self._host
     
     def get_username(self) -> str:
         """Get the username used to access the remote repository."""
-        return self.username
+        return self._username
     
     def get_password(self) -> str:
         """Get the password used to access the remote repository."""
-        return self.password
+        return self._password
     
     def get_path(self) -> str:
         """Get the path of the remote repository (in the website)."""
-        return self.path
+        return self._path
     
     @classmethod
     def from_locator(cls, locator: BaseLocator) -> ScpLocator:
@@ -0,0 +1,636 @@
+from __future__ import annotations
+from itertools import chain
+import typing as t
+
+from .parser import ParserEngine, extract_groups
+
+__all__ = [
+    "tokenize_authority",
+    "tokenize_full_url",
+    "tokenize_dirty_url",
+    "tokenize_scp_full_loc",
+    "tokenize_scp_dirty_loc",
+    "TOKENIZER_ENGINE"
+]
+
+
+# The tokenizer accepts exactly the locators matched by the regular expressions
+# in `quickclone.remote.parser` and splits them the same way, including the
+# quirks of backtracking (for example, 'github.comx9/path' has 'github.comx'
+# as its host and '9/path' as its path, since the '/' before the path is
+# optional). Instead of backtracking over every character, it lists where
+# each part of the authority could end (in the order the regular expressions
+# try them) and checks what follows each candidate with tables computed once
+# per locator, so every locator is tokenized in linear time.
+
+
+_DIGITS: str = "0123456789"
+_HEX: t.FrozenSet[str] = frozenset("0123456789abcdefABCDEF")
+_ALPHA: t.FrozenSet[str] = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+)
+_ALNUM: t.FrozenSet[str] = _ALPHA | frozenset(_DIGITS)
+_LABEL: t.FrozenSet[str] = _ALNUM | frozenset("-_")
+_SCHEME: t.FrozenSet[str] = _ALNUM | frozenset("+.-")
+_UNRESERVED: t.FrozenSet[str] = _ALNUM | frozenset("._~-")
+_SUB_DELIMS: t.FrozenSet[str] = frozenset("!$&'()*+,;=")
+_CHAR: t.FrozenSet[str] = _UNRESERVED | _SUB_DELIMS
+_PATH_CHAR: t.FrozenSet[str] = _CHAR | frozenset("@")
+_PATH_TEXT: str = "".join(sorted(_PATH_CHAR | frozenset("/%")))
+_QUERY_CHAR: t.FrozenSet[str] = _CHAR | frozenset("/?")
+
+_FAILED = object()
+"""
+Returned by the path functions when nothing can follow the authority.
+"""
+
+_Found = t.Tuple[
+    int,
+    t.Optional[str],
+    t.Optional[str],
+    int,
+    int,
+    str,
+    t.Optional[str]
+]
+"""
+A candidate authority: its end, username, password, the start and end of its
+host, the kind of host ('domain', 'ipv4' or 'ipv6') and its port.
+"""
+
+_Matcher = t.Callable[[str, int, int], t.Iterator[int]]
+
+
+class _Groups(object):
+    """
+    Stands in for the `re.Match` object `extract_groups` expects.
+    """
+    
+    __slots__ = ("groups",)
+    
+    def __init__(self, groups: t.Mapping[str, t.Optional[str]]) -> None:
+        self.groups = groups
+    
+    def group(self, name: str) -> t.Optional[str]:
+        try:
+            return self.groups[name]
+        except KeyError:
+            raise IndexError(f"no such group: {name}")
+
+
+def _escaped(s: str, i: int, end: int) -> bool:
+    return i + 3 <= end and s[i + 1] in _HEX and s[i + 2] in _HEX
+
+
+def _valid(s: str, start: int, end: int, chars: t.FrozenSet[str]) -> bool:
+    if chars.issuperset(s[start:end]):
+        return True
+    for i in range(start, end):
+        c = s[i]
+        if c not in chars and (c != "%" or not _escaped(s, i, end)):
+            return False
+    return True
+
+
+def _last_bad(s: str, end: int) -> int:
+    """
+    Find the last position before `end` that stops the rest of `s[:end]` from
+    being a path made of non-empty segments: a character that isn't allowed,
+    a malformed percent escape or the first of 2 consecutive slashes.
+    """
+    # Everything after the last character that can't be in a path at all is
+    # made of path characters, slashes and '%'.
+    start = len(s[:end].rstrip(_PATH_TEXT))
+    bad = max(start - 1, s.rfind("//", start, end))
+    percent = s.rfind("%", start, end)
+    while percent > bad:
+        if not _escaped(s, percent, end):
+            return percent
+        percent = s.rfind("%", start, percent)
+    return bad
+
+
+def _scheme_end(s: str, end: int) -> int:
+    """
+    Get the position after '://' if `s` starts with a scheme, otherwise -1.
+    """
+    if end == 0 or s[0] not in _ALPHA:
+        return -1
+    i = 1
+    while i < end and s[i] in _SCHEME:
+        i += 1
+    return i + 3 if s.startswith("://", i, end) else -1
+
+
+def _split_query(s: str, end: int) -> t.Optional[t.Tuple[int, t.Optional[str], t.Optional[str]]]:
+    """
+    Find where the path ends and get the query and fragment, or `None` if the
+    query or fragment is invalid.
+    """
+    question = s.find("?", 0, end)
+    hash = s.find("#", 0, end)
+    query = None
+    fragment = None
+    path_end = end
+    if hash != -1:
+        if not _valid(s, hash + 1, end, _QUERY_CHAR):
+            return None
+        fragment = s[hash + 1:end]
+        path_end = hash
+    if question != -1 and question < path_end:
+        if not _valid(s, question + 1, path_end, _QUERY_CHAR):
+            return None
+        query = s[question + 1:path_end]
+        path_end = question
+    return path_end, query, fragment
+
+
+def _text(text: str) -> _Matcher:
+    def match(s: str, i: int, end: int) -> t.Iterator[int]:
+        if s.startswith(text, i, end):
+            yield i + len(text)
+    
+    return match
+
+
+def _chars(chars: t.Container[str], least: int, most: t.Optional[int] = None) -> _Matcher:
+    def match(s: str, i: int, end: int) -> t.Iterator[int]:
+        j = i
+        limit = end if most is None else min(end, i + most)
+        while j < limit and s[j] in chars:
+            j += 1
+        while j >= i + least:
+            yield j
+            j -= 1
+    
+    return match
+
+
+def _sequence(*matchers: _Matcher) -> _Matcher:
+    def match(s: str, i: int, end: int) -> t.Iterator[int]:
+        def rest(k: int, j: int) -> t.Iterator[int]:
+            if k == len(matchers):
+                yield j
+                return
+            for after in matchers[k](s, j, end):
+                yield from rest(k + 1, after)
+        
+        return rest(0, i)
+    
+    return match
+
+
+def _either(*matchers: _Matcher) -> _Matcher:
+    def match(s: str, i: int, end: int) -> t.Iterator[int]:
+        for matcher in matchers:
+            yield from matcher(s, i, end)
+    
+    return match
+
+
+def _repeat(matcher: _Matcher, least: int, most: int) -> _Matcher:
+    def match(s: str, i: int, end: int) -> t.Iterator[int]:
+        def rest(count: int, j: int) -> t.Iterator[int]:
+            if count < most:
+                for after in matcher(s, j, end):
+                    yield from rest(count + 1, after)
+            if count >= least:
+                yield j
+        
+        return rest(0, i)
+    
+    return match
+
+
+def _ipv6_matcher() -> _Matcher:
+    # Mirrors `quickclone.remote.parser.IPV6_REGEX_RAW` alternative by
+    # alternative. IPv6 addresses are short, so backtracking over them is
+    # cheap, except for the zone index, which `_chars` handles in one pass.
+    hex4 = _chars(_HEX, 1, 4)
+    colon = _text(":")
+    head = _sequence(hex4, colon)
+    tail = _sequence(colon, hex4)
+    digit = _chars(_DIGITS, 1, 1)
+    octet = _either(
+        _sequence(_text("25"), _chars("012345", 1, 1)),
+        _sequence(
+            _repeat(
+                _either(
+                    _sequence(_text("2"), _chars("01234", 1, 1)),
+                    _sequence(_chars("1", 0, 1), digit)
+                ),
+                0,
+                1
+            ),
+            digit
+        )
+    )
+    ipv4 = _sequence(_repeat(_sequence(octet, _text(".")), 3, 3), octet)
+    return _either(
+        _sequence(_repeat(head, 7, 7), hex4),
+        _sequence(_repeat(head, 1, 7), colon),
+        _sequence(_repeat(head, 1, 6), colon, hex4),
+        _sequence(_repeat(head, 1, 5), _repeat(tail, 1, 2)),
+        _sequence(_repeat(head, 1, 4), _repeat(tail, 1, 3)),
+        _sequence(_repeat(head, 1, 3), _repeat(tail, 1, 4)),
+        _sequence(_repeat(head, 1, 2), _repeat(tail, 1, 5)),
+        _sequence(hex4, colon, _repeat(tail, 1, 6)),
+        _sequence(colon, _either(_repeat(tail, 1, 7), colon)),
+        _sequence(
+            _text("fe80:"),
+            _repeat(_sequence(colon, _chars(_HEX, 0, 4)), 0, 4),
+            _text("%"),
+            _chars(_ALNUM, 1)
+        ),
+        _sequence(
+            _text("::"),
+            _repeat(
+                _sequence(_text("ffff"), _repeat(_sequence(colon, _chars("0", 1, 4)), 0, 1), colon),
+                0,
+                1
+            ),
+            ipv4
+        ),
+        _sequence(_repeat(head, 1, 4), colon, ipv4)
+    )
+
+
+_ipv6_ends: _Matcher = _ipv6_matcher()
+
+
+def _is_label(s: str, start: int, end: int) -> bool:
+    return (
+        0 < end - start <= 63 and
+        s[start] in _ALNUM and
+        s[end - 1] in _ALNUM
+    )
+
+
+def _domain_ends(s: str, i: int, end: int) -> t.Iterator[int]:
+    dots = []
+    start = i
+    while True:
+        j = start
+        while j < end and s[j] in _LABEL:
+            j += 1
+        if j < end and s[j] == "." and _is_label(s, start, j):
+            dots.append(j)
+            start = j + 1
+        else:
+            break
+    # The more labels and the longer the top-level domain, the earlier the
+    # regular expression tries it.
+    for dot in reversed(dots):
+        tld = dot + 1
+        if tld >= end or s[tld] not in _ALNUM:
+            continue
+        j = tld + 1
+        limit = min(end, tld + 63)
+        while j < limit and s[j] in _LABEL:
+            j += 1
+        for after in range(j, tld + 1, -1):
+            if s[after - 1] in _ALPHA:
+                yield after
+
+
+def _digit(s: str, i: int, end: int) -> bool:
+    # Like '\d' in the regular expressions, this includes non-ASCII digits.
+    return i < end and s[i].isdecimal()
+
+
+def _octet_ends(s: str, i: int, end: int) -> t.Iterator[int]:
+    if i >= end:
+        return
+    c = s[i]
+    if c == "2" and i + 2 < end:
+        if s[i + 1] == "5" and s[i + 2] in "012345":
+            yield i + 3
+        if s[i + 1] in "01234" and s[i + 2].isdecimal():
+            yield i + 3
+    if c == "1" and _digit(s, i + 1, end) and _digit(s, i + 2, end):
+        yield i + 3
+    if c in "123456789" and _digit(s, i + 1, end):
+        yield i + 2
+    if c.isdecimal():
+        yield i + 1
+
+
+def _ipv4_ends(s: str, i: int, end: int) -> t.Iterator[int]:
+    def rest(count: int, j: int) -> t.Iterator[int]:
+        for after in _octet_ends(s, j, end):
+            if count == 3:
+                yield after
+            elif after < end and s[after] == ".":
+                yield from rest(count + 1, after + 1)
+    
+    return rest(0, i)
+
+
+def _port_ends(s: str, i: int, end: int) -> t.Iterator[int]:
+    w = s[i:min(end, i + 5)]
+    digits = 0
+    while digits < len(w) and w[digits].isdecimal():
+        digits += 1
+    if digits == 0:
+        return
+    if len(w) == 5:
+        if w.startswith("6553") and w[4] in "012345":
+            yield i + 5
+        if w.startswith("655") and w[3] in "012" and digits == 5:
+            yield i + 5
+        if w.startswith("65") and w[2] in "01234" and digits == 5:
+            yield i + 5
+        if w[0] == "6" and w[1] in "01234" and digits == 5:
+            yield i + 5
+        if w[0] in "12345" and digits == 5:
+            yield i + 5
+    if digits >= 4:
+        yield i + 4
+    if w[0] in "123456789":
+        for after in range(min(digits, 4), 0, -1):
+            yield i + after
+    if w[0] in _DIGITS:
+        yield i + 1
+
+
+def _host_ends(s: str, i: int, end: int) -> t.Iterator[t.Tuple[int, str]]:
+    for after in _domain_ends(s, i, end):
+        yield after, "domain"
+    for after in _ipv4_ends(s, i, end):
+        yield after, "ipv4"
+    # Every IPv6 address starts with a hexadecimal digit or ':' and has a ':'
+    # within its first 5 characters.
+    if i < end and (s[i] in _HEX or s[i] == ":") and ":" in s[i:min(end, i + 5)]:
+        for after in _ipv6_ends(s, i, end):
+            yield after, "ipv6"
+
+
+def _userinfo(
+    s: str,
+    i: int,
+    end: int
+) -> t.Optional[t.Tuple[str, t.Optional[str], int]]:
+    """
+    Get the username, password and the position after the '@' at the start
+    of an authority, or `None` if there is no user information.
+    """
+    if s.find("@", i, end) == -1:
+        return None
+    start = i
+    colon = -1
+    while i < end:
+        c = s[i]
+        if c in _CHAR:
+            i += 1
+        elif c == "%" and _escaped(s, i, end):
+            i += 3
+        elif c == ":":
+            if colon == -1:
+                colon = i
+            i += 1
+        elif c == "@":
+            break
+        else:
+            return None
+    else:
+        return None
+    if colon == -1:
+        return (s[start:i], None, i + 1) if i > start else None
+    if colon == start or colon + 1 == i:
+        return None
+    return s[start:colon], s[colon + 1:i], i + 1
+
+
+def _authorities(s: str, start: int, end: int) -> t.Iterator[_Found]:
+    """
+    List the authorities `s` could start with from position `start`, in the
+    order the regular expressions try them.
+    """
+    userinfo = _userinfo(s, start, end)
+    choices = [(None, None, start)]
+    if userinfo is not None:
+        choices.insert(0, userinfo)
+    for username, password, host in choices:
+        for after, kind in _host_ends(s, host, end):
+            if after < end and s[after] == ":":
+                for port in _port_ends(s, after + 1, end):
+                    yield port, username, password, host, after, kind, s[after + 1:port]
+            yield after, username, password, host, after, kind, None
+
+
+def _authority_groups(
+    s: str,
+    start: int,
+    found: t.Optional[_Found]
+) -> t.Dict[str, t.Optional[str]]:
+    if found is None:
+        return {
+            "authority": None,
+            "host": None,
+            "domain": None,
+            "ipv4": None,
+            "ipv6": None,
+            "username": None,
+            "password": None,
+            "port": None
+        }
+    after, username, password, host_start, host_end, kind, port = found
+    host = s[host_start:host_end]
+    return {
+        "authority": s[start:after],
+        "host": host,
+        "domain": host if kind == "domain" else None,
+        "ipv4": host if kind == "ipv4" else None,
+        "ipv6": host if kind == "ipv6" else None,
+        "username": username,
+        "password": password,
+        "port": port
+    }
+
+
+def _end(s: str) -> int:
+    # '$' also matches before a newline at the end of the string.
+    return len(s) - 1 if s.endswith("\n") else len(s)
+
+
+def _tokenize_authority(s: str) -> t.Optional[t.Dict[str, t.Optional[str]]]:
+    end = _end(s)
+    for found in _authorities(s, 0, end):
+        if found[0] == end:
+            return _authority_groups(s, 0, found)
+    return None
+
+
+def _tokenize_url(s: str, dirty: bool) -> t.Optional[t.Dict[str, t.Optional[str]]]:
+    end = _end(s)
+    split = _split_query(s, end)
+    if split is None:
+        return None
+    path_end, query, fragment = split
+    scheme_end = _scheme_end(s, path_end)
+    if scheme_end == -1 and not dirty:
+        return None
+    bad = _last_bad(s, path_end)
+    
+    def path_at(i: int) -> t.Any:
+        if i == path_end:
+            return "" if dirty else None
+        if s[i] != "/":
+            return s[i:path_end] if dirty and i > bad else _FAILED
+        i += 1
+        if i == path_end:
+            return ""
+        if s[i] != "/" and i > bad:
+            return s[i:path_end]
+        if s[i] == "/" and i + 1 == path_end:
+            return "/"
+        return _FAILED
+    
+    starts = [scheme_end]
+    if dirty:
+        starts = [scheme_end, 0] if scheme_end != -1 else [0]
+    for start in starts:
+        candidates: t.Iterable[t.Optional[_Found]] = _authorities(s, start, path_end)
+        if dirty:
+            candidates = chain(candidates, [None])
+        for found in candidates:
+            path = path_at(start if found is None else found[0])
+            if path is _FAILED:
+                continue
+            groups: t.Dict[str, t.Optional[str]] = {
+                "dirty_url" if dirty else "full_url": s[:end],
+                "scheme": s[:scheme_end - 3] if start > 0 else None
+            }
+            groups.update(_authority_groups(s, start, found))
+            groups["path"] = path
+            groups["query"] = query
+            groups["fragment"] = fragment
+            return groups
+    return None
+
+
+def _tokenize_scp(s: str, dirty: bool) -> t.Optional[t.Dict[str, t.Optional[str]]]:
+    end = _end(s)
+    bad = _last_bad(s, end)
+    
+    def path_at(i: int) -> t.Any:
+        if i == end:
+            return None
+        if s[i] != ":":
+            return _FAILED
+        i += 1
+        if i == end:
+            return ""
+        if s[i] != "/":
+            return s[i:end] if i > bad else _FAILED
+        if i + 1 == end or (s[i + 1] != "/" and i + 1 > bad):
+            return s[i:end]
+        return _FAILED
+    
+    candidates: t.Iterable[t.Optional[_Found]] = _authorities(s, 0, end)
+    if dirty:
+        candidates = chain(candidates, [None])
+    for found in candidates:
+        path = path_at(0 if found is None else found[0])
+        if path is _FAILED:
+            continue
+        groups: t.Dict[str, t.Optional[str]] = {"scp_dirty" if dirty else "scp_full": s[:end]}
+        groups.update(_authority_groups(s, 0, found))
+        groups["path"] = path
+        return groups
+    return None
+
+
+def _make_tokenizer(
+    tokenize: t.Callable[[str], t.Optional[t.Dict[str, t.Optional[str]]]],
+    names: t.List[str]
+) -> t.Callable[..., t.Dict[str, t.Optional[str]]]:
+    def tokenizer(
+        input: str,
+        none_str: str = "ignore",
+        **kwargs: t.Any
+    ) -> t.Dict[str, t.Optional[str]]:
+        groups = tokenize(input)
+        if groups is None:
+            return {}
+        if len(kwargs) > 0:
+            return extract_groups(_Groups(groups), names, none_str, **kwargs)
+        # The same as `extract_groups` without `combine`.
+        if none_str == "ignore":
+            return {name: groups[name] for name in names}
+        elif none_str == "to_str":
+            return {name: "" if groups[name] is None else groups[name] for name in names}
+        elif none_str == "to_none":
+            return {name: None if groups[name] == "" else groups[name] for name in names}
+        raise ValueError(f"Invalid none_str: {none_str}")
+    
+    return tokenizer
+
+
+_AUTHORITY_NAMES: t.List[str] = [
+    "authority",
+    "host",
+    "domain",
+    "ipv4",
+    "ipv6",
+    "username",
+    "password",
+    "port"
+]
+
+
+tokenize_authority = _make_tokenizer(_tokenize_authority, _AUTHORITY_NAMES)
+"""
+Tokenize the authority segment in a URL like
+`quickclone.remote.parser.parse_authority`.
+"""
+
+
+tokenize_full_url = _make_tokenizer(
+    lambda s: _tokenize_url(s, False),
+    ["full_url", "scheme", *_AUTHORITY_NAMES, "path", "query", "fragment"]
+)
+"""
+Tokenize a full URL like `quickclone.remote.parser.parse_full_url`.
+"""
+
+
+tokenize_dirty_url = _make_tokenizer(
+    lambda s: _tokenize_url(s, True),
+    ["dirty_url", "scheme", *_AUTHORITY_NAMES, "path", "query", "fragment"]
+)
+"""
+Tokenize a user-inputted URL like `quickclone.remote.parser.parse_dirty_url`.
+"""
+
+
+tokenize_scp_full_loc = _make_tokenizer(
+    lambda s: _tokenize_scp(s, False),
+    ["scp_full", *_AUTHORITY_NAMES[:-1], "path"]
+)
+"""
+Tokenize a full SCP locator like `quickclone.remote.parser.parse_scp_full_loc`.
+"""
+
+
+tokenize_scp_dirty_loc = _make_tokenizer(
+    lambda s: _tokenize_scp(s, True),
+    ["scp_dirty", *_AUTHORITY_NAMES[:-1], "path"]
+)
+"""
+Tokenize a user-inputted SCP locator like
+`quickclone.remote.parser.parse_scp_dirty_loc`.
+"""
+
+
+TOKENIZER_ENGINE: ParserEngine = ParserEngine(
+    "tokenizer",
+    tokenize_authority,
+    tokenize_full_url,
+    tokenize_dirty_url,
+    tokenize_scp_full_loc,
+    tokenize_scp_dirty_loc
+)
+"""
+The parser engine using the tokenizer.
+"""
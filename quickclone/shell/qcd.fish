@@ -0,0 +1,53 @@
+# QuickClone shell integration for fish.
+#
+# Defines `qcd`, which changes the current directory to a previously cloned
+# repository without starting Python. It reads the history index written by
+# QuickClone (newest clone first, one path per line).
+#
+#   qcd      cd into the most recently cloned repository (like `cd (qkln -L)`)
+#   qcd N    cd into the N-th most recently cloned repository, starting from 0
+#            (like `cd (qkln -LZ N)`)
+#   qcd -1   list the previously cloned repositories (like `qkln -LZ -1`)
+#
+# Add this to your ~/.config/fish/config.fish:
+#
+#   qkln --shell-init fish | source
+#
+# Set QUICKCLONE_HISTORY_INDEX to read the index from a different location.
+
+function qcd --description "cd into a repository cloned by QuickClone"
+    set -l index_file $HOME/.cache/quickclone/history.txt
+    if set -q QUICKCLONE_HISTORY_INDEX
+        set index_file $QUICKCLONE_HISTORY_INDEX
+    end
+    set -l index 0
+    if test (count $argv) -gt 0
+        set index $argv[1]
+    end
+    if not test -r $index_file
+        echo "qcd: no clone history found in '$index_file'" >&2
+        return 1
+    end
+    set -l i 0
+    if test "$index" = -1; or test "$index" = -l
+        echo "Previous repositories:"
+        while read -l line
+            printf '  [%d] %s\n' $i $line
+            set i (math $i + 1)
+        end < $index_file
+        return 0
+    end
+    if not string match -qr '^[0-9]+$' -- $index
+        echo "qcd: invalid index: $index" >&2
+        return 1
+    end
+    while read -l line
+        if test $i -eq $index
+            cd -- $line
+            return
+        end
+        set i (math $i + 1)
+    end < $index_file
+    echo "qcd: invalid index: $index" >&2
+    return 1
+end
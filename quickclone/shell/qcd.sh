@@ -0,0 +1,50 @@
+# QuickClone shell integration for bash and zsh.
+#
+# Defines `qcd`, which changes the current directory to a previously cloned
+# repository without starting Python. It reads the history index written by
+# QuickClone (newest clone first, one path per line).
+#
+#   qcd      cd into the most recently cloned repository (like `cd $(qkln -L)`)
+#   qcd N    cd into the N-th most recently cloned repository, starting from 0
+#            (like `cd $(qkln -LZ N)`)
+#   qcd -1   list the previously cloned repositories (like `qkln -LZ -1`)
+#
+# Add this to your ~/.bashrc or ~/.zshrc:
+#
+#   eval "$(qkln --shell-init bash)"
+#
+# Set QUICKCLONE_HISTORY_INDEX to read the index from a different location.
+
+qcd() {
+    local index_file="${QUICKCLONE_HISTORY_INDEX:-$HOME/.cache/quickclone/history.txt}"
+    local index="${1:-0}"
+    local i=0
+    local line
+    if [ ! -r "$index_file" ]; then
+        echo "qcd: no clone history found in '$index_file'" >&2
+        return 1
+    fi
+    if [ "$index" = "-1" ] || [ "$index" = "-l" ]; then
+        echo "Previous repositories:"
+        while IFS= read -r line; do
+            printf '  [%d] %s\n' "$i" "$line"
+            i=$((i + 1))
+        done < "$index_file"
+        return 0
+    fi
+    case "$index" in
+        ''|*[!0-9]*)
+            echo "qcd: invalid index: $index" >&2
+            return 1
+            ;;
+    esac
+    while IFS= read -r line; do
+        if [ "$i" -eq "$index" ]; then
+            cd -- "$line"
+            return
+        fi
+        i=$((i + 1))
+    done < "$index_file"
+    echo "qcd: invalid index: $index" >&2
+    return 1
+}
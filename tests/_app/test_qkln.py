@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import warnings
+
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+
+
+def _qkln(home, *args, input=""):
+    env = dict(os.environ)
+    env["HOME"] = str(home)
+    env["USERPROFILE"] = str(home)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(PROJECT_DIR), *filter(None, [env.get("PYTHONPATH")])]
+    )
+    return subprocess.run(
+        [sys.executable, "-m", "quickclone", *args],
+        input=input,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        env=env
+    )
+
+
+def test_stream_reuse_clones_sqlite(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    home = tmp_path / "home"
+    remote = tmp_path / "remote"
+    git("init", "-q", str(remote))
+    git("-C", str(remote), "commit", "-q", "--allow-empty", "-m", "Initial commit")
+    config = tmp_path / "quickclone.toml"
+    config.write_text(
+        '[options.history]\nbackend = "sqlite"\n'
+        '[options.local]\nreuse_clones = true\n'
+    )
+    # The reading thread looks up earlier clones in the history while the
+    # main thread records the finished ones.
+    lines = "".join(f"file://{remote} {tmp_path / name}\n" for name in ["first", "second", "third"])
+    process = _qkln(home, "-C", str(config), "--stdin", "-j", "1", input=lines)
+    assert process.returncode == 0, process.stdout
+    assert "3 succeeded, 0 failed" in process.stdout
+    process = _qkln(home, "-C", str(config), "-L")
+    assert process.stdout.strip() == str(tmp_path / "third")
@@ -0,0 +1,97 @@
+import pytest
+
+from quickclone.compatibility.migrations import (
+    MIGRATIONS,
+    get_schema_version,
+    register_migration,
+    run_migrations
+)
+
+
+def test_migrations_registered_in_order():
+    versions = [migration.version for migration in MIGRATIONS]
+    assert versions == sorted(versions)
+    assert len(set(versions)) == len(versions)
+
+
+def test_run_migrations_once(tmp_path):
+    stamp = tmp_path / "schema_version"
+    migrations = []
+    calls = []
+    register_migration(2, "second", migrations)(lambda: calls.append(2) or 0)
+    register_migration(1, "first", migrations)(lambda: calls.append(1) or 0)
+    assert run_migrations(stamp, migrations) == 2
+    assert calls == [1, 2]
+    assert get_schema_version(stamp) == 2
+    assert run_migrations(stamp, migrations) == 0
+    assert calls == [1, 2]
+
+
+def test_run_migrations_pending_only(tmp_path):
+    stamp = tmp_path / "schema_version"
+    stamp.write_text("1\n")
+    migrations = []
+    calls = []
+    register_migration(1, "first", migrations)(lambda: calls.append(1) or 0)
+    register_migration(2, "second", migrations)(lambda: calls.append(2) or 0)
+    assert run_migrations(stamp, migrations) == 1
+    assert calls == [2]
+
+
+def test_register_migration_duplicate():
+    migrations = []
+    register_migration(1, "first", migrations)(lambda: 0)
+    with pytest.raises(ValueError):
+        register_migration(1, "again", migrations)(lambda: 0)
+
+
+def test_run_migrations_cancelled(tmp_path):
+    stamp = tmp_path / "schema_version"
+    migrations = []
+    calls = []
+    answers = [1, 0]
+    register_migration(1, "first", migrations)(lambda: calls.append(1) or answers.pop(0))
+    register_migration(2, "second", migrations)(lambda: calls.append(2) or 0)
+    assert run_migrations(stamp, migrations) == 0
+    assert calls == [1]
+    assert get_schema_version(stamp) == 0
+    # The cancelled migration is offered again next time.
+    assert run_migrations(stamp, migrations) == 2
+    assert calls == [1, 1, 2]
+    assert get_schema_version(stamp) == 2
+
+
+def test_history_index_migration_uses_configured_store(tmp_path, monkeypatch):
+    from quickclone.config.cache import CacheStore
+    from quickclone.config.history import CloneRecord, HistoryLog
+    
+    store = CacheStore({"index_length": 1}, tmp_path / "history.txt")
+    history = HistoryLog(tmp_path / "history.toml", tmp_path / "history.log")
+    history.load()
+    history.record_clone(CloneRecord("/a"))
+    history.record_clone(CloneRecord("/b"))
+    store.loaded["history"] = history
+    monkeypatch.setattr("quickclone.config.cache._STORE", store)
+    migration = next(migration for migration in MIGRATIONS if migration.version == 3)
+    assert migration() == 0
+    assert (tmp_path / "history.txt").read_text() == "/b\n"
+
+
+def test_cache_move_migration_from_old_folder(tmp_path, monkeypatch, capsys):
+    from quickclone.compatibility import v0_4_0
+    
+    # A home folder last used by QuickClone 0.4.0 or below.
+    old = tmp_path / ".cache" / "quicktoml"
+    new = tmp_path / ".cache" / "quickclone"
+    old.mkdir(parents=True)
+    (old / "history.toml").write_text('last_clone = "/a"\n')
+    monkeypatch.setattr(v0_4_0, "USER_CACHE_FOLDER_OLD", old)
+    monkeypatch.setattr(v0_4_0, "USER_CACHE_FOLDER", new)
+    monkeypatch.setattr("builtins.input", lambda prompt: "1")
+    stamp = new / "schema_version"
+    migrations = [migration for migration in MIGRATIONS if migration.version == 1]
+    assert run_migrations(stamp, migrations) == 1
+    assert "MOVE" in capsys.readouterr().out
+    assert not old.exists()
+    assert (new / "history.toml").read_text() == 'last_clone = "/a"\n'
+    assert get_schema_version(stamp) == 1
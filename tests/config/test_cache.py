@@ -0,0 +1,49 @@
+from quickclone.config.cache import CacheStore
+from quickclone.config.history import HistoryLog
+
+
+class _FakeHistory(HistoryLog):
+    dumps = 0
+    
+    def dump(self) -> None:
+        _FakeHistory.dumps += 1
+        super().dump()
+
+
+def _store(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "quickclone.config.cache.create_history",
+        lambda options: _FakeHistory(tmp_path / "history.toml", tmp_path / "history.log")
+    )
+    _FakeHistory.dumps = 0
+    # Never touch the real history index.
+    return CacheStore(history_index_path=tmp_path / "history.txt")
+
+
+def test_cachestore_lazy(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch)
+    assert store.loaded == {}
+    assert store.get_value("last_clones") == []
+    assert "history" in store.loaded
+
+
+def test_cachestore_dump_only_dirty(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch)
+    store.get_value("last_clones")
+    assert store.dump() == 0
+    assert _FakeHistory.dumps == 0
+    store.add_value("last_clones", "/a")
+    assert store.dump() == 1
+    assert _FakeHistory.dumps == 1
+    assert store.dump() == 0
+
+
+def test_cachestore_history_index(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch)
+    store.history_options = {"index_length": 2}
+    for path in ["/a", "/b", "/c"]:
+        store.add_value("last_clones", path)
+    # The index is only written once, when the history is written back.
+    assert not (tmp_path / "history.txt").exists()
+    assert store.dump() == 1
+    assert (tmp_path / "history.txt").read_text() == "/c\n/b\n"
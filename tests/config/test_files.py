@@ -0,0 +1,72 @@
+from concurrent.futures import ProcessPoolExecutor
+import sys
+
+import pytest
+
+from quickclone.config.files import atomic_write_text, locked
+from quickclone.config.history import CloneRecord, HistoryLog
+
+
+def _history(folder):
+    return HistoryLog(folder / "history.toml", folder / "history.log", compact_threshold=64)
+
+
+def _record_clones(folder, worker, count):
+    history = _history(folder)
+    history.load()
+    for i in range(count):
+        history.record_clone(CloneRecord(f"/{worker}/{i}"))
+        history.dump()
+
+
+def test_atomic_write_text(tmp_path):
+    path = tmp_path / "file.txt"
+    atomic_write_text(path, "old")
+    atomic_write_text(path, "new")
+    assert path.read_text() == "new"
+    assert [p.name for p in tmp_path.iterdir()] == ["file.txt"]
+
+
+def test_historylog_concurrent_writers(tmp_path):
+    workers, count = 4, 25
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(_record_clones, tmp_path, worker, count)
+            for worker in range(workers)
+        ]
+        for future in futures:
+            future.result()
+    history = _history(tmp_path)
+    history.load()
+    last_clones = history.get_last_clones()
+    assert len(last_clones) == workers * count
+    assert set(last_clones) == {
+        f"/{worker}/{i}" for worker in range(workers) for i in range(count)
+    }
+
+
+def test_historylog_replace_keeps_concurrent_clones(tmp_path):
+    first = _history(tmp_path)
+    first.load()
+    first.record_clone(CloneRecord("/mine"))
+    second = _history(tmp_path)
+    second.load()
+    second.record_clone(CloneRecord("/theirs"))
+    first.set_last_clones(["/replacement"])
+    first.dump()
+    reloaded = _history(tmp_path)
+    reloaded.load()
+    assert reloaded.get_last_clones() == ["/theirs", "/replacement"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Windows has no shared locks")
+def test_locked_shared(tmp_path):
+    path = tmp_path / "file.lock"
+    with locked(path, shared=True) as first, locked(path, shared=True) as second:
+        assert first and second
+        with locked(path, blocking=False) as acquired:
+            assert not acquired
+    with locked(path) as acquired:
+        assert acquired
+        with locked(path, shared=True, blocking=False) as shared:
+            assert not shared
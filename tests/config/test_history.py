@@ -0,0 +1,117 @@
+import pytest
+
+from quickclone.config.history import CloneRecord, HistoryLog, RecentPaths, SqliteHistory
+
+
+def _history(tmp_path, compact_threshold=1024):
+    history = HistoryLog(
+        tmp_path / "history.toml",
+        tmp_path / "history.log",
+        compact_threshold
+    )
+    history.load()
+    return history
+
+
+def test_historylog_empty(tmp_path):
+    assert _history(tmp_path).get_last_clones() == []
+
+
+def test_historylog_record_newest_first(tmp_path):
+    history = _history(tmp_path)
+    history.record_clone(CloneRecord("/a"))
+    history.record_clone(CloneRecord("/b"))
+    assert history.get_last_clones() == ["/b", "/a"]
+    assert not (tmp_path / "history.toml").exists()
+    assert _history(tmp_path).get_last_clones() == ["/b", "/a"]
+
+
+def test_historylog_compaction(tmp_path):
+    history = _history(tmp_path, compact_threshold=8)
+    history.set_last_clones(["/old"])
+    history.dump()
+    for path in ["/a", "/b", "/c"]:
+        history.record_clone(CloneRecord(path))
+    assert history.needs_compaction()
+    history.dump()
+    assert not (tmp_path / "history.log").exists()
+    assert _history(tmp_path).get_last_clones() == ["/c", "/b", "/a", "/old"]
+
+
+def test_historylog_skips_torn_lines(tmp_path):
+    (tmp_path / "history.log").write_text('"/a"\n"/b')
+    assert _history(tmp_path).get_last_clones() == ["/a"]
+
+
+def _sqlite_history(tmp_path, import_from=None):
+    history = SqliteHistory(tmp_path / "history.sqlite3", import_from)
+    history.load()
+    return history
+
+
+def test_sqlitehistory_record_newest_first(tmp_path):
+    history = _sqlite_history(tmp_path)
+    history.record_clone(CloneRecord("/a", timestamp=1.0))
+    history.record_clone(CloneRecord("/b", timestamp=2.0))
+    history.dump()
+    assert _sqlite_history(tmp_path).get_last_clones() == ["/b", "/a"]
+
+
+def test_sqlitehistory_find_clones(tmp_path):
+    history = _sqlite_history(tmp_path)
+    history.record_clone(CloneRecord(
+        "/a", url="github.com/a/a", host="github.com", repo="a/a", timestamp=1.0
+    ))
+    history.record_clone(CloneRecord(
+        "/b", url="gitlab.com/b/b", host="gitlab.com", repo="b/b", timestamp=2.0
+    ))
+    history.record_clone(CloneRecord(
+        "/c", url="github.com/a/a", host="github.com", repo="a/a", timestamp=3.0
+    ))
+    assert history.find_clones(host="GitHub.com") == ["/c", "/a"]
+    assert history.find_clones(host="github.com", limit=1) == ["/c"]
+    assert history.find_clones(repo="a/a.git") == ["/c", "/a"]
+    assert history.find_clones(repo="gitlab.com/b/b") == ["/b"]
+    assert history.find_clones(since=1.5) == ["/c", "/b"]
+
+
+def test_sqlitehistory_import(tmp_path):
+    legacy = _history(tmp_path)
+    legacy.set_last_clones(["/b", "/a"])
+    legacy.dump()
+    history = _sqlite_history(tmp_path, import_from=_history(tmp_path))
+    assert history.get_last_clones() == ["/b", "/a"]
+
+
+def test_historylog_find_clones_unsupported(tmp_path):
+    with pytest.raises(NotImplementedError):
+        _history(tmp_path).find_clones(host="github.com")
+
+
+def test_recentpaths_dedup_and_capacity():
+    recent = RecentPaths(2)
+    for path in ["/a", "/b", "/a", "/c"]:
+        recent.add(path)
+    assert recent.newest_first() == ["/c", "/a"]
+    assert "/b" not in recent
+
+
+def test_historylog_lru(tmp_path):
+    history = HistoryLog(tmp_path / "history.toml", tmp_path / "history.log", capacity=2)
+    history.load()
+    for path in ["/a", "/b", "/a"]:
+        history.record_clone(CloneRecord(path))
+    assert history.get_last_clones() == ["/a", "/b"]
+    history.record_clone(CloneRecord("/c"))
+    history.compact()
+    reloaded = HistoryLog(tmp_path / "history.toml", tmp_path / "history.log", capacity=2)
+    reloaded.load()
+    assert reloaded.get_last_clones() == ["/c", "/a"]
+
+
+def test_sqlitehistory_lru(tmp_path):
+    history = SqliteHistory(tmp_path / "history.sqlite3", capacity=2)
+    history.load()
+    for timestamp, path in enumerate(["/a", "/b", "/a", "/c"]):
+        history.record_clone(CloneRecord(path, timestamp=float(timestamp)))
+    assert history.get_last_clones() == ["/c", "/a"]
@@ -0,0 +1,24 @@
+import subprocess
+
+import pytest
+
+
+def _git(*args):
+    return subprocess.run(
+        ["git", "-c", "user.name=QuickClone", "-c", "user.email=qkln@example.com", *args],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        universal_newlines=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def git():
+    """
+    Run git with an identity set, so that commits can be made without a user
+    config, and return its output without the trailing newline. Raises
+    `subprocess.CalledProcessError` if git fails. Tests using it should check
+    that git is in the path first.
+    """
+    return _git
@@ -0,0 +1,85 @@
+import shutil
+import time
+import warnings
+
+import pytest
+
+from quickclone.delegation.batch import (
+    CloneJob,
+    ManifestEntry,
+    read_manifest,
+    stream_clone_jobs
+)
+from quickclone.delegation.vcs.git import GitCloneCommand
+
+
+def test_manifestentry_parse():
+    assert ManifestEntry.parse("") is None
+    assert ManifestEntry.parse("  # a comment") is None
+    assert ManifestEntry.parse("RenoirTan/QuickClone") == ManifestEntry("RenoirTan/QuickClone")
+    assert ManifestEntry.parse(
+        "RenoirTan/QuickClone '/tmp/some where' -- --depth 1 # shallow"
+    ) == ManifestEntry("RenoirTan/QuickClone", "/tmp/some where", ["--depth", "1"])
+    with pytest.raises(ValueError):
+        ManifestEntry.parse("a b c")
+
+
+def test_read_manifest(tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# repositories\n\nRenoirTan/QuickClone\npython/cpython cpython -- --depth 1\n")
+    entries = read_manifest(manifest)
+    assert entries == [
+        ManifestEntry("RenoirTan/QuickClone"),
+        ManifestEntry("python/cpython", "cpython", ["--depth", "1"])
+    ]
+    assert [entry.line_number for entry in entries] == [3, 4]
+
+
+def test_clonejob_run(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    remote = tmp_path / "remote"
+    git("init", "-q", str(remote))
+    jobs = [
+        CloneJob("good", GitCloneCommand(str(remote), str(tmp_path / "good"))),
+        CloneJob("missing", GitCloneCommand(str(tmp_path / "missing"), str(tmp_path / "bad"))),
+        CloneJob("invalid", None, error="Could not match invalid")
+    ]
+    results = {job.name: job.run() for job in jobs}
+    assert results["good"].succeeded
+    assert (tmp_path / "good" / ".git").is_dir()
+    assert not results["missing"].succeeded
+    assert results["missing"].returncode not in {0, None}
+    assert results["missing"].output != ""
+    assert results["invalid"].returncode is None
+    assert results["invalid"].output == "Could not match invalid"
+
+
+def test_stream_clone_jobs():
+    def resolve(entry):
+        return CloneJob(entry.remote_url, None, error="unresolved")
+    
+    lines = ["a\n", "# comment\n", "\n", "b c d\n", "e\n"]
+    results = list(stream_clone_jobs(lines, resolve, 2))
+    assert sorted(result.job.name for result in results) == ["a", "b c d", "e"]
+    assert all(result.returncode is None for result in results)
+
+
+def test_stream_clone_jobs_backpressure():
+    read = []
+    
+    def lines():
+        for i in range(10000):
+            read.append(i)
+            yield f"repo{i}\n"
+    
+    def resolve(entry):
+        return CloneJob(entry.remote_url, None, error="unresolved")
+    
+    results = stream_clone_jobs(lines(), resolve, max_workers=2, queue_size=2)
+    next(results)
+    time.sleep(0.3)
+    # The reader can only get ahead by what fits in the queues and workers.
+    assert len(read) < 20
+    results.close()
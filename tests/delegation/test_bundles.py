@@ -0,0 +1,86 @@
+import os
+import shutil
+import subprocess
+import warnings
+
+from quickclone.delegation.bundles import BundleCache
+from quickclone.delegation.vcs.git import GitCloneCommand
+
+
+def _commit(git, remote, name):
+    (remote / name).write_text(f"{name}\n")
+    git("-C", str(remote), "add", name)
+    git("-C", str(remote), "commit", "-q", "-m", f"Add {name}")
+
+
+def test_bundlecache_refresh(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    remote = tmp_path / "remote"
+    git("init", "-q", str(remote))
+    cache = BundleCache(tmp_path / "bundles")
+    bundle = cache.bundle("example.com/remote", f"file://{remote}")
+    # Empty repositories can't be bundled.
+    assert not bundle.refresh()
+    assert not bundle.exists()
+    _commit(git, remote, "README.md")
+    assert bundle.refresh()
+    assert cache.bundles() == [bundle.path]
+    first = git("bundle", "list-heads", str(bundle.path))
+    _commit(git, remote, "NEWS.md")
+    assert bundle.refresh()
+    assert git("bundle", "list-heads", str(bundle.path)) != first
+    assert sorted(path.name for path in (tmp_path / "bundles").iterdir()) == [
+        bundle.path.name,
+        f"{bundle.path.name}.lock"
+    ]
+
+
+def test_gitclonecommand_bundle(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    remote = tmp_path / "remote"
+    git("init", "-q", str(remote))
+    _commit(git, remote, "README.md")
+    bundle = BundleCache(tmp_path / "bundles").bundle("example.com/remote", f"file://{remote}")
+    assert bundle.refresh()
+    _commit(git, remote, "NEWS.md")
+    
+    gcc = GitCloneCommand(f"file://{remote}", str(tmp_path / "clone"))
+    gcc.use_bundle(bundle)
+    assert gcc.format_command_list()[1:] == ["clone", str(bundle.path), str(tmp_path / "clone")]
+    assert [step[3:] for step in gcc.follow_up()] == [
+        ["remote", "set-url", "origin", f"file://{remote}"],
+        ["fetch", "--prune", "origin"],
+        ["merge", "--ff-only"]
+    ]
+    assert gcc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    # The clone has the commit made after the bundle was created.
+    assert (tmp_path / "clone" / "NEWS.md").exists()
+    assert git("-C", str(tmp_path / "clone"), "remote", "get-url", "origin") == f"file://{remote}"
+    
+    # Clones fall back to the remote repository if the bundle is gone.
+    os.remove(bundle.path)
+    gcc = GitCloneCommand(f"file://{remote}", str(tmp_path / "fallback"))
+    gcc.use_bundle(bundle)
+    assert gcc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    assert gcc.bundle is None
+    assert (tmp_path / "fallback" / "NEWS.md").exists()
+
+
+def test_bundlecache_evict(tmp_path):
+    cache = BundleCache(tmp_path, max_size=2048)
+    for i, name in enumerate(["oldest", "older", "newest"]):
+        path = tmp_path / f"{name}.bundle"
+        path.write_bytes(b"\0" * 1024)
+        os.utime(path, (1000 + i, 1000 + i))
+    (tmp_path / "mirror.git").mkdir()
+    assert cache.bundles() == [
+        tmp_path / "oldest.bundle",
+        tmp_path / "older.bundle",
+        tmp_path / "newest.bundle"
+    ]
+    assert cache.evict() == [tmp_path / "oldest.bundle"]
+    assert cache.bundles() == [tmp_path / "older.bundle", tmp_path / "newest.bundle"]
@@ -0,0 +1,119 @@
+import os
+import shutil
+import subprocess
+import warnings
+
+import pytest
+
+from quickclone.config.configurator import SmartConfigurator
+from quickclone.config.files import locked
+from quickclone.delegation.mirrors import MirrorCache, parse_size
+from quickclone.delegation.tasks import create_clone_command
+from quickclone.delegation.vcs.git import GitCloneCommand
+from quickclone.remote.locators import DirtyLocator, UniformResourceLocator
+
+
+def _make_remote(git, path):
+    git("init", "-q", str(path))
+    (path / "README.md").write_text("QuickClone\n")
+    git("-C", str(path), "add", "README.md")
+    git("-C", str(path), "commit", "-q", "-m", "Initial commit")
+
+
+def test_parse_size():
+    assert parse_size("500") == 500
+    assert parse_size("1k") == 1024
+    assert parse_size("1.5M") == 1536 * 1024
+    assert parse_size("20GB") == 20 * 1024 ** 3
+    assert parse_size(42) == 42
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_mirrorcache_from_configurator(tmp_path):
+    cache = MirrorCache.from_configurator(SmartConfigurator({}), tmp_path)
+    assert cache.max_size == 20 * 1024 ** 3
+    cache = MirrorCache.from_configurator(
+        SmartConfigurator({"options": {"mirrors": {"dissociate": False}}}),
+        tmp_path
+    )
+    assert cache.max_size is None
+
+
+def test_gitclonecommand_mirror(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    remote = tmp_path / "remote"
+    _make_remote(git, remote)
+    cache = MirrorCache(tmp_path / "mirrors")
+    mirror = cache.mirror("example.com/remote", str(remote))
+    
+    gcc = GitCloneCommand(str(remote), str(tmp_path / "borrowing"))
+    gcc.use_mirror(mirror)
+    assert gcc.format_command_list()[1:] == [
+        "clone",
+        "--reference-if-able",
+        str(mirror.path),
+        str(remote),
+        str(tmp_path / "borrowing")
+    ]
+    # Formatting the command (like --pretend does) doesn't touch the mirror.
+    assert not mirror.path.exists()
+    assert gcc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    assert (mirror.path / "HEAD").exists()
+    assert (tmp_path / "borrowing" / "README.md").exists()
+    assert (tmp_path / "borrowing" / ".git" / "objects" / "info" / "alternates").exists()
+    # The mirror can be evicted again once the clone is done.
+    with locked(cache._lock_path(mirror.path), blocking=False) as acquired:
+        assert acquired
+    
+    gcc = GitCloneCommand(str(remote), str(tmp_path / "dissociated"))
+    gcc.use_mirror(mirror, dissociate=True)
+    assert "--dissociate" in gcc.format_command_list()
+    assert gcc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    assert not (tmp_path / "dissociated" / ".git" / "objects" / "info" / "alternates").exists()
+
+
+def test_mirrorcache_evict(tmp_path):
+    cache = MirrorCache(tmp_path, max_size=2048)
+    for i, name in enumerate(["oldest", "older", "newest"]):
+        path = tmp_path / f"{name}.git"
+        path.mkdir()
+        (path / "pack").write_bytes(b"\0" * 1024)
+        os.utime(path, (1000 + i, 1000 + i))
+    assert cache.mirrors() == [tmp_path / "oldest.git", tmp_path / "older.git", tmp_path / "newest.git"]
+    assert cache.evict(keep={tmp_path / "oldest.git"}) == [tmp_path / "older.git"]
+    assert cache.mirrors() == [tmp_path / "oldest.git", tmp_path / "newest.git"]
+    assert MirrorCache(tmp_path).evict() == []
+
+
+def test_mirrorcache_evict_in_use(tmp_path):
+    cache = MirrorCache(tmp_path, max_size=2048)
+    for i, name in enumerate(["oldest", "older", "newest"]):
+        path = tmp_path / f"{name}.git"
+        path.mkdir()
+        (path / "pack").write_bytes(b"\0" * 1024)
+        os.utime(path, (1000 + i, 1000 + i))
+    # A clone is reading from the oldest mirror.
+    with cache.in_use(tmp_path / "oldest.git") as acquired:
+        assert acquired
+        assert cache.evict() == [tmp_path / "older.git"]
+    assert cache.mirrors() == [tmp_path / "oldest.git", tmp_path / "newest.git"]
+
+
+def test_create_clone_command_mirror():
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    configs = SmartConfigurator({"options": {"mirrors": {"enabled": True}}})
+    url = UniformResourceLocator.from_user_and_defaults(
+        DirtyLocator.process_dirty_url("RenoirTan/QuickClone.git"),
+        configs.to_locator_builder()
+    )
+    gcc = create_clone_command("git", configs, url, "/tmp/somewhere")
+    assert gcc.mirror is not None
+    assert gcc.mirror.key == "github.com/RenoirTan/QuickClone"
+    assert gcc.dissociate
+    gcc = create_clone_command("git", configs, url, "/tmp/somewhere", ignored={"options.mirrors.enabled"})
+    assert gcc.mirror is None
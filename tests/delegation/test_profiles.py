@@ -0,0 +1,139 @@
+import shutil
+import warnings
+
+import pytest
+
+from quickclone.config.configurator import SmartConfigurator
+from quickclone.delegation.profiles import (
+    ProfileMatcher,
+    find_profile,
+    profile_args,
+    profile_sparse
+)
+from quickclone.delegation.tasks import create_clone_command
+from quickclone.remote.locators import DirtyLocator, UniformResourceLocator
+
+
+RULES = (
+    ("github.com/my-org/monorepo", "blobless"),
+    ("github.com/my-org/*", "shallow"),
+    ("*.example.com/*", "custom")
+)
+
+
+def _url(configs, dirty):
+    return UniformResourceLocator.from_user_and_defaults(
+        DirtyLocator.process_dirty_url(dirty),
+        configs.to_locator_builder()
+    )
+
+
+def test_profilematcher():
+    matcher = ProfileMatcher.compile(RULES)
+    assert ProfileMatcher.compile(RULES) is matcher
+    assert matcher.match("github.com/my-org/monorepo").profile == "blobless"
+    assert matcher.match("github.com/my-org/monorepo-tools").profile == "shallow"
+    assert matcher.match("github.com/my-org/group/project").profile == "shallow"
+    assert matcher.match("git.example.com/a/b").index == 2
+    assert matcher.match("github.com/other/repo") is None
+    assert ProfileMatcher([]).match("github.com/other/repo") is None
+
+
+def test_profile_args():
+    assert profile_args({"filter": "blob:none"}) == ["--filter=blob:none"]
+    assert profile_args({"depth": 1, "single_branch": True, "no_tags": True}) == [
+        "--depth", "1", "--single-branch", "--no-tags"
+    ]
+    assert profile_args({"depth": 1, "args": ["--rev", "tip"]}, "hg") == ["--rev", "tip"]
+    with pytest.raises(ValueError):
+        profile_args({"depht": 1})
+    with pytest.raises(ValueError):
+        profile_args({"depth": 0})
+
+
+def test_find_profile():
+    configs = SmartConfigurator({
+        "options": {
+            "rules": [{"pattern": pattern, "profile": profile} for pattern, profile in RULES],
+            "profiles": {"custom": {"args": ["--recurse-submodules"]}}
+        }
+    })
+    match = find_profile(configs, _url(configs, "my-org/monorepo"))
+    assert match.rule.profile == "blobless"
+    assert match.options == {"filter": "blob:none"} # from the defaults
+    assert str(match) == "rule 1 ('github.com/my-org/monorepo') -> profile 'blobless'"
+    assert find_profile(configs, _url(configs, "my-org/monorepo"), {"options.rules"}) is None
+    assert find_profile(configs, _url(configs, "RenoirTan/QuickClone")) is None
+    assert find_profile(SmartConfigurator({}), _url(configs, "my-org/monorepo")) is None
+    configs = SmartConfigurator({
+        "options": {"rules": [{"pattern": "*", "profile": "missing"}]}
+    })
+    with pytest.raises(ValueError):
+        find_profile(configs, _url(configs, "RenoirTan/QuickClone"))
+
+
+def test_create_clone_command_profile():
+    git_where = shutil.which("git")
+    if git_where is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    configs = SmartConfigurator({
+        "options": {"rules": [{"pattern": "github.com/my-org/*", "profile": "shallow"}]}
+    })
+    gcc = create_clone_command(
+        "git",
+        configs,
+        _url(configs, "my-org/monorepo"),
+        "/tmp/somewhere",
+        ["--depth", "5"]
+    )
+    assert gcc.format_command_list() == [
+        git_where,
+        "clone",
+        "https://github.com/my-org/monorepo",
+        "/tmp/somewhere",
+        "--depth", "1", "--single-branch", "--no-tags",
+        "--depth", "5"
+    ]
+
+
+def test_profile_sparse():
+    assert profile_sparse({"depth": 1}) is None
+    assert profile_sparse({"sparse": ["a", "b"]}) == ["a", "b"]
+    assert profile_args({"sparse": ["a", "b"]}) == []
+    with pytest.raises(ValueError):
+        profile_sparse({"sparse": "a"})
+
+
+def test_create_clone_command_sparse():
+    git_where = shutil.which("git")
+    if git_where is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    configs = SmartConfigurator({
+        "options": {"profiles": {"web": {"filter": "blob:none", "sparse": ["web"]}}}
+    })
+    url = _url(configs, "my-org/monorepo")
+    gcc = create_clone_command("git", configs, url, "/tmp/somewhere", profile_name="web")
+    assert gcc.format_command_list() == [
+        git_where,
+        "clone",
+        "--sparse", "--no-checkout",
+        "https://github.com/my-org/monorepo",
+        "/tmp/somewhere",
+        "--filter=blob:none"
+    ]
+    assert gcc.follow_up()[0][-1] == "web"
+    # Directories from the command line replace the profile's.
+    gcc = create_clone_command(
+        "git",
+        configs,
+        url,
+        "/tmp/somewhere",
+        sparse=["api", "lib"],
+        profile_name="web"
+    )
+    assert gcc.follow_up()[0][-2:] == ["api", "lib"]
+    assert str(find_profile(configs, url, name="web")) == "profile 'web' (chosen explicitly)"
+    with pytest.raises(ValueError):
+        find_profile(configs, url, name="missing")
@@ -0,0 +1,108 @@
+import json
+import shutil
+import warnings
+
+import pytest
+
+from quickclone.config.configurator import SmartConfigurator
+from quickclone.delegation.resolutions import Resolution, ResolutionCache, config_hash
+from quickclone.delegation.tasks import resolve_clone_command, resolve_locator
+
+
+def _resolution(name):
+    return Resolution({"host": "github.com", "path": name}, f"https://github.com/{name}", name)
+
+
+def test_resolutioncache_lru(tmp_path):
+    cache = ResolutionCache(tmp_path / "resolutions.json", max_entries=2)
+    cache.put("a", "git", set(), _resolution("a"))
+    cache.put("b", "git", set(), _resolution("b"))
+    assert cache.get("a", "git") == _resolution("a")
+    cache.put("c", "git", set(), _resolution("c"))
+    assert len(cache) == 2
+    # 'b' was used less recently than 'a'.
+    assert cache.get("b", "git") is None
+    assert cache.get("a", "git") == _resolution("a")
+    assert cache.get("a", "hg") is None
+    assert cache.get("a", "git", {"options.local.remotes_dir"}) is None
+    with pytest.raises(ValueError):
+        ResolutionCache(tmp_path / "resolutions.json", max_entries=0)
+
+
+def test_resolutioncache_dump(tmp_path):
+    path = tmp_path / "resolutions.json"
+    cache = ResolutionCache(path, max_entries=3, config_hash="first")
+    cache.put("a", "git", set(), _resolution("a"))
+    assert cache.dump()
+    other = ResolutionCache(path, max_entries=3, config_hash="first")
+    other.put("b", "git", set(), _resolution("b"))
+    cache.put("c", "git", set(), _resolution("c"))
+    assert other.dump()
+    # Entries written by other processes are kept.
+    assert cache.dump()
+    reloaded = ResolutionCache(path, max_entries=3, config_hash="first")
+    assert [reloaded.get(name, "git") for name in "abc"] == [_resolution(name) for name in "abc"]
+    # Entries made with another config are never used.
+    assert ResolutionCache(path, config_hash="second").get("a", "git") is None
+    path.write_text("{")
+    assert len(ResolutionCache(path)) == 0
+
+
+def test_config_hash():
+    assert config_hash(SmartConfigurator({})) == config_hash(SmartConfigurator({}))
+    assert config_hash(SmartConfigurator({})) != config_hash(
+        SmartConfigurator({"options": {"remote": {"host": "gitlab.com"}}})
+    )
+
+
+def test_resolutioncache_from_configurator(tmp_path):
+    path = tmp_path / "resolutions.json"
+    configs = SmartConfigurator({"options": {"resolutions": {"max_entries": 5}}})
+    cache = ResolutionCache.from_configurator(configs, path=path)
+    assert cache.max_entries == 5
+    assert cache.config_hash == config_hash(configs)
+    assert ResolutionCache.from_configurator(configs, {"options.resolutions.enabled"}, path) is None
+    disabled = SmartConfigurator({"options": {"resolutions": {"enabled": False}}})
+    assert ResolutionCache.from_configurator(disabled, path=path) is None
+
+
+def test_resolve_locator_cached(tmp_path):
+    configs = SmartConfigurator({"options": {"remote": {"force_scp": True, "scheme": "ssh"}}})
+    cache = ResolutionCache.from_configurator(configs, path=tmp_path / "resolutions.json")
+    uncached = resolve_locator("git", configs, "RenoirTan/QuickClone")
+    assert uncached.final_url == "git@github.com:RenoirTan/QuickClone"
+    assert resolve_locator("git", configs, "RenoirTan/QuickClone", cache=cache) == uncached
+    assert cache.dump()
+    cache = ResolutionCache.from_configurator(configs, path=tmp_path / "resolutions.json")
+    cached = resolve_locator("git", configs, "RenoirTan/QuickClone", cache=cache)
+    assert cached == uncached
+    assert dict(cached.locator()) == uncached.parts
+    assert cached.locator() is not cached.locator()
+    assert json.loads(cache.key("RenoirTan/QuickClone", "git"))[0] == "RenoirTan/QuickClone"
+
+
+def test_resolve_clone_command_cached(tmp_path):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    configs = SmartConfigurator({"options": {"local": {"remotes_dir": "/tmp/remotes"}}})
+    cache = ResolutionCache.from_configurator(configs, path=tmp_path / "resolutions.json")
+    for _ in range(2):
+        command, built_url = resolve_clone_command("git", configs, "RenoirTan/QuickClone", cache=cache)
+        assert command.format_command_list()[-2:] == [
+            "https://github.com/RenoirTan/QuickClone",
+            "/tmp/remotes/github.com/RenoirTan/QuickClone"
+        ]
+        assert built_url.get_path() == "RenoirTan/QuickClone"
+    assert len(cache) == 1
+    command, built_url = resolve_clone_command(
+        "git",
+        configs,
+        "RenoirTan/QuickClone",
+        "/tmp/somewhere",
+        cache=cache
+    )
+    assert command.format_command_list()[-2:] == [
+        "https://github.com/RenoirTan/QuickClone",
+        "/tmp/somewhere"
+    ]
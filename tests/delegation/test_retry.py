@@ -0,0 +1,121 @@
+import random
+import sys
+
+import pytest
+
+from quickclone.config.configurator import SmartConfigurator
+from quickclone.delegation.batch import CloneJob
+from quickclone.delegation.retry import RetryPolicy, remove_partial_clone
+from quickclone.delegation.vcs.common import BaseCommand
+
+
+class FlakyCommand(BaseCommand):
+    """
+    Fails with a transient error until it has been run `failures` times,
+    leaving a partial clone behind each time.
+    """
+    
+    def __init__(self, counter, dest_path, failures, message="fatal: early EOF"):
+        super().__init__()
+        self.counter = counter
+        self.dest_path = dest_path
+        self.failures = failures
+        self.message = message
+    
+    def format_command_list(self):
+        script = (
+            "import os, sys\n"
+            f"counter = {repr(str(self.counter))}\n"
+            "count = int(open(counter).read()) if os.path.exists(counter) else 0\n"
+            "open(counter, 'w').write(str(count + 1))\n"
+            f"dest = {repr(self.dest_path)}\n"
+            "if os.listdir(dest) if os.path.isdir(dest) else False:\n"
+            "    sys.exit('fatal: destination path already exists and is not an empty directory')\n"
+            "os.makedirs(os.path.join(dest, '.git'))\n"
+            f"if count < {self.failures}:\n"
+            f"    sys.exit({repr(self.message)})\n"
+        )
+        return [sys.executable, "-c", script]
+
+
+def test_retrypolicy_is_transient():
+    policy = RetryPolicy()
+    assert policy.is_transient(128, "fatal: early EOF\nfatal: index-pack failed")
+    assert policy.is_transient(128, "error: RPC failed; HTTP 502 curl 22")
+    assert policy.is_transient(128, "fatal: unable to access 'x': The requested URL returned error: 503")
+    assert not policy.is_transient(128, "fatal: unable to access 'x': The requested URL returned error: 404")
+    assert not policy.is_transient(
+        128,
+        "remote: Repository not found.\nfatal: the remote end hung up unexpectedly"
+    )
+    assert not policy.is_transient(0, "early EOF")
+    assert not policy.is_transient(None, "early EOF")
+    assert not policy.is_transient(-15, "early EOF")
+
+
+def test_retrypolicy_attempts_and_delay():
+    policy = RetryPolicy(
+        attempts=3,
+        base_delay=1.0,
+        max_delay=5.0,
+        host_attempts={"GitHub.com": 5},
+        rng=random.Random(0)
+    )
+    assert policy.attempts_for("example.com") == 3
+    assert policy.attempts_for("github.com") == 5
+    assert policy.should_retry(2, 128, "early EOF", "example.com")
+    assert not policy.should_retry(3, 128, "early EOF", "example.com")
+    assert policy.should_retry(4, 128, "early EOF", "github.com")
+    for attempt in range(1, 10):
+        assert 0 <= policy.delay(attempt) <= min(5.0, 2 ** (attempt - 1))
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=0)
+
+
+def test_retrypolicy_from_configurator():
+    configs = SmartConfigurator({
+        "options": {"retry": {"attempts": 5, "hosts": {"git.example.com": 2}}}
+    })
+    policy = RetryPolicy.from_configurator(configs)
+    assert policy.attempts == 5
+    assert policy.base_delay == 1.0
+    assert policy.attempts_for("git.example.com") == 2
+    assert RetryPolicy.from_configurator(SmartConfigurator({})).attempts == 3
+
+
+def test_remove_partial_clone(tmp_path):
+    created = tmp_path / "created"
+    (created / ".git").mkdir(parents=True)
+    remove_partial_clone(str(created), existed=False)
+    assert not created.exists()
+    existing = tmp_path / "existing"
+    (existing / ".git").mkdir(parents=True)
+    (existing / "file").write_text("")
+    remove_partial_clone(str(existing), existed=True)
+    assert existing.is_dir() and list(existing.iterdir()) == []
+
+
+def test_clonejob_retries_transient_failures(tmp_path):
+    dest = tmp_path / "dest"
+    policy = RetryPolicy(attempts=3, base_delay=0.0)
+    command = FlakyCommand(tmp_path / "counter", str(dest), failures=2)
+    result = CloneJob("flaky", command, retry=policy).run()
+    assert result.succeeded
+    assert result.attempts == 3
+    assert (dest / ".git").is_dir()
+
+
+def test_clonejob_gives_up(tmp_path):
+    policy = RetryPolicy(attempts=2, base_delay=0.0)
+    command = FlakyCommand(tmp_path / "counter", str(tmp_path / "dest"), failures=5)
+    result = CloneJob("flaky", command, retry=policy).run()
+    assert not result.succeeded
+    assert result.attempts == 2
+    command = FlakyCommand(
+        tmp_path / "counter2",
+        str(tmp_path / "dest2"),
+        failures=5,
+        message="remote: Repository not found."
+    )
+    result = CloneJob("missing", command, retry=policy).run()
+    assert result.attempts == 1
@@ -0,0 +1,102 @@
+import asyncio
+import gc
+import subprocess
+import sys
+import time
+
+import pytest
+
+from quickclone.delegation.batch import CloneJob, CloneResult
+from quickclone.delegation.scheduler import CloneScheduler
+from quickclone.delegation.vcs.common import BaseCommand
+
+
+class PythonCommand(BaseCommand):
+    def format_command_list(self):
+        return [sys.executable, "-c", *self.args]
+
+
+class CountingJob(CloneJob):
+    running = {}
+    peaks = {}
+    
+    async def run_async(self):
+        host = self.details["host"]
+        CountingJob.running[host] = CountingJob.running.get(host, 0) + 1
+        total = sum(CountingJob.running.values())
+        CountingJob.peaks[host] = max(CountingJob.peaks.get(host, 0), CountingJob.running[host])
+        CountingJob.peaks["*"] = max(CountingJob.peaks.get("*", 0), total)
+        await asyncio.sleep(0.01)
+        CountingJob.running[host] -= 1
+        return CloneResult(self, 0, time.time(), 0.01, "")
+
+
+def test_basecommand_run_async():
+    command = PythonCommand("", "print('hello')")
+    result = asyncio.run(command.run_async(stdout=subprocess.PIPE))
+    assert result.returncode == 0
+    assert result.stdout.strip() == b"hello"
+
+
+def test_basecommand_run_async_cancel():
+    command = PythonCommand("", "import time; time.sleep(30)")
+    
+    async def cancel_soon():
+        task = asyncio.ensure_future(command.run_async())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The cancelled task's traceback keeps the process alive, so collect
+        # it while the event loop can still close its pipes.
+        del task
+        gc.collect()
+    
+    start = time.time()
+    asyncio.run(cancel_soon())
+    assert time.time() - start < 10
+
+
+def test_clonescheduler_limits():
+    CountingJob.running.clear()
+    CountingJob.peaks.clear()
+    jobs = [
+        CountingJob(f"{host}{i}", BaseCommand(), {"host": host})
+        for host in ["a.com", "b.com", "c.com"]
+        for i in range(5)
+    ]
+    scheduler = CloneScheduler(max_jobs=4, max_jobs_per_host=2)
+    
+    async def collect():
+        return [result async for result in scheduler.as_completed(jobs)]
+    
+    results = asyncio.run(collect())
+    assert len(results) == 15
+    assert all(result.succeeded for result in results)
+    assert CountingJob.peaks["*"] <= 4
+    assert all(CountingJob.peaks[host] <= 2 for host in ["a.com", "b.com", "c.com"])
+
+
+def test_clonescheduler_cancel():
+    jobs = [
+        CloneJob(str(i), PythonCommand("", "import time; time.sleep(30)"), {"host": "a.com"})
+        for i in range(3)
+    ]
+    scheduler = CloneScheduler(max_jobs=2)
+    
+    async def cancel_soon():
+        asyncio.get_running_loop().call_later(0.2, scheduler.cancel)
+        with pytest.raises(asyncio.CancelledError):
+            [result async for result in scheduler.as_completed(jobs)]
+        gc.collect()
+    
+    start = time.time()
+    asyncio.run(cancel_soon())
+    assert time.time() - start < 10
+
+
+def test_clonescheduler_invalid():
+    with pytest.raises(ValueError):
+        CloneScheduler(0)
+    with pytest.raises(ValueError):
+        CloneScheduler(1, 0)
@@ -5,7 +5,8 @@ import pytest
 
 from quickclone.config.configurator import SmartConfigurator
 from quickclone.delegation.errors import InvalidVcsError
-from quickclone.delegation.tasks import create_clone_command
+from quickclone.delegation.tasks import LOCAL_CLONE_SCAN_LIMIT, create_clone_command, find_local_clone
+from quickclone.delegation.vcs.git import GitCloneCommand, GitUpdateCommand, GitWorktreeCommand
 from quickclone.remote.locators import DirtyLocator, UniformResourceLocator
 
 
@@ -78,3 +79,127 @@ def test_create_mercurialclonecommand_nicknames():
     hgcc = create_clone_command(vcs="hg", **other_args)
     mercc = create_clone_command(vcs="mercurial", **other_args)
     assert hgcc.format_command_list() == mercc.format_command_list()
+
+
+def test_create_clone_command_existing(tmp_path, git):
+    git_where = shutil.which("git")
+    if git_where is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    dest = tmp_path / "QuickClone"
+    git("init", "-q", str(dest))
+    git("-C", str(dest), "remote", "add", "origin", "git@github.com:RenoirTan/QuickClone.git")
+    configs = SmartConfigurator({})
+    url = UniformResourceLocator.from_user_and_defaults(
+        DirtyLocator.process_dirty_url("RenoirTan/QuickClone"),
+        configs.to_locator_builder()
+    )
+    command = create_clone_command("git", configs, url, str(dest), ["--depth", "1"])
+    assert isinstance(command, GitUpdateCommand)
+    assert command.format_command_list() == [git_where, "-C", str(dest), "fetch", "--prune", "origin"]
+    assert command.follow_up() == [[git_where, "-C", str(dest), "merge", "--ff-only"]]
+    command = create_clone_command("git", configs, url, str(dest), existing="clone")
+    assert isinstance(command, GitCloneCommand)
+    command = create_clone_command("git", configs, url, str(dest), ignored={"options.local.existing"})
+    assert isinstance(command, GitCloneCommand)
+    other = UniformResourceLocator.from_user_and_defaults(
+        DirtyLocator.process_dirty_url("RenoirTan/Other"),
+        configs.to_locator_builder()
+    )
+    assert isinstance(create_clone_command("git", configs, other, str(dest)), GitCloneCommand)
+    with pytest.raises(ValueError):
+        create_clone_command("git", configs, url, str(dest), existing="overwrite")
+
+
+def test_create_clone_command_local(tmp_path, monkeypatch, git):
+    git_where = shutil.which("git")
+    if git_where is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    source = tmp_path / "remotes" / "github.com" / "RenoirTan" / "QuickClone"
+    git("init", "-q", str(source))
+    git("-C", str(source), "remote", "add", "origin", "https://github.com/RenoirTan/QuickClone.git")
+    monkeypatch.setattr("quickclone.config.cache.find_last_clones", lambda **kwargs: [])
+    configs = SmartConfigurator({
+        "options": {"local": {"remotes_dir": str(tmp_path / "remotes"), "reuse_clones": True}}
+    })
+    url = UniformResourceLocator.from_user_and_defaults(
+        DirtyLocator.process_dirty_url("RenoirTan/QuickClone"),
+        configs.to_locator_builder()
+    )
+    dest = str(tmp_path / "workspace")
+    gcc = create_clone_command("git", configs, url, dest)
+    assert gcc.format_command_list() == [git_where, "clone", "--local", str(source), dest]
+    assert gcc.follow_up() == [
+        [git_where, "-C", dest, "remote", "set-url", "origin", "https://github.com/RenoirTan/QuickClone"],
+        [git_where, "-C", dest, "fetch", "--prune", "origin"],
+        [git_where, "-C", dest, "remote", "set-head", "origin", "--auto"],
+        [git_where, "-C", dest, "reset", "--hard", "origin/HEAD"]
+    ]
+    gcc = create_clone_command("git", configs, url, dest, ignored={"options.local.reuse_clones"})
+    assert gcc.local_source is None
+    # The clone in remotes_dir is the destination itself, so it is updated.
+    assert isinstance(create_clone_command("git", configs, url), GitUpdateCommand)
+
+
+def test_find_local_clone(tmp_path, monkeypatch, git):
+    git_where = shutil.which("git")
+    if git_where is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    clones = []
+    for name in ["first", "second"]:
+        clone = tmp_path / name
+        git("init", "-q", str(clone))
+        git("-C", str(clone), "remote", "add", "origin", "git@github.com:RenoirTan/QuickClone.git")
+        clones.append(str(clone))
+    calls = []
+    
+    def find_last_clones(**kwargs):
+        calls.append(kwargs)
+        if kwargs.get("repo") is not None:
+            raise NotImplementedError
+        return [str(tmp_path / "missing"), *clones]
+    
+    monkeypatch.setattr("quickclone.config.cache.find_last_clones", find_last_clones)
+    configs = SmartConfigurator({})
+    url = UniformResourceLocator.from_user_and_defaults(
+        DirtyLocator.process_dirty_url("RenoirTan/QuickClone"),
+        configs.to_locator_builder()
+    )
+    local_clones = {}
+    assert find_local_clone(configs, url, clones[0], local_clones=local_clones) == clones[1]
+    assert find_local_clone(configs, url, clones[1], local_clones=local_clones) == clones[0]
+    # The history is only scanned once per remote repository, and not all of it.
+    assert calls == [
+        {"repo": "github.com/RenoirTan/QuickClone", "limit": LOCAL_CLONE_SCAN_LIMIT},
+        {"limit": LOCAL_CLONE_SCAN_LIMIT}
+    ]
+    assert local_clones == {"github.com/RenoirTan/QuickClone": clones}
+
+
+def test_create_clone_command_worktree(tmp_path):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    configs = SmartConfigurator({"options": {"local": {"remotes_dir": str(tmp_path)}}})
+    url = UniformResourceLocator.from_user_and_defaults(
+        DirtyLocator.process_dirty_url("RenoirTan/QuickClone"),
+        configs.to_locator_builder()
+    )
+    dest = str(tmp_path / "feature")
+    command = create_clone_command("git", configs, url, dest, ["--filter=blob:none"], worktree=True)
+    assert isinstance(command, GitWorktreeCommand)
+    assert command.dest_path == dest
+    assert command.bare_path == str(tmp_path / "github.com" / "RenoirTan" / "QuickClone.git")
+    assert command.format_command_list()[1:] == [
+        "clone",
+        "--bare",
+        "https://github.com/RenoirTan/QuickClone",
+        command.bare_path,
+        "--filter=blob:none"
+    ]
+    with pytest.raises(ValueError):
+        create_clone_command("git", configs, url, dest, sparse=["docs"], worktree=True)
+    with pytest.raises(ValueError):
+        create_clone_command("git", SmartConfigurator({}), url, dest, worktree=True)
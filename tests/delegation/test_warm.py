@@ -0,0 +1,51 @@
+import shutil
+import warnings
+
+import pytest
+
+from quickclone.delegation.bundles import BundleCache
+from quickclone.delegation.mirrors import MirrorCache
+from quickclone.delegation.warm import history_remotes, warm_caches
+
+
+class BrokenCopy(object):
+    def refresh(self):
+        raise OSError("disk full")
+
+
+def test_history_remotes(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    for name in ["first", "second", "other"]:
+        git("init", "-q", str(tmp_path / name))
+    git("-C", str(tmp_path / "first"), "remote", "add", "origin", "https://example.com/a")
+    git("-C", str(tmp_path / "second"), "remote", "add", "origin", "https://example.com/a")
+    git("-C", str(tmp_path / "other"), "remote", "add", "origin", "git@example.com:b")
+    paths = [str(tmp_path / name) for name in ["first", "missing", "second", "other"]]
+    assert history_remotes(paths) == ["https://example.com/a", "git@example.com:b"]
+
+
+def test_warm_caches(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    remote = tmp_path / "remote"
+    git("init", "-q", str(remote))
+    (remote / "README.md").write_text("QuickClone\n")
+    git("-C", str(remote), "add", "README.md")
+    git("-C", str(remote), "commit", "-q", "-m", "Initial commit")
+    mirror = MirrorCache(tmp_path / "mirrors").mirror("example.com/remote", str(remote))
+    bundle = BundleCache(tmp_path / "bundles").bundle("example.com/remote", str(remote))
+    missing = BundleCache(tmp_path / "bundles").bundle("example.com/missing", str(tmp_path / "missing"))
+    broken = BrokenCopy()
+    results = {id(result.copy): result for result in warm_caches([mirror, bundle, missing, broken], 2)}
+    assert results[id(mirror)].succeeded
+    assert (mirror.path / "HEAD").exists()
+    assert results[id(bundle)].succeeded
+    assert bundle.exists()
+    assert not results[id(missing)].succeeded
+    assert not results[id(broken)].succeeded
+    assert results[id(broken)].error == "disk full"
+    with pytest.raises(ValueError):
+        list(warm_caches([], 0))
@@ -1,6 +1,11 @@
 import shutil
+import subprocess
+import warnings
 
-from quickclone.delegation.vcs.git import GitCloneCommand
+import pytest
+
+from quickclone.delegation.vcs.git import GitCloneCommand, GitUpdateCommand, GitWorktreeCommand
+from quickclone.local import git_remote_url
 
 
 REMOTE = "https://github.com/RenoirTan/QuickClone/.git"
@@ -21,3 +26,130 @@ def test_gitclonecommand_nodestpath():
         return
     gcc = GitCloneCommand(REMOTE, "")
     assert gcc.format_command_list() == [git_where, "clone", REMOTE]
+
+
+def test_gitclonecommand_sparse():
+    git_where = shutil.which("git")
+    if git_where is None:
+        return
+    gcc = GitCloneCommand(REMOTE, "")
+    gcc.use_sparse(["docs/", "/src/quickclone"])
+    assert gcc.format_command_list() == [git_where, "clone", "--sparse", "--no-checkout", REMOTE]
+    assert gcc.follow_up() == [
+        [git_where, "-C", "QuickClone", "sparse-checkout", "set", "--cone", "docs", "src/quickclone"],
+        [git_where, "-C", "QuickClone", "checkout"]
+    ]
+    assert GitCloneCommand(REMOTE, DEST_PATH).follow_up() == []
+    with pytest.raises(ValueError):
+        gcc.use_sparse([])
+
+
+def test_gitclonecommand_sparse_clone(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    remote = tmp_path / "monorepo"
+    git("init", "-q", str(remote))
+    for name in ["README.md", "a/a.txt", "b/b.txt", "c/c.txt"]:
+        (remote / name).parent.mkdir(exist_ok=True)
+        (remote / name).write_text(f"{name}\n")
+    git("-C", str(remote), "add", ".")
+    git("-C", str(remote), "commit", "-q", "-m", "Initial commit")
+    gcc = GitCloneCommand(f"file://{remote}", str(tmp_path / "clone"))
+    gcc.use_sparse(["a", "b"])
+    result = gcc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    assert result.returncode == 0
+    assert (tmp_path / "clone" / "README.md").is_file()
+    assert (tmp_path / "clone" / "a" / "a.txt").is_file()
+    assert (tmp_path / "clone" / "b" / "b.txt").is_file()
+    assert not (tmp_path / "clone" / "c").exists()
+
+
+def test_gitupdatecommand(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    remote = tmp_path / "remote"
+    git("init", "-q", str(remote))
+    (remote / "README.md").write_text("QuickClone\n")
+    git("-C", str(remote), "add", ".")
+    git("-C", str(remote), "commit", "-q", "-m", "Initial commit")
+    git("clone", "-q", str(remote), str(tmp_path / "clone"))
+    (remote / "NEWS.md").write_text("News\n")
+    git("-C", str(remote), "add", ".")
+    git("-C", str(remote), "commit", "-q", "-m", "Add news")
+    guc = GitUpdateCommand(str(remote), str(tmp_path / "clone"))
+    assert not guc.CREATES_DEST_PATH
+    result = guc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    assert result.returncode == 0
+    assert (tmp_path / "clone" / "NEWS.md").read_text() == "News\n"
+
+
+def test_gitclonecommand_local(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    remote = tmp_path / "remote"
+    git("init", "-q", str(remote))
+    (remote / "README.md").write_text("QuickClone\n")
+    git("-C", str(remote), "add", ".")
+    git("-C", str(remote), "commit", "-q", "-m", "Initial commit")
+    branch = git("-C", str(remote), "symbolic-ref", "--short", "HEAD")
+    git("clone", "-q", str(remote), str(tmp_path / "first"))
+    # The existing clone is on another branch and behind the remote.
+    git("-C", str(tmp_path / "first"), "checkout", "-q", "-b", "feature")
+    (remote / "NEWS.md").write_text("News\n")
+    git("-C", str(remote), "add", ".")
+    git("-C", str(remote), "commit", "-q", "-m", "Add news")
+    gcc = GitCloneCommand(str(remote), str(tmp_path / "second"))
+    gcc.use_local(str(tmp_path / "first"))
+    result = gcc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    assert result.returncode == 0
+    assert gcc.default_branch == branch
+    second = str(tmp_path / "second")
+    assert git("-C", second, "remote", "get-url", "origin") == str(remote)
+    assert git("-C", second, "symbolic-ref", "--short", "HEAD") == branch
+    assert git("-C", second, "rev-parse", "--abbrev-ref", "@{upstream}") == f"origin/{branch}"
+    assert git("-C", second, "rev-parse", "HEAD") == git("-C", str(remote), "rev-parse", "HEAD")
+    assert git("-C", second, "status", "--porcelain") == ""
+    assert (tmp_path / "second" / "NEWS.md").read_text() == "News\n"
+
+
+def test_gitworktreecommand(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    remote = tmp_path / "remote"
+    git("init", "-q", str(remote))
+    (remote / "README.md").write_text("QuickClone\n")
+    git("-C", str(remote), "add", ".")
+    git("-C", str(remote), "commit", "-q", "-m", "Initial commit")
+    bare = str(tmp_path / "remote.git")
+    
+    gwc = GitWorktreeCommand(str(remote), str(tmp_path / "first"), bare)
+    assert gwc.format_command_list()[1:] == ["clone", "--bare", str(remote), bare]
+    assert gwc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    assert (tmp_path / "first" / "README.md").exists()
+    assert (tmp_path / "first" / ".git").is_file()
+    
+    (remote / "NEWS.md").write_text("News\n")
+    git("-C", str(remote), "add", ".")
+    git("-C", str(remote), "commit", "-q", "-m", "Add news")
+    gwc = GitWorktreeCommand(str(remote), str(tmp_path / "second"), bare)
+    assert gwc.format_command_list()[1:] == ["--git-dir", bare, "fetch", "--prune", "origin"]
+    assert [step[3:5] for step in gwc.follow_up()] == [["worktree", "prune"], ["worktree", "add"]]
+    assert gwc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    assert (tmp_path / "second" / "NEWS.md").exists()
+    assert not (tmp_path / "first" / "NEWS.md").exists()
+    assert len(git("--git-dir", bare, "worktree", "list").splitlines()) == 3
+    
+    # Running it again finds the existing worktree and updates it instead.
+    assert git_remote_url(str(tmp_path / "second")) == str(remote)
+    (remote / "CHANGES.md").write_text("Changes\n")
+    git("-C", str(remote), "add", ".")
+    git("-C", str(remote), "commit", "-q", "-m", "Add changes")
+    guc = GitUpdateCommand(str(remote), str(tmp_path / "second"))
+    assert guc.follow_up()[0][3:] == ["merge", "--ff-only", "origin/HEAD"]
+    assert guc.run(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    assert (tmp_path / "second" / "CHANGES.md").exists()
+    assert git("-C", str(tmp_path / "second"), "rev-parse", "HEAD") == git("-C", str(remote), "rev-parse", "HEAD")
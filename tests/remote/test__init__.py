@@ -1,4 +1,4 @@
-from quickclone.remote import UniformResourceLocator, remote_to_string
+from quickclone.remote import UniformResourceLocator, normalize_remote, remote_to_string
 
 
 def test_remotetostring_https():
@@ -15,3 +15,17 @@ def test_remotetostring_scpgit():
     url = UniformResourceLocator.process_url("ssh://git@github.com/RenoirTan/QuickClone.git")
     url.kwargs["explicit_scp"] = True
     assert remote_to_string(url, "git") == "git@github.com:RenoirTan/QuickClone.git"
+
+
+def test_normalizeremote_equivalent():
+    https = UniformResourceLocator.process_url("https://GitHub.com/RenoirTan/QuickClone.git")
+    ssh = UniformResourceLocator.process_url("ssh://git@github.com/RenoirTan/QuickClone/")
+    assert normalize_remote(https) == "github.com/RenoirTan/QuickClone"
+    assert normalize_remote(ssh) == normalize_remote(https)
+
+
+def test_remotetostring_scpnousername():
+    url = UniformResourceLocator(scheme="ssh", host="github.com", path="RenoirTan/QuickClone")
+    url.kwargs["explicit_scp"] = True
+    assert remote_to_string(url, "git") == "git@github.com:RenoirTan/QuickClone"
+    assert url.get_username() == ""
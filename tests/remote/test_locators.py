@@ -72,3 +72,33 @@ def test_urlauthority_parse():
 def test_urlauthority_passwordnousername():
     with pytest.raises(Exception):
         UrlAuthority.process_authority(":password@github.com")
+
+
+def test_uniformresourcelocator_immutable():
+    url = UniformResourceLocator(**PARTS)
+    assert not hasattr(url, "__dict__")
+    with pytest.raises(AttributeError):
+        url.host = "github.com"
+    assert str(url) is str(url)
+    url.kwargs["explicit_scp"] = True
+    assert dict(url)["explicit_scp"] is True
+    assert str(url) == TEST_URL
+
+
+def test_uniformresourcelocator_faults_once():
+    parts = PARTS.copy()
+    del parts["scheme"]
+    del parts["host"]
+    url = UniformResourceLocator(**parts)
+    faults = list(url.find_faults())
+    assert [str(fault) for fault in faults] == ["No scheme specified.", "Empty host."]
+    assert faults[0] is not next(url.find_faults())
+    with pytest.raises(ValueError):
+        str(url)
+
+
+def test_urlauthority_immutable():
+    authority = UrlAuthority("example.com", "username", "password", "22")
+    assert str(authority) == "username:password@example.com:22"
+    with pytest.raises(AttributeError):
+        authority.username = "git"
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from quickclone.remote.locators import DirtyLocator, MAX_LOCATOR_LENGTH
+from quickclone.remote.parser import PARSER_ENGINES, get_parser_engine
+
+
+PARSERS = [
+    "parse_authority",
+    "parse_full_url",
+    "parse_dirty_url",
+    "parse_scp_full_loc",
+    "parse_scp_dirty_loc"
+]
+
+# Inputs that almost match, so that a backtracking parser tries many ways to
+# split them before giving up.
+ADVERSARIAL = {
+    "path_segments": lambda n: "a/" * n + ":",
+    "scp_path_segments": lambda n: "git@example.com:" + "a/" * n + "?",
+    "percent_escapes": lambda n: "%41" * n + "%4",
+    "percent_signs": lambda n: "%" * n,
+    "ipv6_groups": lambda n: "1:" * n + "g",
+    "ipv6_zone": lambda n: "fe80::7:8%" + "a" * n + "!",
+    "ipv4_octets": lambda n: "1." * n + "!",
+    "domain_labels": lambda n: "a." * n + "1",
+    "long_label": lambda n: "a-" * n + ".com:",
+    "userinfo": lambda n: "a:" * n + "b",
+    "query": lambda n: "a?" + "b" * n + "#c#",
+    "colons": lambda n: ":" * n,
+    "at_signs": lambda n: "@" * n + ":"
+}
+
+# The regex engine backtracks on some of these inputs (that is what the
+# tokenizer fixes), so only `MAX_LOCATOR_LENGTH` keeps it fast. It isn't held
+# to linear time here; benchmarks/bench_pathological.py shows how it scales.
+LINEAR_ENGINES = [engine for engine in PARSER_ENGINES if engine != "regex"]
+
+SMALL = 1000
+LARGE = 16 * SMALL
+# Linear parsers take about 16 times longer on inputs 16 times as long, and
+# quadratic ones about 256 times longer.
+MAX_GROWTH = 32
+
+
+def fastest(parse, input, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(input, none_str="to_str")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def growth(parse, make):
+    small = fastest(parse, make(SMALL))
+    large = fastest(parse, make(LARGE))
+    # Timers can't measure tiny durations precisely, so don't go below 10us.
+    return large / max(small, 1e-5)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("family", sorted(ADVERSARIAL))
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("engine", LINEAR_ENGINES)
+def test_parser_linear(engine, parser, family):
+    parse = getattr(get_parser_engine(engine), parser)
+    # Other processes can slow down a measurement, but a superlinear parser
+    # is too slow every time.
+    growths = []
+    for _ in range(3):
+        growths.append(growth(parse, ADVERSARIAL[family]))
+        if growths[-1] < MAX_GROWTH:
+            return
+    pytest.fail(
+        f"{engine} {parser} took {', '.join(f'{g:.1f}' for g in growths)} times longer on {family} "
+        f"with {LARGE} repetitions than with {SMALL}"
+    )
+
+
+def test_process_dirty_url_guards():
+    with pytest.raises(ValueError):
+        DirtyLocator.process_dirty_url("a/" * MAX_LOCATOR_LENGTH)
+    with pytest.raises(ValueError):
+        DirtyLocator.process_dirty_url("RenoirTan/QuickClone", max_length=10)
+    locator = DirtyLocator.process_dirty_url("a/" * (MAX_LOCATOR_LENGTH // 2 - 1) + "a")
+    assert locator.get_path().startswith("a/a/")
@@ -1,4 +1,7 @@
-from quickclone.local import make_path
+import shutil
+import warnings
+
+from quickclone.local import git_dir, git_remote_url, make_path
 
 
 def test_makepath_empty():
@@ -11,3 +14,34 @@ def test_makepath_nonempty():
 
 def test_makepath_suffixed():
     assert make_path("/path.git") == "/path"
+
+
+def test_git_remote_url(tmp_path, git):
+    assert git_remote_url(str(tmp_path)) is None
+    assert git_remote_url("") is None
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    git("init", "-q", str(tmp_path))
+    assert git_remote_url(str(tmp_path)) is None
+    git("-C", str(tmp_path), "remote", "add", "origin", "https://github.com/RenoirTan/QuickClone")
+    assert git_remote_url(str(tmp_path)) == "https://github.com/RenoirTan/QuickClone"
+    assert git_remote_url(str(tmp_path), "upstream") is None
+
+
+def test_git_remote_url_worktree(tmp_path, git):
+    if shutil.which("git") is None:
+        warnings.warn(Warning("git not found in path"))
+        return
+    main = tmp_path / "main"
+    git("init", "-q", str(main))
+    git("-C", str(main), "commit", "-q", "--allow-empty", "-m", "Initial commit")
+    git("-C", str(main), "remote", "add", "origin", "https://github.com/RenoirTan/QuickClone")
+    git("-C", str(main), "worktree", "add", "-q", "--detach", str(tmp_path / "linked"))
+    assert (tmp_path / "linked" / ".git").is_file()
+    assert git_remote_url(str(tmp_path / "linked")) == "https://github.com/RenoirTan/QuickClone"
+    assert git_dir(str(tmp_path / "linked"), common=True).resolve() == (main / ".git").resolve()
+    assert git_dir(str(tmp_path / "linked")).parent.resolve() == (main / ".git" / "worktrees").resolve()
+    (tmp_path / "broken").mkdir()
+    (tmp_path / "broken" / ".git").write_text("gitdir: missing\n")
+    assert git_dir(str(tmp_path / "broken")) is None
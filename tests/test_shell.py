@@ -0,0 +1,34 @@
+import os
+from pathlib import Path
+import shutil
+import subprocess
+
+import pytest
+
+from quickclone.config.common import SHELL_FOLDER
+
+
+def _run_bash(script: str, index_file: Path) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["QUICKCLONE_HISTORY_INDEX"] = str(index_file)
+    return subprocess.run(
+        ["bash", "-c", f"source '{SHELL_FOLDER / 'qcd.sh'}'; {script}"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        env=env
+    )
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not found in path")
+def test_qcd_bash(tmp_path):
+    first = tmp_path / "first"
+    second = tmp_path / "second with spaces"
+    first.mkdir()
+    second.mkdir()
+    index_file = tmp_path / "history.txt"
+    index_file.write_text(f"{second}\n{first}\n")
+    assert _run_bash("qcd && pwd", index_file).stdout.strip() == str(second)
+    assert _run_bash("qcd 1 && pwd", index_file).stdout.strip() == str(first)
+    assert "[1] " + str(first) in _run_bash("qcd -1", index_file).stdout
+    assert _run_bash("qcd 2", index_file).returncode != 0
@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+
+STARTUP_BUDGET_US = int(os.environ.get("QUICKCLONE_STARTUP_BUDGET_US", 100_000))
+"""
+Upper limit (in microseconds) for the total time spent importing modules when
+running `python -X importtime -m quickclone -L`.
+"""
+
+FORBIDDEN_MODULES = [
+    "quickclone.remote.parser",
+    "quickclone.config.configurator",
+    "quickclone.delegation"
+]
+"""
+Modules that history lookups must never import.
+"""
+
+
+def _importtime_last_clone(home: Path):
+    cache_folder = home / ".cache" / "quickclone"
+    cache_folder.mkdir(parents=True)
+    (cache_folder / "history.toml").write_text('last_clones = ["/tmp/somewhere"]\n')
+    env = dict(os.environ)
+    env["HOME"] = str(home)
+    env["USERPROFILE"] = str(home)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(PROJECT_DIR), *filter(None, [env.get("PYTHONPATH")])]
+    )
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "quickclone", "-L"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        env=env
+    )
+
+
+def _parse_importtime(stderr: str):
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        imports[name.strip()] = int(self_us)
+    return imports
+
+
+def test_last_clone_imports(tmp_path):
+    process = _importtime_last_clone(tmp_path)
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip() == "/tmp/somewhere"
+    imports = _parse_importtime(process.stderr)
+    for forbidden in FORBIDDEN_MODULES:
+        assert forbidden not in imports, f"'{forbidden}' imported by 'qkln -L'"
+
+
+def test_last_clone_startup_budget(tmp_path):
+    # Warm up first so that compiling bytecode isn't counted as import time,
+    # then take the fastest of a few runs to filter out noise from other
+    # processes.
+    _importtime_last_clone(tmp_path / "warm_up")
+    totals = []
+    for i in range(3):
+        process = _importtime_last_clone(tmp_path / f"home{i}")
+        assert process.returncode == 0, process.stderr
+        totals.append(sum(_parse_importtime(process.stderr).values()))
+    total = min(totals)
+    assert total <= STARTUP_BUDGET_US, (
+        f"'qkln -L' spent {total}us importing modules (budget: {STARTUP_BUDGET_US}us)"
+    )